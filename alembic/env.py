@@ -1,5 +1,4 @@
 from logging.config import fileConfig
-from urllib.parse import quote_plus
 from sqlalchemy import pool
 from alembic import context
 from sqlalchemy import engine_from_config
@@ -13,12 +12,11 @@ from app.db.base import Base  # Must import all models through this
 
 config = context.config
 
-# URL-encode password and escape % for configparser
-encoded_password = quote_plus(settings.DB_PASSWORD).replace('%', '%%')
-config.set_main_option(
-    "sqlalchemy.url",
-    f"mysql+pymysql://{settings.DB_USER}:{encoded_password}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}?charset=utf8mb4"
-)
+# Escape % (URL-encoded password) for configparser
+config.set_main_option("sqlalchemy.url", settings.SYNC_DATABASE_URL.replace('%', '%%'))
+
+# SQLite cannot ALTER most constraints in place; batch mode recreates the table
+RENDER_AS_BATCH = settings.DB_ENGINE == "sqlite"
 
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
@@ -34,7 +32,8 @@ def run_migrations_offline():
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
-        compare_server_default=True
+        compare_server_default=True,
+        render_as_batch=RENDER_AS_BATCH
     )
     with context.begin_transaction():
         context.run_migrations()
@@ -50,7 +49,8 @@ def run_migrations_online():
             connection=connection,
             target_metadata=target_metadata,
             compare_type=True,
-            compare_server_default=True
+            compare_server_default=True,
+            render_as_batch=RENDER_AS_BATCH
         )
         with context.begin_transaction():
             context.run_migrations()
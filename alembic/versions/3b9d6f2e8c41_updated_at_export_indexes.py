@@ -0,0 +1,28 @@
+"""updated_at_export_indexes
+
+Revision ID: 3b9d6f2e8c41
+Revises: e4f81c3a9b57
+Create Date: 2026-10-19 17:05:12.640118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d6f2e8c41'
+down_revision: Union[str, None] = 'e4f81c3a9b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_expenses_updated_at_id', 'expenses', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_incomes_updated_at_id', 'incomes', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_incomes_updated_at_id', table_name='incomes')
+    op.drop_index('ix_expenses_updated_at_id', table_name='expenses')
@@ -0,0 +1,28 @@
+"""user_created_at_covering_indexes
+
+Revision ID: 50c4bde11d09
+Revises: a0530505562f
+Create Date: 2026-10-19 11:03:27.540911
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '50c4bde11d09'
+down_revision: Union[str, None] = 'a0530505562f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_expenses_user_id_created_at', 'expenses', ['user_id', 'created_at', 'amount'], unique=False)
+    op.create_index('ix_incomes_user_id_created_at', 'incomes', ['user_id', 'created_at', 'amount'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_incomes_user_id_created_at', table_name='incomes')
+    op.drop_index('ix_expenses_user_id_created_at', table_name='expenses')
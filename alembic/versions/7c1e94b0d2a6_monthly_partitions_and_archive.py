@@ -0,0 +1,165 @@
+"""monthly_partitions_and_archive
+
+Revision ID: 7c1e94b0d2a6
+Revises: 02e372b1665d
+Create Date: 2026-10-19 15:02:44.118604
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e94b0d2a6'
+down_revision: Union[str, None] = '02e372b1665d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of app.db.partitions, so this revision runs without the app
+# (and its environment) and keeps producing the same DDL if the app changes
+PARTITIONED_TABLES = ('expenses', 'incomes')
+PARTITION_MONTHS_AHEAD = 3  # Later months are added by `python -m app.db.partitions ensure`
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(first: date, last: date) -> list:
+    months, current = [], first.replace(day=1)
+    while current <= last:
+        months.append(current)
+        current = add_months(current, 1)
+    return months
+
+
+def mysql_partition_table_sql(table: str, months: list) -> str:
+    parts = [
+        f"PARTITION p{m:%Y%m} VALUES LESS THAN (TO_DAYS('{add_months(m, 1).isoformat()}'))"
+        for m in months
+    ]
+    parts.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return f"ALTER TABLE {table} PARTITION BY RANGE (TO_DAYS(created_at)) ({', '.join(parts)})"
+
+
+def postgres_partition_sql(table: str, month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table}_p{month:%Y%m} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+# Secondary indexes and foreign keys recreated on the PostgreSQL parent table
+INDEXES = {
+    'expenses': [
+        ('ix_expenses_user_id', ['user_id']),
+        ('ix_expenses_category_id', ['category_id']),
+        ('ix_expenses_payment_method', ['payment_method']),
+        ('ix_expenses_user_id_created_at', ['user_id', 'created_at', 'amount']),
+    ],
+    'incomes': [
+        ('ix_incomes_user_id', ['user_id']),
+        ('ix_incomes_source', ['source']),
+        ('ix_incomes_user_id_created_at', ['user_id', 'created_at', 'amount']),
+    ],
+}
+FOREIGN_KEYS = {
+    'expenses': [('user_id', 'users'), ('category_id', 'budget_categories')],
+    'incomes': [('user_id', 'users')],
+}
+
+
+def _months(bind, table: str) -> list:
+    """Every month from the oldest row to PARTITION_MONTHS_AHEAD past today"""
+    oldest = bind.execute(sa.text(f"SELECT MIN(created_at) FROM {table}")).scalar()
+    current = datetime.utcnow().date().replace(day=1)
+    first = oldest.date().replace(day=1) if oldest else current
+    return month_range(first, add_months(current, PARTITION_MONTHS_AHEAD))
+
+
+def _partition_mysql(bind, table: str) -> None:
+    # MySQL rejects foreign keys on partitioned tables, and the partition
+    # column has to be part of the primary key
+    for fk in sa.inspect(bind).get_foreign_keys(table):
+        op.drop_constraint(fk['name'], table, type_='foreignkey')
+    op.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)")
+    op.execute(mysql_partition_table_sql(table, _months(bind, table)))
+
+
+def _partition_postgres(bind, table: str) -> None:
+    months = _months(bind, table)
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_unpartitioned")
+    op.execute(
+        f"CREATE TABLE {table} (LIKE {table}_unpartitioned INCLUDING DEFAULTS) "
+        f"PARTITION BY RANGE (created_at)"
+    )
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, created_at)")
+    for month in months:
+        op.execute(postgres_partition_sql(table, month))
+    op.execute(f"CREATE TABLE {table}_pdefault PARTITION OF {table} DEFAULT")
+    op.execute(f"INSERT INTO {table} SELECT * FROM {table}_unpartitioned")
+    op.execute(f"DROP TABLE {table}_unpartitioned")
+    for name, columns in INDEXES[table]:
+        op.create_index(name, table, columns, unique=False)
+    for column, target in FOREIGN_KEYS[table]:
+        op.create_foreign_key(f"fk_{table}_{column}", table, target, [column], ['id'])
+
+
+def _unpartition_postgres(bind, table: str) -> None:
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_partitioned")
+    op.execute(f"CREATE TABLE {table} (LIKE {table}_partitioned INCLUDING DEFAULTS)")
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+    op.execute(f"INSERT INTO {table} SELECT * FROM {table}_partitioned")
+    op.execute(f"DROP TABLE {table}_partitioned CASCADE")
+    for name, columns in INDEXES[table]:
+        op.create_index(name, table, columns, unique=False)
+    for column, target in FOREIGN_KEYS[table]:
+        op.create_foreign_key(f"fk_{table}_{column}", table, target, [column], ['id'])
+
+
+def _create_archive(bind, table: str) -> None:
+    hot = sa.Table(table, sa.MetaData(), autoload_with=bind)
+    name = f"{table}_archive"
+    op.create_table(
+        name,
+        *[
+            sa.Column(c.name, c.type, nullable=c.nullable, primary_key=c.primary_key and c.name == 'id')
+            for c in hot.columns
+        ]
+    )
+    op.create_index(f"ix_{name}_user_id_created_at", name, ['user_id', 'created_at'], unique=False)
+
+
+def _restore_archive(bind, table: str) -> None:
+    """Copy archived rows back into the hot table before the archive is dropped"""
+    columns = ", ".join(c['name'] for c in sa.inspect(bind).get_columns(f"{table}_archive"))
+    op.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_archive")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table in PARTITIONED_TABLES:
+        _create_archive(bind, table)
+        if bind.dialect.name == 'mysql':
+            _partition_mysql(bind, table)
+        elif bind.dialect.name == 'postgresql':
+            _partition_postgres(bind, table)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for table in PARTITIONED_TABLES:
+        if bind.dialect.name == 'mysql':
+            op.execute(f"ALTER TABLE {table} REMOVE PARTITIONING")
+            op.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+            for column, target in FOREIGN_KEYS[table]:
+                op.create_foreign_key(f"fk_{table}_{column}", table, target, [column], ['id'])
+        elif bind.dialect.name == 'postgresql':
+            _unpartition_postgres(bind, table)
+        _restore_archive(bind, table)
+        op.drop_index(f"ix_{table}_archive_user_id_created_at", table_name=f"{table}_archive")
+        op.drop_table(f"{table}_archive")
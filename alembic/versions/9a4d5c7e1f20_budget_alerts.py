@@ -0,0 +1,40 @@
+"""budget_alerts
+
+Revision ID: 9a4d5c7e1f20
+Revises: 3b9d6f2e8c41
+Create Date: 2026-10-19 19:12:05.331870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d5c7e1f20'
+down_revision: Union[str, None] = '3b9d6f2e8c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('budget_alerts',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.BINARY(length=16), nullable=False),
+    sa.Column('category_id', sa.BINARY(length=16), nullable=False),
+    sa.Column('category_name', sa.String(length=100), nullable=False),
+    sa.Column('period', sa.Date(), nullable=False),
+    sa.Column('threshold', sa.Float(), nullable=False),
+    sa.Column('spent', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('budget_limit', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('triggered_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_budget_alerts_user_id_triggered_at', 'budget_alerts', ['user_id', 'triggered_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_budget_alerts_user_id_triggered_at', table_name='budget_alerts')
+    op.drop_table('budget_alerts')
@@ -0,0 +1,36 @@
+"""change_log
+
+Revision ID: e4f81c3a9b57
+Revises: 7c1e94b0d2a6
+Create Date: 2026-10-19 16:20:31.507913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4f81c3a9b57'
+down_revision: Union[str, None] = '7c1e94b0d2a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('change_log',
+    sa.Column('seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.BINARY(length=16), nullable=False),
+    sa.Column('entity', sa.String(length=30), nullable=False),
+    sa.Column('entity_id', sa.BINARY(length=16), nullable=False),
+    sa.Column('op', sa.String(length=10), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index('ix_change_log_user_id_seq', 'change_log', ['user_id', 'seq'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_change_log_user_id_seq', table_name='change_log')
+    op.drop_table('change_log')
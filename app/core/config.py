@@ -1,6 +1,6 @@
 from datetime import timedelta
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field, MySQLDsn, PostgresDsn, SecretStr
+from pydantic import Field, MySQLDsn, PostgresDsn, SecretStr, model_validator
 from pathlib import Path
 import urllib.parse
 from typing import Literal
@@ -13,15 +13,57 @@ class Settings(BaseSettings):
     # Database Configuration
     ENV: str = "dev" 
 
-    DB_ENGINE: Literal["mysql", "postgresql"] = Field("mysql", env="DB_ENGINE")
-    DB_USER: str = Field(..., env="DB_USER")
-    DB_PASSWORD: str = Field(..., env="DB_PASSWORD")
+    DB_ENGINE: Literal["mysql", "postgresql", "sqlite"] = Field("mysql", env="DB_ENGINE")
+    DB_USER: str = Field("", env="DB_USER")  # Required unless sqlite
+    DB_PASSWORD: str = Field("", env="DB_PASSWORD")  # Required unless sqlite
     DB_HOST: str = Field("localhost", env="DB_HOST")
     DB_PORT: str = Field("3306", env="DB_PORT")
-    DB_NAME: str = Field(..., env="DB_NAME")
+    DB_NAME: str = Field(..., env="DB_NAME")  # sqlite: file path or :memory:
     DB_POOL_SIZE: int = Field(5, env="DB_POOL_SIZE")
-    DB_POOL_RECYCLE: int = Field(300, env="DB_POOL_RECYCLE")
-    DB_MAX_OVERFLOW: int = 10 
+    DB_POOL_RECYCLE: int = Field(300, env="DB_POOL_RECYCLE")  # Seconds before a pooled connection is replaced
+    DB_MAX_OVERFLOW: int = Field(10, env="DB_MAX_OVERFLOW")
+    DB_POOL_PRE_PING: bool = Field(False, env="DB_POOL_PRE_PING")  # Ping on every checkout instead of the liveness check
+    DB_LIVENESS_INTERVAL: int = Field(30, env="DB_LIVENESS_INTERVAL")  # Seconds between pings of idle pooled connections
+    DB_WARMUP: bool = Field(True, env="DB_WARMUP")  # Open the pool and compile hot statements at startup
+    DB_SHARDS: dict[str, str] = Field({}, env="DB_SHARDS")  # Extra user shards, name -> async URL (JSON); see app.db.sharding
+    DB_SHARD_VNODES: int = Field(128, env="DB_SHARD_VNODES")  # Ring points per shard
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(5000, env="SQLITE_BUSY_TIMEOUT_MS")  # Wait on a locked database instead of failing
+    SQLITE_CACHE_MB: int = Field(64, env="SQLITE_CACHE_MB")  # Page cache per connection
+
+    # Server (gunicorn.conf.py / run.py)
+    SERVER_HOST: str = Field("0.0.0.0", env="SERVER_HOST")
+    SERVER_PORT: int = Field(8000, env="SERVER_PORT")
+    WEB_CONCURRENCY: int = Field(0, env="WEB_CONCURRENCY")  # Fixed worker count; 0 sizes from CPUs
+    WORKERS_PER_CORE: float = Field(1.0, env="WORKERS_PER_CORE")
+    WEB_MAX_WORKERS: int = Field(0, env="WEB_MAX_WORKERS")  # Cap for the CPU-based count (DB connections scale with it), 0 = none
+    KEEPALIVE: int = Field(5, env="KEEPALIVE")  # Seconds an idle keep-alive connection stays open
+    BACKLOG: int = Field(2048, env="BACKLOG")  # Pending connections queued by the listen socket
+    MAX_REQUESTS: int = Field(10000, env="MAX_REQUESTS")  # Recycle a worker after this many requests, 0 = never
+    MAX_REQUESTS_JITTER: int = Field(1000, env="MAX_REQUESTS_JITTER")  # Spread recycling so workers don't restart together
+    WORKER_TIMEOUT: int = Field(60, env="WORKER_TIMEOUT")
+    GRACEFUL_TIMEOUT: int = Field(30, env="GRACEFUL_TIMEOUT")
+    PRELOAD_APP: bool = Field(True, env="PRELOAD_APP")  # Import once in the master; workers share pages copy-on-write
+
+    # Background Jobs
+    SCHEDULER_ENABLED: bool = Field(True, env="SCHEDULER_ENABLED")
+    SCHEDULER_POOL_SIZE: int = Field(2, env="SCHEDULER_POOL_SIZE")  # Separate from the request pool
+    REFRESH_TOKEN_SWEEP_INTERVAL: str = Field("1h", env="REFRESH_TOKEN_SWEEP_INTERVAL")
+
+    # Partitioning & Archival (expenses / incomes)
+    ARCHIVE_ENABLED: bool = Field(False, env="ARCHIVE_ENABLED")
+    ARCHIVE_HORIZON_MONTHS: int = Field(24, env="ARCHIVE_HORIZON_MONTHS")  # Rows older than this move to *_archive
+    ARCHIVE_CHUNK_SIZE: int = Field(1000, env="ARCHIVE_CHUNK_SIZE")
+    ARCHIVE_INTERVAL: str = Field("1d", env="ARCHIVE_INTERVAL")
+    PARTITION_MONTHS_AHEAD: int = Field(3, env="PARTITION_MONTHS_AHEAD")
+
+    # Bulk expense edits
+    EXPENSE_BULK_CHUNK_SIZE: int = Field(500, env="EXPENSE_BULK_CHUNK_SIZE")  # Rows per UPDATE/DELETE statement and commit
+    EXPENSE_BULK_MAX_IDS: int = Field(5000, env="EXPENSE_BULK_MAX_IDS")  # Explicit ids per bulk request
+
+    # Delta Sync
+    SYNC_PAGE_SIZE: int = Field(500, env="SYNC_PAGE_SIZE")  # Change-log entries per sync call
+    SYNC_BATCH_MAX: int = Field(500, env="SYNC_BATCH_MAX")  # Operations per /sync/batch request
+    SYNC_SAFETY_LAG: int = Field(5, env="SYNC_SAFETY_LAG")  # Seconds a change-log entry ages before a token may pass it
 
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(7, env="REFRESH_TOKEN_EXPIRE_DAYS")
     TOKEN_ISSUER: str = Field("FinTrack", env="TOKEN_ISSUER")
@@ -34,12 +76,62 @@ class Settings(BaseSettings):
     SECRET_KEY: SecretStr = Field(..., env="SECRET_KEY")
     ALGORITHM: str = Field("HS256", env="ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
+    TOKEN_CACHE_SIZE: int = Field(10000, env="TOKEN_CACHE_SIZE")  # Verified access tokens kept per worker, 0 disables
+
+    # Password Hashing (tune with `python -m app.core.hash_calibration`)
+    ARGON2_TIME_COST: int = Field(3, env="ARGON2_TIME_COST")
+    ARGON2_MEMORY_COST: int = Field(65536, env="ARGON2_MEMORY_COST")  # KiB
+    ARGON2_PARALLELISM: int = Field(4, env="ARGON2_PARALLELISM")
+    PASSWORD_HASH_TARGET_MS: int = Field(250, env="PASSWORD_HASH_TARGET_MS")
 
     # App Configuration
     DEBUG: bool = Field(False, env="APP_DEBUG")
     ENVIRONMENT: Literal["dev", "staging", "production"] = Field("dev", env="ENVIRONMENT")
 
 
+    # Analytics Configuration
+    ANOMALY_WINDOW: int = Field(12, env="ANOMALY_WINDOW")  # Previous expenses per category
+    ANOMALY_THRESHOLD: float = Field(3.5, env="ANOMALY_THRESHOLD")  # Robust z-score cut-off
+    ANOMALY_MIN_HISTORY: int = Field(5, env="ANOMALY_MIN_HISTORY")
+
+    # Dashboard Configuration
+    DASHBOARD_DB_BUDGET_MS: int = Field(1500, env="DASHBOARD_DB_BUDGET_MS")  # Shared deadline for all sub-queries
+    DASHBOARD_TOP_CATEGORIES: int = Field(5, env="DASHBOARD_TOP_CATEGORIES")
+
+    # Budget Alerts
+    BUDGET_ALERT_THRESHOLDS: list[float] = Field([0.8, 1.0], env="BUDGET_ALERT_THRESHOLDS")  # Shares of budget_limit
+    BUDGET_WATCHER_SIZE: int = Field(50000, env="BUDGET_WATCHER_SIZE")  # Running totals kept per worker
+    BUDGET_WATCHER_TTL: int = Field(300, env="BUDGET_WATCHER_TTL")  # Seconds before a total is re-seeded from the DB
+    BUDGET_ALERT_HISTORY: int = Field(50, env="BUDGET_ALERT_HISTORY")  # Recent alerts returned per user
+
+    # Savings Goal Forecasts
+    FORECAST_HISTORY_MONTHS: int = Field(24, env="FORECAST_HISTORY_MONTHS")  # Complete months of net history used
+    FORECAST_MIN_MONTHS: int = Field(3, env="FORECAST_MIN_MONTHS")
+    FORECAST_HORIZON_MONTHS: int = Field(120, env="FORECAST_HORIZON_MONTHS")
+    FORECAST_SIMULATIONS: int = Field(2000, env="FORECAST_SIMULATIONS")
+    FORECAST_TREND_DAMPING: float = Field(0.9, env="FORECAST_TREND_DAMPING")
+    FORECAST_CACHE_SIZE: int = Field(5000, env="FORECAST_CACHE_SIZE")  # Users kept per worker, 0 disables
+
+    # Columnar Export
+    EXPORT_DIR: str = Field("exports", env="EXPORT_DIR")
+    EXPORT_CHUNK_ROWS: int = Field(50000, env="EXPORT_CHUNK_ROWS")  # Rows buffered per month before a write
+    EXPORT_SAFETY_LAG: int = Field(300, env="EXPORT_SAFETY_LAG")  # Seconds a row ages before it is exported
+
+    # Reports
+    REPORT_DIR: str = Field("reports", env="REPORT_DIR")
+
+    # Monthly statements (rendered in the background, cached on disk)
+    STATEMENT_DIR: str = Field("statements", env="STATEMENT_DIR")
+    STATEMENT_WORKERS: int = Field(2, env="STATEMENT_WORKERS")
+    STATEMENT_RETRY_AFTER: int = Field(5, env="STATEMENT_RETRY_AFTER")  # Seconds suggested to clients while pending
+
+    # Post-commit domain events (app.core.events)
+    EVENT_WORKERS: int = Field(4, env="EVENT_WORKERS")
+    EVENT_QUEUE_SIZE: int = Field(10000, env="EVENT_QUEUE_SIZE")  # Publishers wait, then drop, beyond this
+    EVENT_PUBLISH_TIMEOUT_MS: int = Field(50, env="EVENT_PUBLISH_TIMEOUT_MS")  # Longest a publisher waits for room
+    EVENT_HANDLER_TIMEOUT: float = Field(10.0, env="EVENT_HANDLER_TIMEOUT")  # Seconds per handler call
+    EVENT_DRAIN_SECONDS: float = Field(5.0, env="EVENT_DRAIN_SECONDS")  # Delivery of queued events at shutdown
+
     LOG_LEVEL: str = "INFO"  # DEBUG, INFO, WARNING, ERROR
     LOG_ROTATION: str = "10 MB"
     LOG_BACKUP_COUNT: int = 5
@@ -51,6 +143,16 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
+    @model_validator(mode="after")
+    def check_credentials(self) -> "Settings":
+        if self.DB_ENGINE != "sqlite" and not (self.DB_USER and self.DB_PASSWORD):
+            raise ValueError(f"DB_USER and DB_PASSWORD are required for DB_ENGINE={self.DB_ENGINE}")
+        return self
+
+    @property
+    def SQLITE_IN_MEMORY(self) -> bool:
+        return self.DB_ENGINE == "sqlite" and self.DB_NAME == ":memory:"
+
     @property
     def DATABASE_URL(self) -> MySQLDsn | PostgresDsn:
         """Generate properly encoded DSN"""
@@ -58,9 +160,31 @@ class Settings(BaseSettings):
         
         if self.DB_ENGINE == "mysql":
             return f"mysql+asyncmy://{self.DB_USER}:{encoded_password}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}?charset=utf8mb4"
+        elif self.DB_ENGINE == "sqlite":
+            return f"sqlite+aiosqlite:///{self._sqlite_database}"
         else:
             return f"postgresql+asyncpg://{self.DB_USER}:{encoded_password}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def SYNC_DATABASE_URL(self) -> str:
+        """Blocking-driver DSN for Alembic"""
+        encoded_password = urllib.parse.quote_plus(self.DB_PASSWORD)
+
+        if self.DB_ENGINE == "mysql":
+            return f"mysql+pymysql://{self.DB_USER}:{encoded_password}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}?charset=utf8mb4"
+        elif self.DB_ENGINE == "sqlite":
+            return f"sqlite:///{self._sqlite_database}"
+        else:
+            return f"postgresql+psycopg2://{self.DB_USER}:{encoded_password}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    @property
+    def _sqlite_database(self) -> str:
+        # A plain :memory: database is private to one connection; a named
+        # shared-cache one is seen by every pooled connection in the process
+        if self.SQLITE_IN_MEMORY:
+            return "file:fintrack?mode=memory&cache=shared&uri=true"
+        return self.DB_NAME
+
     @property
     def token_config(self) -> dict:
         return {
@@ -1,16 +1,63 @@
-from typing import Annotated
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from typing import Annotated, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from app.core.config import settings
-from fastapi import Depends
+from app.db.sharding import Shard, ShardRouter, parse_id, request_user_id
+from fastapi import Depends, Request
+
+
+def _sqlite_pragmas(in_memory: bool):
+    """Per-connection SQLite tuning: concurrent readers, fewer fsyncs, bigger cache"""
+    def on_connect(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            cursor.execute("PRAGMA journal_mode=WAL")  # Readers no longer block the writer
+            cursor.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL; fsync at checkpoints only
+            cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_MB * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+        # Let SQLAlchemy emit BEGIN itself (see _sqlite_begin); pysqlite's implicit
+        # transactions would otherwise make an outermost SAVEPOINT commit on release
+        dbapi_connection.isolation_level = None
+    return on_connect
+
+
+def _sqlite_begin(conn) -> None:
+    conn.exec_driver_sql("BEGIN")
+
+
+def create_engine(pool_size: int, max_overflow: int, url: Optional[str] = None) -> AsyncEngine:
+    """Async engine for `url` (default: the DB_* database), with per-dialect connection setup"""
+    url = make_url(url or settings.DATABASE_URL)
+    options = {}
+    if url.get_backend_name() == "sqlite":
+        # aiosqlite defaults to NullPool (file) / StaticPool (memory); a real pool
+        # keeps tuned connections open and lets sessions use their own connection
+        options["poolclass"] = AsyncAdaptedQueuePool
+    engine = create_async_engine(
+        url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        # Off by default: idle connections are checked by app.core.warmup.pool_liveness
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        echo=False,
+        **options
+    )
+    if engine.dialect.name == "sqlite":
+        in_memory = url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+        event.listen(engine.sync_engine, "connect", _sqlite_pragmas(in_memory))
+        event.listen(engine.sync_engine, "begin", _sqlite_begin)
+    return engine
+
 
 # 1. Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,
-    echo=False
-)
+engine = create_engine(pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW)
 
 # 2. Create session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -19,9 +66,29 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
-# 3. Dependency with proper typing
-async def get_db() -> AsyncSession:
-    async with AsyncSessionLocal() as session:
+# 2b. Small dedicated pool for scheduled/background jobs so they never
+#     compete with request traffic for connections
+background_engine = create_engine(pool_size=settings.SCHEDULER_POOL_SIZE, max_overflow=0)
+
+BackgroundSessionLocal = async_sessionmaker(
+    bind=background_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+# 2c. User shards: the database above is "primary", DB_SHARDS adds more
+shard_router = ShardRouter.from_settings(
+    Shard("primary", engine, AsyncSessionLocal, background_engine, BackgroundSessionLocal),
+    create_engine
+)
+
+# 3. Dependency with proper typing; the session is on the shard of the request's user
+async def get_db(request: Request) -> AsyncSession:
+    shard = shard_router.shards.get(getattr(request.state, "shard", None))
+    if shard is None:
+        user_id = await request_user_id(request) if shard_router.sharded else None
+        shard = shard_router.shard_for(user_id)
+    async with shard.sessions() as session:
         try:
             yield session
             await session.commit()
@@ -31,5 +98,26 @@ async def get_db() -> AsyncSession:
         finally:
             await session.close()
 
+
+def shard_of_row(model, param: str):
+    """
+    Route dependency for endpoints that address a row of `model` by the id
+    in path parameter `param` without naming its user. When sharded, every
+    shard is asked for the row (both tiers) and get_db opens its session on
+    the one holding it; a missing row falls through to the primary (404).
+    """
+    async def locate(request: Request) -> None:
+        if not shard_router.sharded or await request_user_id(request) is not None:
+            return
+        row_id = parse_id(request.path_params.get(param))
+        if row_id is None:
+            return  # The endpoint reports the malformed id
+        from app.db.archive import both_tiers  # Circular at import time: archive loads the models
+        source = both_tiers(model) if hasattr(model, "__archive__") else model
+        shard = await shard_router.shard_holding(source, row_id)
+        if shard is not None:
+            request.state.shard = shard.name
+    return locate
+
 # 4. Type annotation for DI (critical fix)
 DatabaseSessionDep = Annotated[AsyncSession, Depends(get_db)]
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""
+Default subscribers of the domain event bus.
+
+Registered at startup by register_default_handlers(); each runs on the
+bus workers, after the write has committed, never on the request path.
+"""
+from dataclasses import fields
+from uuid import UUID
+
+from app.core.database import shard_router
+from app.core.events import DomainEvent, EventBus
+from app.core.logger import logger
+from app.features.category.watcher import budget_watcher
+from app.features.expense.events import ExpenseCreated
+
+
+def _describe(event: DomainEvent) -> str:
+    details = []
+    for f in fields(event):
+        if f.name in ("user_id", "occurred_at", "commit_started_at"):
+            continue
+        value = getattr(event, f.name)
+        if isinstance(value, bytes) and len(value) == 16:
+            value = UUID(bytes=value)
+        details.append(f"{f.name}={value}")
+    return ", ".join(details)
+
+
+async def log_event(event: DomainEvent) -> None:
+    """Audit line per committed write"""
+    logger.info(f"{event.name} for user {UUID(bytes=event.user_id)}: {_describe(event)}")
+
+
+async def track_budget(event: ExpenseCreated) -> None:
+    """Feed the new spend to the budget watcher, which may emit threshold alerts"""
+    committed = (event.commit_started_at or event.occurred_at, event.occurred_at)
+    async with shard_router.shard_for(event.user_id).background_sessions() as session:
+        await budget_watcher.record(session, [
+            (event.user_id, event.category_id, event.created_at, event.amount)
+        ], committed=committed)
+
+
+def register_default_handlers(bus: EventBus) -> None:
+    bus.subscribe(DomainEvent, log_event)
+    bus.subscribe(ExpenseCreated, track_budget)
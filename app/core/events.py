@@ -0,0 +1,152 @@
+"""
+In-process domain events, delivered after the write that produced them commits.
+
+Services publish events once their transaction has committed; a pool of
+EVENT_WORKERS tasks delivers them to the subscribed handlers, so logging,
+budget tracking and similar side effects no longer run on the request path.
+
+The queue is bounded (EVENT_QUEUE_SIZE). A full queue slows publishers
+down by up to EVENT_PUBLISH_TIMEOUT_MS and then drops the event, counted
+in `events_dropped`. Each handler runs in isolation with its own timeout:
+one failing or hanging handler neither affects the others nor the write.
+Delivery is at-most-once and per process; events still queued at shutdown
+get EVENT_DRAIN_SECONDS to finish.
+"""
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import metrics
+
+
+@dataclass(frozen=True)
+class DomainEvent:
+    """
+    Base of all events; `user_id` is the binary id of the user the write
+    belongs to, `occurred_at` the UTC time its commit returned and
+    `commit_started_at` the time before it began (set by commit_and_publish).
+    The write became visible somewhere in between.
+    """
+    user_id: bytes
+    occurred_at: datetime = field(default_factory=datetime.utcnow, kw_only=True)
+    commit_started_at: Optional[datetime] = field(default=None, kw_only=True)
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+
+Handler = Callable[[DomainEvent], Awaitable[None]]
+
+
+class EventBus:
+    """Bounded queue of committed events and the workers that dispatch them"""
+
+    def __init__(self, max_size: int, publish_timeout: float, handler_timeout: float):
+        self.max_size = max_size
+        self.publish_timeout = publish_timeout
+        self.handler_timeout = handler_timeout
+        self._handlers: dict[type, list[Handler]] = defaultdict(list)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._depth = metrics.gauge("event_queue_depth", "Events waiting for their handlers")
+        self._published = metrics.counter("events_published", "Events accepted by the bus")
+        self._dropped = metrics.counter("events_dropped", "Events dropped because the queue stayed full")
+        self._latency = metrics.histogram("event_handler_seconds", "Time one handler spent on one event")
+        self._failures = metrics.counter("event_handler_failures", "Handler calls that raised or timed out")
+
+    def subscribe(self, event_type: type, handler: Handler) -> None:
+        """Call `handler` for every event of `event_type`, subclasses included"""
+        if handler not in self._handlers[event_type]:
+            self._handlers[event_type].append(handler)
+
+    def handlers_for(self, event: DomainEvent) -> list[Handler]:
+        return [h for cls in type(event).__mro__ for h in self._handlers.get(cls, ())]
+
+    def start(self, workers: int = settings.EVENT_WORKERS) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"event-worker:{i}")
+            for i in range(workers)
+        ]
+        logger.info(f"Event bus started with {workers} workers")
+
+    async def stop(self, drain: float = settings.EVENT_DRAIN_SECONDS) -> None:
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), drain)
+        except asyncio.TimeoutError:
+            logger.warning(f"Event bus stopped with {self._queue.qsize()} events undelivered")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._depth.set(0)
+        logger.info("Event bus stopped")
+
+    async def publish(self, *events: DomainEvent) -> None:
+        """
+        Queue committed events; never raises. Call only after the commit:
+        handlers may run before this coroutine returns.
+        Without a running bus (CLIs, warm-up) events are discarded.
+        """
+        if self._queue is None:
+            return
+        for event in events:
+            try:
+                await asyncio.wait_for(self._queue.put(event), self.publish_timeout)
+            except asyncio.TimeoutError:
+                self._dropped.inc()
+                logger.warning(f"Event queue full, dropped {event.name}")
+                continue
+            self._published.inc()
+            self._depth.set(self._queue.qsize())
+
+    async def _run(self) -> None:
+        while True:
+            event = await self._queue.get()
+            self._depth.set(self._queue.qsize())
+            try:
+                for handler in self.handlers_for(event):
+                    await self._dispatch(handler, event)
+            finally:
+                self._queue.task_done()
+
+    async def _dispatch(self, handler: Handler, event: DomainEvent) -> None:
+        try:
+            with self._latency.time():
+                await asyncio.wait_for(handler(event), self.handler_timeout)
+        except Exception as e:
+            self._failures.inc()
+            name = getattr(handler, "__name__", repr(handler))
+            logger.error(f"Event handler {name} failed on {event.name}: {str(e) or type(e).__name__}")
+
+
+event_bus = EventBus(
+    settings.EVENT_QUEUE_SIZE,
+    settings.EVENT_PUBLISH_TIMEOUT_MS / 1000,
+    settings.EVENT_HANDLER_TIMEOUT
+)
+
+
+async def commit_and_publish(db: AsyncSession, *events: DomainEvent) -> None:
+    """
+    Commit `db`, then publish `events` stamped with the times just before
+    and just after the commit. Nothing is published if the commit fails.
+    """
+    started_at = datetime.utcnow()
+    await db.commit()
+    committed_at = datetime.utcnow()
+    await event_bus.publish(*(
+        replace(event, occurred_at=committed_at, commit_started_at=started_at) for event in events
+    ))
@@ -0,0 +1,75 @@
+"""
+Sparse fieldsets for list endpoints (`?fields=id,amount,created_at`).
+
+The requested fields become a column projection (`load_only`) for the
+query and a response model declaring only those fields. Models and their
+list serializers are built once per (schema, field set) and cached.
+"""
+from functools import lru_cache
+from typing import Optional, Sequence
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter, create_model, field_validator
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+# Always returned so clients can address the rows they get back
+ALWAYS_INCLUDED = ("id",)
+
+
+def parse_fields(fields: Optional[str], schema: type[BaseModel]) -> Optional[tuple[str, ...]]:
+    """
+    Validate a comma-separated `fields` value against `schema`
+    Returns:
+        Field names in schema order (a stable cache key), or None for all fields
+    Raises:
+        ValueError: On unknown field names
+    """
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = sorted(requested - schema.model_fields.keys())
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(schema.model_fields)}"
+        )
+    return tuple(f for f in schema.model_fields if f in requested or f in ALWAYS_INCLUDED)
+
+
+@lru_cache(maxsize=256)
+def sparse_model(schema: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    """`schema` reduced to `fields`, keeping its config and field validators"""
+    definitions = {name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields}
+    validators = {}
+    for name, decorator in schema.__pydantic_decorators__.field_validators.items():
+        targets = [f for f in decorator.info.fields if f in fields]
+        if targets:
+            func = getattr(decorator.func, "__func__", decorator.func)  # Stored bound to `schema`
+            validators[name] = field_validator(*targets, mode=decorator.info.mode)(classmethod(func))
+    return create_model(
+        f"{schema.__name__}[{','.join(fields)}]",
+        __config__={**schema.model_config, "from_attributes": True},
+        __validators__=validators,
+        **definitions
+    )
+
+
+@lru_cache(maxsize=256)
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+def load_fields(entity, fields: Sequence[str]):
+    """`load_only` option for the mapped columns among `fields`"""
+    mapped = inspect(entity).mapper.column_attrs.keys()
+    columns = [getattr(entity, name) for name in fields if name in mapped]
+    return load_only(*columns)
+
+
+def sparse_response(items: list[BaseModel]) -> Response:
+    """
+    Serialize sparse models straight to JSON, bypassing the route's full
+    response_model (which would reject or refill the pruned fields)
+    """
+    model = type(items[0]) if items else BaseModel
+    return Response(content=_list_adapter(model).dump_json(items), media_type="application/json")
@@ -0,0 +1,107 @@
+"""
+Password hash cost calibration.
+
+Measures Argon2 hashing time on this host and picks the strongest
+parameters whose median latency stays within the target, then prints the
+settings to deploy. Run it on the same node type that serves logins.
+
+Usage:
+    python -m app.core.hash_calibration --target-ms 250
+"""
+import argparse
+import os
+import statistics
+import time
+
+from passlib.hash import argon2
+
+from app.core.config import settings
+
+# Memory costs tried, in KiB (largest first); 19 MiB is the OWASP minimum
+MEMORY_CANDIDATES = (262144, 131072, 65536, 47104, 19456)
+MAX_TIME_COST = 10
+MIN_TIME_COST = 2
+
+
+def measure(time_cost: int, memory_cost: int, parallelism: int, samples: int) -> float:
+    """Median milliseconds to hash one password with the given parameters"""
+    hasher = argon2.using(
+        time_cost=time_cost,
+        memory_cost=memory_cost,
+        parallelism=parallelism
+    )
+    hasher.hash("calibration-warmup")
+    durations = []
+    for i in range(samples):
+        started = time.perf_counter()
+        hasher.hash(f"calibration-password-{i}")
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations)
+
+
+def calibrate(target_ms: float, parallelism: int, samples: int, max_memory: int) -> dict:
+    """
+    Walk memory costs from largest to smallest and, for each, raise the time
+    cost until the target is exceeded. The first memory cost that sustains
+    at least MIN_TIME_COST within the target wins.
+    """
+    fallback = None
+    for memory_cost in (m for m in MEMORY_CANDIDATES if m <= max_memory):
+        best = None
+        for time_cost in range(1, MAX_TIME_COST + 1):
+            elapsed = measure(time_cost, memory_cost, parallelism, samples)
+            print(f"  m={memory_cost // 1024:>4} MiB t={time_cost:>2} p={parallelism}: {elapsed:8.1f} ms")
+            if elapsed > target_ms:
+                break
+            best = {
+                "time_cost": time_cost,
+                "memory_cost": memory_cost,
+                "parallelism": parallelism,
+                "median_ms": round(elapsed, 1)
+            }
+        if best and best["time_cost"] >= MIN_TIME_COST:
+            return best
+        fallback = best or fallback
+    return fallback or {
+        "time_cost": 1,
+        "memory_cost": MEMORY_CANDIDATES[-1],
+        "parallelism": parallelism,
+        "median_ms": round(measure(1, MEMORY_CANDIDATES[-1], parallelism, samples), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate Argon2 cost for this host")
+    parser.add_argument("--target-ms", type=float, default=settings.PASSWORD_HASH_TARGET_MS)
+    parser.add_argument("--parallelism", type=int, default=settings.ARGON2_PARALLELISM)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--max-memory-mib", type=int, default=256)
+    args = parser.parse_args()
+
+    current = measure(
+        settings.ARGON2_TIME_COST,
+        settings.ARGON2_MEMORY_COST,
+        settings.ARGON2_PARALLELISM,
+        args.samples
+    )
+    print(
+        f"Current: t={settings.ARGON2_TIME_COST} m={settings.ARGON2_MEMORY_COST // 1024} MiB "
+        f"p={settings.ARGON2_PARALLELISM} -> {current:.1f} ms"
+    )
+    print(f"Calibrating for {args.target_ms:.0f} ms on {os.cpu_count()} CPUs:")
+
+    chosen = calibrate(args.target_ms, args.parallelism, args.samples, args.max_memory_mib * 1024)
+    logins_per_core = 1000 / chosen["median_ms"] if chosen["median_ms"] else 0.0
+
+    print("\nRecommended settings:")
+    print(f"ARGON2_TIME_COST={chosen['time_cost']}")
+    print(f"ARGON2_MEMORY_COST={chosen['memory_cost']}")
+    print(f"ARGON2_PARALLELISM={chosen['parallelism']}")
+    print(
+        f"\n~{chosen['median_ms']} ms per hash, about {logins_per_core:.1f} logins/s per core "
+        f"({logins_per_core * (os.cpu_count() or 1) / max(chosen['parallelism'], 1):.1f} logins/s on this host)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,130 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.core.config import settings
+from app.core.metrics import metrics
 from app.features.auth.models import User
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from uuid import UUID
+from uuid import UUID, uuid4
 from typing import Optional, Tuple
 from app.core.database import get_db
+from app.db import queries
 from app.core.database import DatabaseSessionDep
 
-# Configure Argon2 with strong parameters
+# Single password context for the whole app. Argon2 parameters come from
+# settings; legacy bcrypt hashes still verify and are flagged by
+# `needs_update`, as are Argon2 hashes made with weaker parameters.
 pwd_context = CryptContext(
-    schemes=["argon2"],
+    schemes=["argon2", "bcrypt"],
     deprecated="auto",
-    argon2__time_cost=3,
-    argon2__memory_cost=65536,  # 64MB
-    argon2__parallelism=4,
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__min_rounds=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
     argon2__hash_len=32,
     argon2__salt_size=16
 )
 
+PASSWORD_HASH_SECONDS = metrics.histogram(
+    "password_hash_seconds", "Time spent hashing a password"
+)
+PASSWORD_VERIFY_SECONDS = metrics.histogram(
+    "password_verify_seconds", "Time spent verifying a password"
+)
+
+def get_password_hash(password: str) -> str:
+    """Hash a password with the current policy (CPU-bound, call off the event loop)"""
+    with PASSWORD_HASH_SECONDS.time():
+        return pwd_context.hash(password)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against any supported hash (CPU-bound, call off the event loop)"""
+    with PASSWORD_VERIFY_SECONDS.time():
+        return pwd_context.verify(plain_password, hashed_password)
+
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="auth/login",
     scopes={"access": "Standard access", "refresh": "Refresh token access"}
 )
 
+class TokenCache:
+    """
+    Bounded LRU of verified access-token claims, keyed by token digest.
+
+    Entries are only ever added after a full signature and claim check and
+    are dropped once their `exp` has passed, so a hit is equivalent to
+    re-verifying the token.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, Tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = metrics.counter("token_cache_hits", "Access tokens served from the verification cache")
+        self._misses = metrics.counter("token_cache_misses", "Access tokens that needed full verification")
+        self._hit_rate = metrics.gauge("token_cache_hit_rate", "Share of token verifications served from cache")
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._misses.inc()
+            else:
+                self._entries.move_to_end(key)
+                self._hits.inc()
+            self._hit_rate.set(self.hit_rate)
+        return dict(entry[0]) if entry else None
+
+    def put(self, token: str, claims: dict) -> None:
+        expires = claims.get("exp")
+        if not isinstance(expires, (int, float)) or self.max_size <= 0:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (dict(claims), float(expires))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self._hits.value + self._misses.value
+        return self._hits.value / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
 class TokenService:
     @staticmethod
-    def create_tokens(user_data: dict) -> dict:
-        """Generate both access and refresh tokens"""
+    def create_tokens(user_data: dict, family_id: Optional[str] = None) -> dict:
+        """
+        Generate both access and refresh tokens
+
+        The refresh token carries its rotation family (`fam`) and a unique
+        `jti`, so each rotation yields a distinct token within the family.
+        """
         now = datetime.utcnow()
+        family_id = family_id or uuid4().hex
         base_claims = {
             "sub": str(user_data["uuid"]),
             "iss": settings.TOKEN_ISSUER,
@@ -52,11 +144,16 @@ class TokenService:
             algorithm=settings.ALGORITHM
         )
 
+        refresh_expires_at = now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
         refresh_token = jwt.encode(
             {
                 **base_claims,
                 "type": "refresh",
-                "exp": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+                "jti": uuid4().hex,
+                "fam": family_id,
+                "email": user_data["email"],
+                "username": user_data["username"],
+                "exp": refresh_expires_at
             },
             settings.SECRET_KEY.get_secret_value(),
             algorithm=settings.ALGORITHM
@@ -65,12 +162,23 @@ class TokenService:
         return {
             "access_token": access_token,
             "refresh_token": refresh_token,
-            "expires_at": now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+            "expires_at": now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+            "refresh_expires_at": refresh_expires_at,
+            "family_id": family_id
         }
 
+    @staticmethod
+    def token_digest(token: str) -> bytes:
+        """SHA-256 digest used to store and look up refresh tokens"""
+        return hashlib.sha256(token.encode()).digest()
+
     @staticmethod
     def verify_token(token: str) -> dict:
-        """Verify and decode JWT token"""
+        """Verify and decode JWT token (access tokens are served from cache when possible)"""
+        cached = token_cache.get(token)
+        if cached is not None:
+            return cached
+
         try:
             payload = jwt.decode(
                 token,
@@ -79,6 +187,9 @@ class TokenService:
                 audience=settings.TOKEN_AUDIENCE,
                 issuer=settings.TOKEN_ISSUER
             )
+            # Refresh tokens are single-use, caching them would only evict access tokens
+            if payload.get("type") == "access":
+                token_cache.put(token, payload)
             return payload
         except JWTError as e:
             raise HTTPException(
@@ -108,7 +219,7 @@ async def get_current_user(
             detail="Invalid user identifier"
         )
 
-    result = await db.execute(select(User).where(User.id == user_uuid.bytes))
+    result = await db.execute(queries.user_by_id(user_uuid.bytes))
     user = result.scalar_one_or_none()
     
     if not user:
@@ -0,0 +1,49 @@
+"""
+Process sizing and memory reporting for the production server
+(see gunicorn.conf.py).
+"""
+import importlib.util
+import os
+import resource
+
+from app.core.config import settings
+
+
+def cpu_count() -> int:
+    """CPUs this process may run on (respects container cpusets)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS
+        return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    """WEB_CONCURRENCY if set, else CPUs x WORKERS_PER_CORE (at least 2, capped by WEB_MAX_WORKERS)"""
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    workers = max(int(cpu_count() * settings.WORKERS_PER_CORE), 2)
+    if settings.WEB_MAX_WORKERS > 0:
+        workers = min(workers, settings.WEB_MAX_WORKERS)
+    return workers
+
+
+def event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # No procfs (macOS): peak RSS instead, reported in bytes there
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def rss_mb() -> float:
+    return round(rss_bytes() / (1024 * 1024), 1)
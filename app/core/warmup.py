@@ -0,0 +1,161 @@
+"""
+Startup warm-up and idle-connection liveness for the database pools.
+
+`warm_up` opens the pools to their configured size and runs the hot
+service paths once (reads and inserts) inside a transaction that is
+rolled back, so their statements are compiled into the engine's cache
+before the first request. `pool_liveness` pings idle pooled connections
+in the background, which replaces a ping on every checkout
+(DB_POOL_PRE_PING).
+"""
+import asyncio
+import time
+import uuid
+from decimal import Decimal
+from typing import Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings, Type, PaymentMethod, IncomeSource, IncomeFrequency
+from app.core.database import engine, background_engine, shard_router
+from app.core.logger import logger
+from app.core.metrics import metrics
+from app.features.auth.models import User
+from app.features.category.schemas import BudgetCategoryCreate
+from app.features.category.service import BudgetCategoryService
+from app.features.category.watcher import budget_watcher
+from app.features.expense.schemas import ExpenseCreate
+from app.features.expense.service import ExpenseService
+from app.features.income.schemas import IncomeCreate
+from app.features.income.service import IncomeService
+from app.features.savingsgoal.service import SavingsGoalService
+from app.features.sync.service import SyncService
+
+
+async def open_connections(target: AsyncEngine, count: int) -> int:
+    """Check out `count` connections at once, then return them all to the pool"""
+    connections = await asyncio.gather(*(target.connect() for _ in range(count)))
+    try:
+        await asyncio.gather(*(conn.exec_driver_sql("SELECT 1") for conn in connections))
+    finally:
+        await asyncio.gather(*(conn.close() for conn in connections))
+    return len(connections)
+
+
+async def _exercise_services(session: AsyncSession) -> int:
+    """Run the hot read/insert paths against a throwaway user; returns the paths run"""
+    user = User(
+        id=uuid.uuid4().bytes,
+        first_name="warmup",
+        last_name="warmup",
+        email=f"warmup-{uuid.uuid4().hex}@warmup.invalid",
+        username=f"warmup-{uuid.uuid4().hex}",
+        password_hash="!"
+    )
+    session.add(user)
+    await session.flush()
+    user_id = uuid.UUID(bytes=user.id)
+
+    category = await BudgetCategoryService(session).create_category(BudgetCategoryCreate(
+        user_id=user_id, name="warmup", budget_limit=Decimal("1000000.00"), type=Type.EXPENSE
+    ))
+    await ExpenseService(session).create_expense(ExpenseCreate(
+        user_id=user_id, category_id=category.id, name="warmup", amount=Decimal("1.00"),
+        payment_method=PaymentMethod.CASH
+    ))
+    await IncomeService(session).create_income(IncomeCreate(
+        user_id=str(user_id), source=IncomeSource.SALARY, amount=Decimal("1.00"),
+        frequency=IncomeFrequency.MONTHLY
+    ))
+
+    await ExpenseService(session).get_all_expenses(user_id)
+    await ExpenseService.get_expenses_by_user(str(user_id), session)
+    await IncomeService(session).list_incomes(str(user_id))
+    await IncomeService.get_incomes_by_user(str(user_id), session)
+    await BudgetCategoryService(session).get_categories_by_user(user_id)
+    await SavingsGoalService.get_goals_by_user(str(user_id), session)
+    await SyncService(session).get_changes(user_id)
+    budget_watcher.invalidate(user.id)
+    return 10
+
+
+async def precompile_statements(target: AsyncEngine) -> int:
+    """
+    Populate `target`'s compiled cache with the hot service statements.
+    Services commit on their own; here those commits only release
+    savepoints and the outer transaction is rolled back.
+    """
+    async with target.connect() as conn:
+        outer = await conn.begin()
+        session = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+        try:
+            return await _exercise_services(session)
+        finally:
+            await session.close()
+            await outer.rollback()
+
+
+async def warm_up() -> dict:
+    """Open both pools and compile the hot statements; never fails startup"""
+    started = time.perf_counter()
+    report = {"connections": 0, "background_connections": 0, "paths": 0}
+    try:
+        report["connections"] = await open_connections(engine, settings.DB_POOL_SIZE)
+        report["background_connections"] = await open_connections(background_engine, settings.SCHEDULER_POOL_SIZE)
+        report["paths"] = await precompile_statements(engine)
+    except Exception as e:
+        logger.warning(f"Database warm-up incomplete: {str(e)}")
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    metrics.gauge("db_warmup_seconds", "Duration of the startup pool warm-up").set(report["seconds"])
+    logger.info(f"Database warm-up: {report}")
+    return report
+
+
+async def ping_idle_connections(target: AsyncEngine) -> int:
+    """
+    Ping every connection currently idle in the pool; returns failures.
+    The queue pool hands out connections FIFO, so N sequential checkouts
+    visit the N idle ones. A failed ping invalidates the connection (and,
+    on a disconnect, every older one), so the next checkout reconnects.
+    """
+    failures = 0
+    for _ in range(target.sync_engine.pool.checkedin()):
+        try:
+            async with target.connect() as conn:
+                await conn.exec_driver_sql("SELECT 1")
+        except Exception as e:
+            failures += 1
+            logger.warning(f"Pooled connection failed liveness check: {str(e)}")
+    return failures
+
+
+class PoolLiveness:
+    """Background task pinging idle pooled connections every `interval` seconds"""
+
+    def __init__(self, engines: Sequence[AsyncEngine], interval: int):
+        self.engines = engines
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._failures = metrics.counter("db_liveness_failures", "Idle pooled connections that failed a ping")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="db-pool-liveness")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            for target in self.engines:
+                failures = await ping_idle_connections(target)
+                if failures:
+                    self._failures.inc(failures)
+
+
+pool_liveness = PoolLiveness(shard_router.engines(), settings.DB_LIVENESS_INTERVAL)
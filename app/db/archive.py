@@ -0,0 +1,98 @@
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Column, Index, Table, select, insert, delete, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.db.base import Base
+
+
+def archive_table(table: Table) -> Table:
+    """
+    Cold-tier copy of `table`: same columns, no foreign keys, and only the
+    (user_id, created_at) index needed to read a user's history.
+    """
+    columns = [
+        Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+        for c in table.columns
+    ]
+    name = f"{table.name}_archive"
+    return Table(
+        name,
+        Base.metadata,
+        *columns,
+        Index(f"ix_{name}_user_id_created_at", "user_id", "created_at")
+    )
+
+
+def archive_cutoff(horizon_months: Optional[int] = None, today: Optional[date] = None) -> datetime:
+    """First instant kept in the hot tier (start of month, ARCHIVE_HORIZON_MONTHS ago)"""
+    today = today or datetime.utcnow().date()
+    horizon = settings.ARCHIVE_HORIZON_MONTHS if horizon_months is None else horizon_months
+    months = today.year * 12 + today.month - 1 - horizon
+    return datetime(months // 12, months % 12 + 1, 1)
+
+
+def reaches_archive(since: Optional[datetime]) -> bool:
+    """Whether a query starting at `since` (None = full history) may need cold rows"""
+    return settings.ARCHIVE_ENABLED and (since is None or since < archive_cutoff())
+
+
+def both_tiers(model, since: Optional[datetime] = None):
+    """
+    Entity to select from instead of `model`: the hot table alone, or
+    hot UNION ALL archive when the requested window reaches the archive.
+    Rows load as regular `model` instances either way.
+    """
+    if not reaches_archive(since):
+        return model
+    return aliased(model, both_tiers_table(model, since))
+
+
+def both_tiers_table(model, since: Optional[datetime] = None):
+    """Core counterpart of both_tiers(): the hot table or the UNION ALL subquery"""
+    if not reaches_archive(since):
+        return model.__table__
+    archive = model.__archive__
+    return union_all(
+        select(*[model.__table__.c[c.name] for c in archive.columns]),
+        select(*archive.columns)
+    ).subquery(f"{model.__tablename__}_all")
+
+
+async def archive_rows(
+    db: AsyncSession,
+    model,
+    cutoff: datetime,
+    chunk_size: Optional[int] = None
+) -> int:
+    """
+    Move rows created before `cutoff` to the archive table, one committed
+    chunk at a time so locks on the hot table stay short.
+    """
+    table, archive = model.__table__, model.__archive__
+    chunk_size = chunk_size or settings.ARCHIVE_CHUNK_SIZE
+    moved = 0
+    while True:
+        result = await db.execute(
+            select(table.c.id)
+            .where(table.c.created_at < cutoff)
+            .order_by(table.c.created_at, table.c.id)
+            .limit(chunk_size)
+        )
+        ids = result.scalars().all()
+        if not ids:
+            break
+
+        await db.execute(
+            insert(archive).from_select(
+                [c.name for c in archive.columns],
+                select(*[table.c[c.name] for c in archive.columns]).where(table.c.id.in_(ids))
+            )
+        )
+        await db.execute(delete(table).where(table.c.id.in_(ids)))
+        await db.commit()
+        moved += len(ids)
+    return moved
@@ -12,6 +12,9 @@ class BaseMixin:
 # Import all models (critical for alembic autogenerate)
 from app.features.auth.models import User  # noqa: F401
 from app.features.income.models import Income  # noqa: F401
-from app.features.category.models import BudgetCategory  # noqa: F401
+from app.features.category.models import BudgetCategory, BudgetAlertRecord  # noqa: F401
 from app.features.expense.models import Expense  # noqa: F401
 from app.features.savingsgoal.models import SavingsGoal  # noqa: F401
+from app.features.scheduler.models import JobLease  # noqa: F401
+from app.features.sync.models import ChangeLog  # noqa: F401
+import app.features.sync.changes  # noqa: F401 - registers the change-log flush hook
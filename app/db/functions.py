@@ -0,0 +1,68 @@
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import Date
+
+BUCKETS = ("day", "week", "month")
+
+
+class _DateBucket(FunctionElement):
+    """Truncate a DATETIME to the start of its bucket (weeks start on Monday)"""
+    type = Date()
+    inherit_cache = True
+    bucket = None
+
+
+class day_bucket(_DateBucket):
+    name = "day_bucket"
+    inherit_cache = True
+    bucket = "day"
+
+
+class week_bucket(_DateBucket):
+    name = "week_bucket"
+    inherit_cache = True
+    bucket = "week"
+
+
+class month_bucket(_DateBucket):
+    name = "month_bucket"
+    inherit_cache = True
+    bucket = "month"
+
+
+def date_bucket(bucket: str, expr) -> _DateBucket:
+    """Dialect-portable date truncation for GROUP BY"""
+    constructs = {"day": day_bucket, "week": week_bucket, "month": month_bucket}
+    if bucket not in constructs:
+        raise ValueError(f"Unsupported bucket '{bucket}', expected one of {', '.join(BUCKETS)}")
+    return constructs[bucket](expr)
+
+
+def _column(element, compiler, **kw) -> str:
+    return compiler.process(list(element.clauses)[0], **kw)
+
+
+@compiles(_DateBucket)
+def _default_bucket(element, compiler, **kw):
+    # PostgreSQL: date_trunc('week') already starts weeks on Monday
+    return f"CAST(date_trunc('{element.bucket}', {_column(element, compiler, **kw)}) AS DATE)"
+
+
+@compiles(_DateBucket, "mysql")
+def _mysql_bucket(element, compiler, **kw):
+    column = _column(element, compiler, **kw)
+    if element.bucket == "day":
+        return f"DATE({column})"
+    if element.bucket == "week":
+        return f"DATE_SUB(DATE({column}), INTERVAL WEEKDAY({column}) DAY)"
+    return f"DATE_SUB(DATE({column}), INTERVAL DAYOFMONTH({column}) - 1 DAY)"
+
+
+@compiles(_DateBucket, "sqlite")
+def _sqlite_bucket(element, compiler, **kw):
+    column = _column(element, compiler, **kw)
+    if element.bucket == "day":
+        return f"date({column})"
+    if element.bucket == "week":
+        return f"date({column}, 'weekday 0', '-6 days')"
+    return f"date({column}, 'start of month')"
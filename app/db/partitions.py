@@ -0,0 +1,187 @@
+"""
+Monthly range partitions for the hot transaction tables, plus archival.
+
+MySQL tables are partitioned with RANGE (TO_DAYS(created_at)) and a
+trailing `pmax` catch-all; PostgreSQL uses declarative partitioning with a
+DEFAULT partition. Other dialects (SQLite) are left unpartitioned.
+
+Usage:
+    python -m app.db.partitions status
+    python -m app.db.partitions ensure --months-ahead 3
+    python -m app.db.partitions archive --horizon-months 24
+"""
+import argparse
+import asyncio
+import json
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+
+PARTITIONED_TABLES = ("expenses", "incomes")
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(first: date, last: date) -> list[date]:
+    """First day of every month from `first` to `last` inclusive"""
+    months, current = [], first.replace(day=1)
+    while current <= last:
+        months.append(current)
+        current = add_months(current, 1)
+    return months
+
+
+def partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+
+# MySQL DDL
+def mysql_partition_definitions(months: list[date]) -> str:
+    parts = [
+        f"PARTITION {partition_name(m)} VALUES LESS THAN (TO_DAYS('{add_months(m, 1).isoformat()}'))"
+        for m in months
+    ]
+    parts.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return ", ".join(parts)
+
+
+def mysql_partition_table_sql(table: str, months: list[date]) -> str:
+    return f"ALTER TABLE {table} PARTITION BY RANGE (TO_DAYS(created_at)) ({mysql_partition_definitions(months)})"
+
+
+def mysql_add_partitions_sql(table: str, months: list[date]) -> str:
+    # New months are split off the (empty) catch-all partition
+    return f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO ({mysql_partition_definitions(months)})"
+
+
+# PostgreSQL DDL
+def postgres_partition_sql(table: str, month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table}_{partition_name(month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+async def existing_partitions(conn: AsyncConnection, table: str) -> list[str]:
+    dialect = conn.dialect.name
+    if dialect == "mysql":
+        result = await conn.execute(
+            text(
+                "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+                "ORDER BY PARTITION_ORDINAL_POSITION"
+            ),
+            {"table": table}
+        )
+        return [row[0] for row in result]
+    if dialect == "postgresql":
+        result = await conn.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "WHERE parent.relname = :table ORDER BY child.relname"
+            ),
+            {"table": table}
+        )
+        return [row[0].removeprefix(f"{table}_") for row in result]
+    return []
+
+
+async def ensure_partitions(conn: AsyncConnection, months_ahead: int = settings.PARTITION_MONTHS_AHEAD) -> dict:
+    """Create partitions up to `months_ahead` months past the current one"""
+    dialect = conn.dialect.name
+    if dialect not in ("mysql", "postgresql"):
+        return {}
+
+    current = datetime.utcnow().date().replace(day=1)
+    wanted = month_range(current, add_months(current, months_ahead))
+    created = {}
+    for table in PARTITIONED_TABLES:
+        existing = set(await existing_partitions(conn, table))
+        if not existing:
+            continue  # Table not partitioned (migration not applied)
+        missing = [m for m in wanted if partition_name(m) not in existing]
+        if not missing:
+            continue
+        if dialect == "mysql":
+            # REORGANIZE can only extend the range past the last explicit partition
+            last = max((p for p in existing if p != "pmax"), default=None)
+            missing = [m for m in missing if last is None or partition_name(m) > last]
+            if missing:
+                await conn.execute(text(mysql_add_partitions_sql(table, missing)))
+        else:
+            for month in missing:
+                await conn.execute(text(postgres_partition_sql(table, month)))
+        created[table] = [partition_name(m) for m in missing]
+    return created
+
+
+# Scheduler jobs
+async def maintain_partitions(db: AsyncSession) -> dict:
+    return await ensure_partitions(await db.connection())
+
+
+async def archive_cold_rows(
+    db: AsyncSession,
+    horizon_months: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> dict:
+    from app.db.archive import archive_cutoff, archive_rows
+    from app.features.expense.models import Expense
+    from app.features.income.models import Income
+
+    if not settings.ARCHIVE_ENABLED:
+        # Reads only include *_archive when enabled; moved rows would vanish from the API
+        raise RuntimeError("Archiving requires ARCHIVE_ENABLED=true")
+    cutoff = archive_cutoff(horizon_months)
+    return {
+        "cutoff": cutoff.isoformat(),
+        "expenses": await archive_rows(db, Expense, cutoff, chunk_size),
+        "incomes": await archive_rows(db, Income, cutoff, chunk_size)
+    }
+
+
+async def _run(command: str, args) -> dict:
+    from app.core.database import engine, AsyncSessionLocal
+    import app.db.base  # noqa: F401 - registers every model
+
+    try:
+        if command == "status":
+            async with engine.connect() as conn:
+                return {t: await existing_partitions(conn, t) for t in PARTITIONED_TABLES}
+        if command == "ensure":
+            async with engine.begin() as conn:
+                return await ensure_partitions(conn, args.months_ahead)
+        if command == "archive":
+            async with AsyncSessionLocal() as session:
+                return await archive_cold_rows(session, args.horizon_months, args.chunk_size)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage monthly partitions and the archive tier")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="List partitions per table")
+    ensure = sub.add_parser("ensure", help="Create upcoming monthly partitions")
+    ensure.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD)
+    archive = sub.add_parser("archive", help="Move rows past the horizon to *_archive tables")
+    archive.add_argument("--horizon-months", type=int, default=settings.ARCHIVE_HORIZON_MONTHS)
+    archive.add_argument("--chunk-size", type=int, default=settings.ARCHIVE_CHUNK_SIZE)
+    args = parser.parse_args()
+    if args.command == "archive" and not settings.ARCHIVE_ENABLED:
+        parser.error("archive needs ARCHIVE_ENABLED=true, otherwise archived rows are not read back")
+
+    print(json.dumps(asyncio.run(_run(args.command, args)), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
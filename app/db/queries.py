@@ -0,0 +1,59 @@
+"""
+Hot request-path statements, built once as lambda statements.
+
+A plain `select(...).where(...)` is rebuilt on every call and then walked
+to compute its compiled-cache key. `lambda_stmt` keys the statement on the
+lambda's code location instead: the Core objects are constructed on the
+first call only, and closure values (ids, offset, limit) are extracted as
+bound parameters on later calls.
+
+Only the fixed-shape variants live here; sparse-fieldset queries add
+per-request loader options and keep building their statements inline.
+"""
+from functools import lru_cache
+
+from sqlalchemy import StatementLambdaElement, lambda_stmt, select
+
+from app.db.archive import both_tiers
+from app.features.auth.models import User
+from app.features.category.models import BudgetCategory
+from app.features.expense.models import Expense
+from app.features.income.models import Income
+
+
+@lru_cache(maxsize=None)
+def history(model):
+    """Full-history entity of `model`; both_tiers builds a new alias per call"""
+    return both_tiers(model)
+
+
+def user_by_id(user_id: bytes) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.id == user_id))
+
+
+def user_exists(user_id: bytes) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(1).where(User.id == user_id))
+
+
+def category_exists(category_id: bytes) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(BudgetCategory.id).where(BudgetCategory.id == category_id))
+
+
+def expenses_by_user(user_id: bytes) -> StatementLambdaElement:
+    expenses = history(Expense)
+    return lambda_stmt(lambda: select(expenses).where(expenses.user_id == user_id))
+
+
+def expenses_page(user_id: bytes, skip: int, limit: int) -> StatementLambdaElement:
+    stmt = expenses_by_user(user_id)
+    stmt += lambda s: s.offset(skip).limit(limit)
+    return stmt
+
+
+def incomes_page(user_id: bytes, skip: int, limit: int, newest_first: bool = False) -> StatementLambdaElement:
+    incomes = history(Income)
+    stmt = lambda_stmt(lambda: select(incomes).where(incomes.user_id == user_id))
+    stmt += lambda s: s.offset(skip).limit(limit)
+    if newest_first:
+        stmt += lambda s: s.order_by(incomes.created_at.desc())
+    return stmt
@@ -0,0 +1,171 @@
+"""
+Move users' rows to the shard the hash ring assigns them.
+
+Rows are copied table by table, parents first, EXPENSE_BULK_CHUNK_SIZE rows
+per upsert and commit on the target, then deleted from the source children
+first, in chunks as well. Upserts make a rerun after an interruption safe.
+Tables keyed by an autoincrement id (budget_alerts) are copied without it,
+so the target assigns fresh ids; rows identical to one the user already
+has there (from an interrupted run) are skipped. The change log is not copied: its
+sequence numbers are per database, so a moved user's sync clients have
+to start over with a snapshot.
+
+Run it with the DB_SHARDS configuration the app is about to use; requests
+for a user being moved may miss rows until the move finishes.
+
+Usage:
+    python -m app.db.rebalance --all --dry-run
+    python -m app.db.rebalance --user a3c47a68-9db9-42f5-8a30-16c2d343ddf9
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import Table, select, insert, delete
+
+from app.core.config import settings
+from app.core.database import shard_router
+from app.core.logger import logger
+from app.db.base import Base
+from app.db.sharding import Shard, ShardRouter
+from app.db.upsert import upsert
+from app.features.auth.models import User
+from app.features.sync.models import ChangeLog
+
+
+def user_tables() -> list[Table]:
+    """Tables holding a user's rows, parents before children"""
+    return [
+        table for table in Base.metadata.sorted_tables
+        if table is User.__table__ or "user_id" in table.c
+    ]
+
+
+def _owner_column(table: Table):
+    return table.c.id if table is User.__table__ else table.c.user_id
+
+
+def _surrogate_key(table: Table) -> bool:
+    """Whether the primary key is a per-database autoincrement"""
+    keys = list(table.primary_key.columns)
+    return len(keys) == 1 and keys[0].autoincrement is True
+
+
+async def locate_user(router: ShardRouter, user_id: bytes) -> Optional[Shard]:
+    """Shard currently holding the user's account row"""
+    for shard in router:
+        async with shard.background_sessions() as session:
+            if await session.scalar(select(User.id).where(User.id == user_id)):
+                return shard
+    return None
+
+
+async def move_user(user_id: bytes, source: Shard, target: Shard, chunk_size: int) -> dict[str, int]:
+    """Copy every row of the user from `source` to `target`, then delete it from `source`"""
+    moved: dict[str, int] = {}
+    tables = user_tables()
+    async with source.background_sessions() as src, target.background_sessions() as dst:
+        for table in tables:
+            if table is ChangeLog.__table__:
+                continue
+            key = list(table.primary_key.columns)[0]
+            updates = [c.name for c in table.columns if not c.primary_key]
+            surrogate = _surrogate_key(table)
+            if surrogate:
+                copied = {
+                    tuple(row) for row in
+                    await dst.execute(select(*(table.c[c] for c in updates)).where(_owner_column(table) == user_id))
+                }
+                await dst.rollback()
+            last = None
+            while True:
+                query = select(table).where(_owner_column(table) == user_id).order_by(key).limit(chunk_size)
+                if last is not None:
+                    query = query.where(key > last)
+                rows = [dict(row) for row in (await src.execute(query)).mappings()]
+                await src.rollback()  # End the read transaction between chunks
+                if not rows:
+                    break
+                if surrogate:
+                    new = [{c: row[c] for c in updates} for row in rows]
+                    new = [row for row in new if tuple(row.values()) not in copied]
+                    if new:
+                        await dst.execute(insert(table), new)
+                else:
+                    await upsert(dst, table, rows, updates)
+                await dst.commit()
+                moved[table.name] = moved.get(table.name, 0) + len(rows)
+                last = rows[-1][key.name]
+
+        for table in reversed(tables):
+            key = list(table.primary_key.columns)[0]
+            while True:
+                ids = (await src.execute(
+                    select(key).where(_owner_column(table) == user_id).limit(chunk_size)
+                )).scalars().all()
+                if not ids:
+                    break
+                await src.execute(delete(table).where(key.in_(ids)))
+                await src.commit()
+    return moved
+
+
+async def rebalance(user_ids: list[bytes], move_all: bool, dry_run: bool, chunk_size: int) -> dict:
+    """Move the given users (or every misplaced user) to their ring shard"""
+    started = time.perf_counter()
+    plan: list[tuple[bytes, Shard, Shard]] = []
+    try:
+        if move_all:
+            for shard in shard_router:
+                async with shard.background_sessions() as session:
+                    ids = (await session.execute(select(User.id).order_by(User.id))).scalars().all()
+                for user_id in ids:
+                    target = shard_router.shard_for(user_id)
+                    if target is not shard:
+                        plan.append((user_id, shard, target))
+        for user_id in user_ids:
+            source = await locate_user(shard_router, user_id)
+            if source is None:
+                logger.warning(f"User {UUID(bytes=user_id)} not found on any shard")
+                continue
+            target = shard_router.shard_for(user_id)
+            if target is not source:
+                plan.append((user_id, source, target))
+
+        stats = {"users": len(plan), "rows": 0, "moves": {}}
+        for user_id, source, target in plan:
+            route = f"{source.name}->{target.name}"
+            stats["moves"][route] = stats["moves"].get(route, 0) + 1
+            if dry_run:
+                continue
+            moved = await move_user(user_id, source, target, chunk_size)
+            stats["rows"] += sum(moved.values())
+            logger.info(f"Moved user {UUID(bytes=user_id)} {route}: {moved}")
+    finally:
+        await shard_router.dispose()
+
+    stats["dry_run"] = dry_run
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(f"Shard rebalance finished: {stats}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move users to the shard the hash ring assigns them")
+    parser.add_argument("--user", action="append", default=[], type=UUID, help="User id to move (repeatable)")
+    parser.add_argument("--all", action="store_true", help="Move every user that is on the wrong shard")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would move")
+    parser.add_argument("--chunk-size", type=int, default=settings.EXPENSE_BULK_CHUNK_SIZE, help="Rows per statement")
+    args = parser.parse_args()
+    if not args.user and not args.all:
+        parser.error("Give --user or --all")
+
+    stats = asyncio.run(rebalance([u.bytes for u in args.user], args.all, args.dry_run, args.chunk_size))
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Hash-based user sharding.
+
+Every row owned by a user (the users row itself, categories, expenses,
+incomes, goals, refresh tokens, change log) lives on one database, chosen
+by consistent hashing of the binary user id over the shard names. The
+primary database (DB_* settings) is the shard named "primary"; DB_SHARDS
+adds more by name. Names, not positions, are hashed, so adding a shard only
+moves the users whose ring segment it takes over (run app.db.rebalance).
+
+Requests are routed by the user they name (see request_user_id). Endpoints
+that address a row only by its id ask every shard for it instead, as login
+does for accounts (app.core.database.shard_of_row).
+
+With no DB_SHARDS the ring has a single shard and routing is a no-op.
+"""
+import hashlib
+from bisect import bisect
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+
+PRIMARY = "primary"
+
+_BODY_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def shard_urls() -> dict[str, str]:
+    """Database URL per shard name, primary first (for CLIs with their own engines)"""
+    return {PRIMARY: settings.DATABASE_URL, **settings.DB_SHARDS}
+
+
+def _hash(value: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring with `vnodes` points per node"""
+
+    def __init__(self, nodes: Iterable[str], vnodes: int):
+        points = sorted(
+            (_hash(f"{node}#{i}".encode()), node)
+            for node in nodes
+            for i in range(vnodes)
+        )
+        if not points:
+            raise ValueError("Hash ring needs at least one node")
+        self._hashes = [h for h, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: bytes) -> str:
+        index = bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+@dataclass
+class Shard:
+    name: str
+    engine: AsyncEngine
+    sessions: async_sessionmaker
+    background_engine: AsyncEngine
+    background_sessions: async_sessionmaker
+
+
+class ShardRouter:
+    """Maps binary user ids to shards"""
+
+    def __init__(self, shards: Iterable[Shard], vnodes: int):
+        self.shards = {shard.name: shard for shard in shards}
+        self.primary = self.shards[PRIMARY]
+        self.ring = HashRing(self.shards, vnodes)
+
+    @classmethod
+    def from_settings(
+        cls,
+        primary: Shard,
+        engine_factory: Callable[..., AsyncEngine]
+    ) -> "ShardRouter":
+        shards = [primary]
+        for name, url in settings.DB_SHARDS.items():
+            if name == PRIMARY:
+                raise ValueError(f"Shard name '{PRIMARY}' is reserved for the DB_* database")
+            engine = engine_factory(settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW, url)
+            background = engine_factory(settings.SCHEDULER_POOL_SIZE, 0, url)
+            shards.append(Shard(
+                name=name,
+                engine=engine,
+                sessions=async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False),
+                background_engine=background,
+                background_sessions=async_sessionmaker(bind=background, class_=AsyncSession, expire_on_commit=False)
+            ))
+        return cls(shards, settings.DB_SHARD_VNODES)
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.shards) > 1
+
+    def __iter__(self) -> Iterator[Shard]:
+        return iter(self.shards.values())
+
+    def shard_for(self, user_id: Optional[bytes]) -> Shard:
+        """The user's shard; requests without a user go to the primary"""
+        if user_id is None or not self.sharded:
+            return self.primary
+        return self.shards[self.ring.node_for(user_id)]
+
+    async def shard_holding(self, source, row_id: bytes) -> Optional[Shard]:
+        """Shard where `source` (a mapped class or both_tiers() entity) has the row `row_id`"""
+        for shard in self:
+            async with shard.sessions() as session:
+                if await session.scalar(select(source.id).where(source.id == row_id)) is not None:
+                    return shard
+        return None
+
+    def engines(self) -> list[AsyncEngine]:
+        return [e for shard in self for e in (shard.engine, shard.background_engine)]
+
+    @asynccontextmanager
+    async def session_on(self, shard: Shard, current: AsyncSession) -> AsyncIterator[AsyncSession]:
+        """`current` when it is already on `shard` (or there is one shard), else a new session there"""
+        if not self.sharded or current.bind is shard.engine:
+            yield current
+        else:
+            async with shard.sessions() as session:
+                yield session
+
+    def session_for(self, user_id: bytes, current: AsyncSession):
+        """Session on the user's shard, reusing `current` when it is there"""
+        return self.session_on(self.shard_for(user_id), current)
+
+    def each_shard(self, func: Callable[[AsyncSession], Awaitable[object]]) -> Callable[[AsyncSession], Awaitable[dict]]:
+        """
+        Wrap a scheduler job so it runs on every shard. The scheduler's
+        session (primary, holding the lease) is used for the primary.
+        """
+        async def run(session: AsyncSession) -> dict:
+            results = {PRIMARY: await func(session)}
+            for shard in self:
+                if shard is self.primary:
+                    continue
+                async with shard.background_sessions() as shard_session:
+                    results[shard.name] = await func(shard_session)
+                    await shard_session.commit()
+            return results
+        run.__name__ = getattr(func, "__name__", "job")
+        return run
+
+    async def dispose(self) -> None:
+        for engine in self.engines():
+            await engine.dispose()
+
+
+def parse_id(value) -> Optional[bytes]:
+    if not isinstance(value, str):
+        return None
+    try:
+        if value.startswith("0x"):
+            return UUID(hex=value[2:]).bytes
+        return UUID(value).bytes
+    except ValueError:
+        return None  # The endpoint reports the malformed id
+
+
+async def request_user_id(request: Request) -> Optional[bytes]:
+    """
+    The user a request acts for: `user_id` from the path, query or JSON
+    body, else the subject of the bearer token.
+    """
+    for params in (request.path_params, request.query_params):
+        if params.get("user_id"):
+            return parse_id(params["user_id"])
+
+    if request.method in _BODY_METHODS and request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = await request.json()  # Already parsed (and cached) for endpoints with a body
+        except ValueError:
+            body = None
+        if isinstance(body, dict) and body.get("user_id"):
+            return parse_id(body["user_id"])
+
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        from app.core.security import TokenService  # security imports the database module
+        try:
+            return parse_id(TokenService.verify_token(authorization[7:]).get("sub"))
+        except HTTPException:
+            return None
+    return None
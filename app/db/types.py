@@ -0,0 +1,23 @@
+"""Dialect-portable column types"""
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+
+class BINARY(TypeDecorator):
+    """
+    Fixed-length binary (ids, token digests): BINARY(n) on MySQL, BYTEA on
+    PostgreSQL, BLOB on SQLite. Values are plain `bytes` on every dialect.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, length: int):
+        super().__init__(length)
+        self.length = length
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(mysql.BINARY(self.length))
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.BYTEA())
+        return dialect.type_descriptor(LargeBinary(self.length))
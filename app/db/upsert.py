@@ -0,0 +1,74 @@
+"""
+Multi-row upsert across the dialects we run on.
+
+MySQL uses INSERT ... ON DUPLICATE KEY UPDATE; PostgreSQL and SQLite use
+INSERT ... ON CONFLICT (...) DO UPDATE. The conflict target has to match
+the table's real primary key, which differs from the ORM mapping on
+partitioned tables (id, created_at), so it is read from the database once.
+Other dialects fall back to selecting the existing keys, then inserting
+the new rows and updating the rest; unlike the native statements that is
+not atomic, and a concurrent insert of the same key fails with an
+IntegrityError.
+"""
+from sqlalchemy import Table, and_, bindparam, inspect, insert, or_, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_primary_keys: dict[tuple[str, str], list[str]] = {}
+
+
+async def conflict_columns(db: AsyncSession, table: Table) -> list[str]:
+    """Primary-key columns of `table` as they exist in the database"""
+    key = (db.bind.dialect.name, table.name)
+    if key not in _primary_keys:
+        pk = await db.run_sync(
+            lambda session: inspect(session.connection()).get_pk_constraint(table.name)
+        )
+        _primary_keys[key] = pk["constrained_columns"] or [c.name for c in table.primary_key]
+    return _primary_keys[key]
+
+
+async def upsert(db: AsyncSession, table: Table, rows: list[dict], update_columns: list[str]) -> None:
+    """Insert `rows` in one statement, overwriting `update_columns` on existing keys"""
+    if not rows:
+        return
+    dialect = db.bind.dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(table).values(rows)
+        stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in update_columns})
+    elif dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=await conflict_columns(db, table),
+            set_={c: stmt.excluded[c] for c in update_columns}
+        )
+    else:
+        await select_then_write(db, table, rows, update_columns)
+        return
+    await db.execute(stmt)
+
+
+async def select_then_write(db: AsyncSession, table: Table, rows: list[dict], update_columns: list[str]) -> None:
+    """Portable upsert for dialects without a native one, see the module docstring"""
+    keys = await conflict_columns(db, table)
+    if len(keys) == 1:
+        match = table.c[keys[0]].in_([row[keys[0]] for row in rows])
+    else:
+        match = or_(*(and_(*(table.c[k] == row[k] for k in keys)) for row in rows))
+    found = {tuple(row) for row in await db.execute(select(*(table.c[k] for k in keys)).where(match))}
+
+    existing = [row for row in rows if tuple(row[k] for k in keys) in found]
+    new = [row for row in rows if tuple(row[k] for k in keys) not in found]
+    if new:
+        await db.execute(insert(table), new)
+    if existing and update_columns:
+        stmt = (
+            update(table)
+            .where(and_(*(table.c[k] == bindparam(f"key_{k}") for k in keys)))
+            .values({c: bindparam(f"set_{c}") for c in update_columns})
+        )
+        await db.execute(stmt, [
+            {**{f"key_{k}": row[k] for k in keys}, **{f"set_{c}": row[c] for c in update_columns}}
+            for row in existing
+        ])
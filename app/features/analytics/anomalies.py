@@ -0,0 +1,88 @@
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Scale factor that makes the MAD a consistent estimator of the standard deviation
+MAD_SCALE = 1.4826
+
+
+@dataclass
+class AnomalyScores:
+    """Per-row output of the detector, aligned with the input arrays"""
+    median: np.ndarray
+    score: np.ndarray
+    flagged: np.ndarray
+
+
+def group_codes(keys: list) -> np.ndarray:
+    """
+    Turn an already-sorted list of group keys (e.g. binary category ids)
+    into consecutive integer codes
+    """
+    if not keys:
+        return np.empty(0, dtype=np.int64)
+    changes = np.fromiter(
+        (keys[i] != keys[i - 1] for i in range(1, len(keys))),
+        dtype=bool,
+        count=len(keys) - 1
+    )
+    return np.concatenate(([0], np.cumsum(changes)))
+
+
+def detect_anomalies(
+    codes: np.ndarray,
+    amounts: np.ndarray,
+    window: int,
+    threshold: float,
+    min_history: int
+) -> AnomalyScores:
+    """
+    Score every expense against the rolling median/MAD of the previous
+    `window` expenses in the same category, in one vectorized pass.
+
+    Args:
+        codes: Category code per row, rows sorted by (category, created_at)
+        amounts: Expense amounts aligned with `codes`
+        window: Number of previous expenses forming the baseline
+        threshold: Robust z-score above which an expense is flagged
+        min_history: Minimum previous expenses required before flagging
+    Returns:
+        AnomalyScores: Baseline median, robust z-score and flag per row
+    """
+    n = amounts.size
+    if n == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return AnomalyScores(median=empty, score=empty, flagged=np.empty(0, dtype=bool))
+
+    # 1. Position of each row inside its category
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    lengths = np.diff(np.r_[starts, n])
+    group = np.repeat(np.arange(starts.size), lengths)
+    position = np.arange(n) - starts[group]
+
+    # 2. One NaN-padded row per category, left-padded by `window`
+    matrix = np.full((starts.size, lengths.max() + window), np.nan)
+    matrix[group, position + window] = amounts
+
+    # 3. history[i] holds the `window` amounts preceding row i in its category
+    history = sliding_window_view(matrix, window, axis=1)[group, position]
+    counts = np.count_nonzero(~np.isnan(history), axis=1)
+
+    with warnings.catch_warnings():
+        # Rows without history produce all-NaN slices; they are masked below
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(history, axis=1)
+        mad = np.nanmedian(np.abs(history - median[:, None]), axis=1)
+
+    # Floor the spread so perfectly regular spending (MAD == 0) stays finite
+    spread = np.maximum(MAD_SCALE * mad, np.maximum(0.01 * np.abs(median), 0.01))
+    score = np.where(counts > 0, (amounts - median) / spread, 0.0)
+    flagged = (counts >= min_history) & (score > threshold)
+
+    return AnomalyScores(
+        median=np.nan_to_num(median),
+        score=score,
+        flagged=flagged
+    )
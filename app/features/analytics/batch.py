@@ -0,0 +1,143 @@
+"""
+Batch anomaly scan across all users.
+
+Streams the whole expense history of every shard once (ordered by user),
+ships batches of users to a process pool for the NumPy scoring and reports
+throughput.
+
+Usage:
+    python -m app.features.analytics.batch --workers 4 --out anomalies.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.database import shard_router
+from app.core.logger import logger
+from app.features.analytics.service import history_statement, score_rows
+from app.features.expense.models import Expense
+
+HistoryRow = namedtuple("HistoryRow", "id user_id category_id name amount created_at")
+
+
+def _score_batch(batch: list, window: int, threshold: float, min_history: int) -> list:
+    """Process-pool entry point: score every user in the batch"""
+    results = []
+    for user_id, rows in batch:
+        anomalies = score_rows(rows, window, threshold, min_history)
+        results.append((
+            str(UUID(bytes=user_id)),
+            len(rows),
+            [a.model_dump(mode="json") for a in anomalies]
+        ))
+    return results
+
+
+async def _iter_user_histories(fetch_size: int):
+    """Yield (user_id, rows) for every user on every shard, streaming with a server-side cursor"""
+    for shard in shard_router:
+        async with shard.sessions() as session:
+            stream = await session.stream(
+                history_statement(Expense.user_id).execution_options(yield_per=fetch_size)
+            )
+            current_user, rows = None, []
+            async for row in stream:
+                if row.user_id != current_user and rows:
+                    yield current_user, rows
+                    rows = []
+                current_user = row.user_id
+                rows.append(HistoryRow(*row))
+            if rows:
+                yield current_user, rows
+
+
+async def run_batch(
+    workers: int,
+    batch_size: int,
+    fetch_size: int,
+    out_path: str | None,
+    window: int,
+    threshold: float
+) -> dict:
+    """Scan all users and return throughput statistics"""
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    stats = {"users": 0, "expenses": 0, "anomalies": 0}
+    out = open(out_path, "w", encoding="utf-8") if out_path else None
+
+    def collect(results: list):
+        for user_id, scanned, anomalies in results:
+            stats["users"] += 1
+            stats["expenses"] += scanned
+            stats["anomalies"] += len(anomalies)
+            if out:
+                for anomaly in anomalies:
+                    out.write(json.dumps({"user_id": user_id, **anomaly}) + "\n")
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending, batch = set(), []
+
+            async def submit(batch):
+                # Bound in-flight batches so the reader cannot outrun the pool
+                if len(pending) >= workers * 2:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        pending.discard(future)
+                        collect(future.result())
+                pending.add(loop.run_in_executor(
+                    pool, _score_batch, batch, window, threshold, settings.ANOMALY_MIN_HISTORY
+                ))
+
+            async for user_id, rows in _iter_user_histories(fetch_size):
+                batch.append((user_id, rows))
+                if len(batch) >= batch_size:
+                    await submit(batch)
+                    batch = []
+            if batch:
+                await submit(batch)
+
+            for future in asyncio.as_completed(pending):
+                collect(await future)
+    finally:
+        if out:
+            out.close()
+        await shard_router.dispose()
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["users_per_second"] = round(stats["users"] / elapsed, 1) if elapsed else 0.0
+    stats["expenses_per_second"] = round(stats["expenses"] / elapsed, 1) if elapsed else 0.0
+    logger.info(f"Anomaly batch scan finished: {stats}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan all users for spending anomalies")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=200, help="Users per pool task")
+    parser.add_argument("--fetch-size", type=int, default=5000, help="Rows per cursor fetch")
+    parser.add_argument("--window", type=int, default=settings.ANOMALY_WINDOW)
+    parser.add_argument("--threshold", type=float, default=settings.ANOMALY_THRESHOLD)
+    parser.add_argument("--out", help="Write flagged expenses as JSON lines to this file")
+    args = parser.parse_args()
+
+    stats = asyncio.run(run_batch(
+        workers=args.workers,
+        batch_size=args.batch_size,
+        fetch_size=args.fetch_size,
+        out_path=args.out,
+        window=args.window,
+        threshold=args.threshold
+    ))
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
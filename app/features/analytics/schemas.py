@@ -0,0 +1,40 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import date, datetime
+from uuid import UUID
+from decimal import Decimal
+
+
+class ExpenseAnomaly(BaseModel):
+    expense_id: UUID
+    category_id: UUID
+    name: str
+    amount: Decimal
+    baseline_median: Decimal
+    score: float
+    created_at: datetime
+
+    model_config = ConfigDict(
+        json_encoders={
+            UUID: str,
+            Decimal: float,
+            datetime: lambda v: v.isoformat()
+        }
+    )
+
+
+class AnomalyReport(BaseModel):
+    user_id: UUID
+    window: int
+    threshold: float
+    scanned: int
+    anomalies: list[ExpenseAnomaly]
+
+
+class SeriesResponse(BaseModel):
+    """Gap-filled time series in columnar form: t[i] pairs with total[i] and count[i]"""
+    bucket: str
+    start: date
+    end: date
+    t: list[date]
+    total: list[float]
+    count: list[int]
@@ -0,0 +1,86 @@
+from decimal import Decimal
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.features.analytics.anomalies import detect_anomalies, group_codes
+from app.features.analytics.schemas import AnomalyReport, ExpenseAnomaly
+from app.features.expense.models import Expense
+
+
+def history_statement(*leading_order):
+    """Expense history ordered so each category forms a contiguous, chronological run"""
+    return select(
+        Expense.id,
+        Expense.user_id,
+        Expense.category_id,
+        Expense.name,
+        Expense.amount,
+        Expense.created_at
+    ).order_by(*leading_order, Expense.category_id, Expense.created_at, Expense.id)
+
+
+def score_rows(rows, window: int, threshold: float, min_history: int) -> list[ExpenseAnomaly]:
+    """Run the vectorized detector over one user's history rows"""
+    if not rows:
+        return []
+
+    codes = group_codes([row.category_id for row in rows])
+    amounts = np.fromiter((row.amount for row in rows), dtype=np.float64, count=len(rows))
+    scores = detect_anomalies(codes, amounts, window, threshold, min_history)
+
+    return [
+        ExpenseAnomaly(
+            expense_id=UUID(bytes=rows[i].id),
+            category_id=UUID(bytes=rows[i].category_id),
+            name=rows[i].name,
+            amount=rows[i].amount,
+            baseline_median=Decimal(str(round(float(scores.median[i]), 2))),
+            score=round(float(scores.score[i]), 2),
+            created_at=rows[i].created_at
+        )
+        for i in np.flatnonzero(scores.flagged)
+    ]
+
+
+class AnomalyService:
+    """Spending anomaly detection over per-category expense history"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_user_anomalies(
+        self,
+        user_id: UUID,
+        window: int = settings.ANOMALY_WINDOW,
+        threshold: float = settings.ANOMALY_THRESHOLD
+    ) -> AnomalyReport:
+        """
+        Flag expenses that are unusually large for their category
+        Args:
+            user_id: UUID of the user
+            window: Number of previous expenses forming the baseline
+            threshold: Robust z-score cut-off
+        Returns:
+            AnomalyReport: Flagged expenses, most anomalous first
+        """
+        result = await self.db.execute(
+            history_statement().where(Expense.user_id == user_id.bytes)
+        )
+        rows = result.all()
+
+        anomalies = score_rows(rows, window, threshold, settings.ANOMALY_MIN_HISTORY)
+        anomalies.sort(key=lambda a: a.score, reverse=True)
+
+        logger.info(f"Scanned {len(rows)} expenses for user {user_id}, flagged {len(anomalies)}")
+        return AnomalyReport(
+            user_id=user_id,
+            window=window,
+            threshold=threshold,
+            scanned=len(rows),
+            anomalies=anomalies
+        )
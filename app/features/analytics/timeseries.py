@@ -0,0 +1,98 @@
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.archive import both_tiers
+from app.db.functions import date_bucket
+from app.features.analytics.schemas import SeriesResponse
+
+MAX_BUCKETS = 1000
+DEFAULT_SPAN = {
+    "day": timedelta(days=30),
+    "week": timedelta(weeks=12),
+    "month": timedelta(days=365)
+}
+
+
+def bucket_floor(bucket: str, value: date) -> date:
+    """Start of the bucket containing `value` (matches app.db.functions.date_bucket)"""
+    if bucket == "week":
+        return value - timedelta(days=value.weekday())
+    if bucket == "month":
+        return value.replace(day=1)
+    return value
+
+
+def bucket_starts(bucket: str, start: date, end: date) -> list[date]:
+    """Every bucket start between `start` and `end` inclusive"""
+    current, last, starts = bucket_floor(bucket, start), bucket_floor(bucket, end), []
+    while current <= last:
+        starts.append(current)
+        if len(starts) > MAX_BUCKETS:
+            raise ValueError(f"Range too large: more than {MAX_BUCKETS} {bucket} buckets")
+        if bucket == "month":
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=7 if bucket == "week" else 1)
+    return starts
+
+
+class SeriesService:
+    """Time-bucketed totals aggregated in the database"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_series(
+        self,
+        model,
+        user_id: UUID,
+        bucket: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> SeriesResponse:
+        """
+        Sum `model.amount` per bucket for one user
+        Args:
+            model: Mapped class with user_id, created_at and amount (Expense, Income)
+            user_id: UUID of the user
+            bucket: day | week | month
+            start / end: Inclusive date range (defaults to a span ending today)
+        Returns:
+            SeriesResponse: Gap-filled columnar series
+        """
+        end = end or datetime.utcnow().date()
+        start = start or end - DEFAULT_SPAN[bucket]
+        if start > end:
+            raise ValueError("'from' must not be after 'to'")
+        starts = bucket_starts(bucket, start, end)
+
+        # Served entirely by the (user_id, created_at, amount) index; the
+        # archive tier is only scanned when the range reaches past the horizon
+        since = datetime.combine(start, time.min)
+        source = both_tiers(model, since)
+        bucket_expr = date_bucket(bucket, source.created_at)
+        result = await self.db.execute(
+            select(
+                bucket_expr.label("bucket"),
+                func.sum(source.amount).label("total"),
+                func.count().label("count")
+            )
+            .where(source.user_id == user_id.bytes)
+            .where(source.created_at >= since)
+            .where(source.created_at < datetime.combine(end + timedelta(days=1), time.min))
+            .group_by(bucket_expr)
+        )
+        rows = {row.bucket: row for row in result}
+
+        return SeriesResponse(
+            bucket=bucket,
+            start=start,
+            end=end,
+            t=starts,
+            total=[float(rows[s].total) if s in rows else 0.0 for s in starts],
+            count=[rows[s].count if s in rows else 0 for s in starts]
+        )
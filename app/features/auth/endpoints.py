@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from .schemas import UserCreate, UserResponse, UserLogin, TokenResponse
+from .schemas import UserCreate, UserResponse, UserLogin, TokenResponse, TokenPair, TokenRefreshRequest
 from .service import AuthService
 from app.core.database import get_db
 from app.core.exceptions import ConflictError, AuthenticationError, AccountLockedError
@@ -88,4 +88,32 @@ async def login(
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=str(e)
-        )
\ No newline at end of file
+        )
+
+@router.post(
+    "/refresh",
+    response_model=TokenPair,
+    status_code=status.HTTP_200_OK,
+    responses={
+        401: {"description": "Invalid, expired or reused refresh token"}
+    }
+)
+async def refresh(
+    refresh_data: TokenRefreshRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Exchange a refresh token for a new access/refresh token pair
+
+    - **refresh_token**: Token from the last login or refresh; it is single-use
+    - Reusing an exchanged token revokes every token issued from the same login
+    """
+    service = AuthService(db)
+    try:
+        return await service.refresh_session(refresh_data.refresh_token)
+    except AuthenticationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e.detail),
+            headers={"WWW-Authenticate": "Bearer"}
+        )
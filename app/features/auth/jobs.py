@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import RefreshToken
+
+SWEEP_CHUNK_SIZE = 1000
+
+
+async def purge_expired_refresh_tokens(db: AsyncSession) -> dict:
+    """Delete expired refresh tokens in primary-key chunks to keep locks short"""
+    now = datetime.utcnow()
+    deleted = 0
+    while True:
+        result = await db.execute(
+            select(RefreshToken.token_hash)
+            .where(RefreshToken.expires_at < now)
+            .limit(SWEEP_CHUNK_SIZE)
+        )
+        hashes = result.scalars().all()
+        if not hashes:
+            break
+        await db.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.token_hash.in_(hashes))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        deleted += len(hashes)
+    return {"deleted": deleted}
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Boolean
-from sqlalchemy.dialects.mysql import BINARY
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey
+from app.db.types import BINARY
 from app.db.base import Base
 
 class User(Base):
@@ -46,4 +46,20 @@ class User(Base):
             "phone_number": self.phone_number,
             "is_active": self.is_active,
             "created_at": self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+        }
+
+
+class RefreshToken(Base):
+    """
+    Issued refresh tokens, stored as SHA-256 digests grouped by rotation family.
+
+    A row is marked used when it is exchanged; presenting a used token again
+    means it leaked, and the whole family is revoked.
+    """
+    __tablename__ = "refresh_tokens"
+
+    token_hash = Column(BINARY(32), primary_key=True)
+    family_id = Column(BINARY(16), nullable=False, index=True)
+    user_id = Column(BINARY(16), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    used_at = Column(DateTime, nullable=True)
@@ -52,7 +52,16 @@ class TokenBase(BaseModel):
     token_type: str = "bearer"
     expires_at: datetime
 
-class TokenResponse(TokenBase):
+class TokenPair(TokenBase):
+    """Access token plus its rotating refresh token"""
+    refresh_token: str
+    refresh_expires_at: datetime
+
+class TokenResponse(TokenPair):
     """Full token response with refresh token"""
     access_token: str
-    user: UserResponse  # Reuses your existing UserResponse
\ No newline at end of file
+    user: UserResponse  # Reuses your existing UserResponse
+
+class TokenRefreshRequest(BaseModel):
+    """Schema for refresh requests"""
+    refresh_token: str = Field(..., min_length=1)
\ No newline at end of file
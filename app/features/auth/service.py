@@ -1,26 +1,39 @@
 from typing import Optional
+import asyncio
 import uuid
 from datetime import datetime
-from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import update, delete
 from sqlalchemy.future import select
-from .models import User
-from .schemas import UserCreate, TokenResponse
+from fastapi import HTTPException
+from .models import User, RefreshToken
+from .schemas import UserCreate, TokenResponse, TokenPair
+from app.core.logger import logger
+from app.core.database import shard_router
+from app.db import queries
+from app.db.sharding import ShardRouter
 from app.core.exceptions import (
     ConflictError,
     AuthenticationError,
     AccountLockedError
 )
-from app.core.security import TokenService  # From the security.py we created earlier
+from app.core.security import (
+    TokenService,
+    pwd_context,
+    get_password_hash,
+    verify_password
+)
 
 class AuthService:
-    def __init__(self, db: AsyncSession):
+    """
+    Accounts live on their user's shard: lookups by email/username visit
+    every shard, everything else goes straight to the user's shard.
+    """
+
+    def __init__(self, db: AsyncSession, router: ShardRouter = shard_router):
         self.db = db
-        self.pwd_context = CryptContext(
-            schemes=["bcrypt"], 
-            deprecated="auto",
-            bcrypt__rounds=12
-        )
+        self.router = router
+        self.pwd_context = pwd_context
 
     async def register_user(self, user_data: UserCreate) -> User:
         """
@@ -34,37 +47,50 @@ class AuthService:
             raise ConflictError("Email or username already registered")
 
         user = User(
+            id=uuid.uuid4().bytes,  # Chosen up front: it decides the shard
             email=user_data.email.lower().strip(),
             username=user_data.username.lower().strip(),
             first_name=user_data.first_name.strip(),
             last_name=user_data.last_name.strip(),
-            password_hash=self.get_password_hash(user_data.password),
+            password_hash=await asyncio.to_thread(self.get_password_hash, user_data.password),
             phone_number=self._normalize_phone(user_data.phone_number),
             is_active=True  # Default to active on registration
         )
         
-        self.db.add(user)
-        await self.db.commit()
-        await self.db.refresh(user)
+        async with self.router.session_for(user.id, self.db) as db:
+            db.add(user)
+            await db.commit()
+            await db.refresh(user)
         return user
 
     async def authenticate_user(self, identifier: str, password: str) -> User:
         """
         Authenticate user and return user object if valid
         """
-        user = await self._get_user_by_identifier(identifier.lower().strip())
-        
-        if not user or not self.verify_password(password, user.password_hash):
-            raise AuthenticationError("Invalid credentials")
-        
-        if not user.is_active:
-            raise AccountLockedError("Account is inactive")
-        
-        # Update last login timestamp
-        user.last_login_at = datetime.utcnow()
-        await self.db.commit()
-        
-        return user
+        identifier = identifier.lower().strip()
+        for shard in self.router:
+            async with self.router.session_on(shard, self.db) as db:
+                user = await self._get_user_by_identifier(db, identifier)
+                if not user:
+                    continue
+
+                if not await asyncio.to_thread(self.verify_password, password, user.password_hash):
+                    raise AuthenticationError("Invalid credentials")
+
+                if not user.is_active:
+                    raise AccountLockedError("Account is inactive")
+
+                # Transparently upgrade bcrypt / weaker Argon2 hashes to the current policy
+                if self.pwd_context.needs_update(user.password_hash):
+                    user.password_hash = await asyncio.to_thread(self.get_password_hash, password)
+                    logger.info(f"Rehashed password for user {user.uuid} with current parameters")
+
+                # Update last login timestamp
+                user.last_login_at = datetime.utcnow()
+                await db.commit()
+
+                return user
+        raise AuthenticationError("Invalid credentials")
 
     async def generate_token_response(self, user: User) -> TokenResponse:
         """Generate JWT tokens and prepare the response"""
@@ -74,27 +100,115 @@ class AuthService:
             "username": user.username
         }
         tokens = TokenService.create_tokens(user_data)
+        async with self.router.session_for(user.id, self.db) as db:
+            self._store_refresh_token(db, tokens, user.id)
+            await db.commit()
         
         return TokenResponse(
             access_token=tokens["access_token"],
             refresh_token=tokens["refresh_token"],
             token_type="bearer",
             expires_at=tokens["expires_at"],
+            refresh_expires_at=tokens["refresh_expires_at"],
             user=user.to_response()
         )
 
-    # Helper Methods
-    async def _check_existing_user(self, email: str, username: str) -> bool:
-        result = await self.db.execute(
-            select(User).where(
-                (User.email == email.lower()) | 
-                (User.username == username.lower())
+    async def refresh_session(self, refresh_token: str) -> TokenPair:
+        """
+        Exchange a refresh token for a new token pair (rotation)
+
+        Costs one signature check, a primary-key read of the user and one
+        indexed UPDATE - no password hash. Presenting an already exchanged
+        token revokes its whole family; so does refreshing for an account
+        that was deactivated or deleted since the token was issued.
+        """
+        try:
+            payload = TokenService.verify_token(refresh_token)
+        except HTTPException:
+            raise AuthenticationError("Invalid refresh token")
+
+        if payload.get("type") != "refresh" or not payload.get("fam"):
+            raise AuthenticationError("Invalid token type")
+
+        user_bin = uuid.UUID(payload["sub"]).bytes
+        async with self.router.session_for(user_bin, self.db) as db:
+            now = datetime.utcnow()
+            family_id = uuid.UUID(hex=payload["fam"]).bytes
+
+            user = (await db.execute(queries.user_by_id(user_bin))).scalar_one_or_none()
+            if user is None or not user.is_active:
+                await self._revoke_family(db, family_id)
+                logger.warning(f"Refresh for inactive or deleted user {payload['sub']}, family revoked")
+                raise AccountLockedError("Account is inactive")
+
+            # Claim the token atomically: only one exchange can ever succeed
+            result = await db.execute(
+                update(RefreshToken)
+                .where(RefreshToken.token_hash == TokenService.token_digest(refresh_token))
+                .where(RefreshToken.used_at.is_(None))
+                .where(RefreshToken.expires_at > now)
+                .values(used_at=now)
+                .execution_options(synchronize_session=False)
             )
+            if result.rowcount != 1:
+                # Validly signed but already used or revoked: treat as stolen
+                await self._revoke_family(db, family_id)
+                logger.warning(f"Refresh token reuse detected for user {payload['sub']}, family revoked")
+                raise AuthenticationError("Refresh token is no longer valid")
+
+            # Claims come from the row: email/username may have changed since
+            user_data = {
+                "uuid": user.uuid,
+                "email": user.email,
+                "username": user.username
+            }
+            tokens = TokenService.create_tokens(user_data, family_id=payload["fam"])
+            self._store_refresh_token(db, tokens, user_bin)
+            await db.commit()
+
+        return TokenPair(
+            access_token=tokens["access_token"],
+            refresh_token=tokens["refresh_token"],
+            token_type="bearer",
+            expires_at=tokens["expires_at"],
+            refresh_expires_at=tokens["refresh_expires_at"]
+        )
+
+    # Helper Methods
+    @staticmethod
+    async def _revoke_family(db: AsyncSession, family_id: bytes) -> None:
+        await db.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.family_id == family_id)
+            .execution_options(synchronize_session=False)
         )
-        return result.scalar_one_or_none() is not None
+        await db.commit()
+
+    @staticmethod
+    def _store_refresh_token(db: AsyncSession, tokens: dict, user_id: bytes) -> None:
+        db.add(RefreshToken(
+            token_hash=TokenService.token_digest(tokens["refresh_token"]),
+            family_id=uuid.UUID(hex=tokens["family_id"]).bytes,
+            user_id=user_id,
+            expires_at=tokens["refresh_expires_at"]
+        ))
+
+    async def _check_existing_user(self, email: str, username: str) -> bool:
+        for shard in self.router:
+            async with self.router.session_on(shard, self.db) as db:
+                result = await db.execute(
+                    select(User.id).where(
+                        (User.email == email.lower()) |
+                        (User.username == username.lower())
+                    )
+                )
+                if result.first() is not None:
+                    return True
+        return False
 
-    async def _get_user_by_identifier(self, identifier: str) -> Optional[User]:
-        result = await self.db.execute(
+    @staticmethod
+    async def _get_user_by_identifier(db: AsyncSession, identifier: str) -> Optional[User]:
+        result = await db.execute(
             select(User).where(
                 (User.email == identifier) | 
                 (User.username == identifier)
@@ -103,10 +217,10 @@ class AuthService:
         return result.scalar_one_or_none()
 
     def get_password_hash(self, password: str) -> str:
-        return self.pwd_context.hash(password)
+        return get_password_hash(password)
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return self.pwd_context.verify(plain_password, hashed_password)
+        return verify_password(plain_password, hashed_password)
 
     def _normalize_phone(self, phone: Optional[str]) -> Optional[str]:
         if not phone:
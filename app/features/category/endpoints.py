@@ -1,10 +1,21 @@
+from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.features.category.schemas import BudgetCategoryCreate, BudgetCategoryResponse
+from app.features.category.schemas import (
+    BudgetCategoryCreate,
+    BudgetCategoryResponse,
+    BudgetAlert,
+    BudgetCategoryMerge,
+    BudgetCategoryMergeResult,
+    BudgetCategoryWithExpenses,
+)
+from app.features.category.models import BudgetCategory
+from app.features.category.watcher import budget_watcher
 from app.features.category.service import BudgetCategoryService
-from app.core.database import get_db
+from app.core.database import get_db, shard_of_row
 from app.core.exceptions import CredentialValidationError, NotFoundError
+from app.core.fieldsets import parse_fields, sparse_response
 
 router = APIRouter(
     prefix="/api/v1/budget-categories",
@@ -60,10 +71,66 @@ async def create_category(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Validation error: {str(e)}"
         )
-    
+
+
+@router.post(
+    "/merge",
+    response_model=BudgetCategoryMergeResult,
+    status_code=status.HTTP_200_OK,
+    responses={
+        400: {"description": "Source and target types differ"},
+        404: {"description": "Target or source category not found"}
+    }
+)
+async def merge_categories(
+    merge: BudgetCategoryMerge,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Merge duplicate categories into one
+
+    - Every expense in **source_ids** is moved to **target_id**, then the sources are deleted
+    - **limit_policy**: keep the target's budget_limit, or sum target and sources
+    - All categories must belong to **user_id** and share the target's type
+    - Runs in a single transaction
+    """
+    service = BudgetCategoryService(db)
+    try:
+        return await service.merge_categories(merge)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get(
+    "/alerts",
+    response_model=list[BudgetAlert],
+    responses={
+        400: {"description": "Invalid UUID format"}
+    }
+)
+async def get_budget_alerts(
+    user_id: str = Query(..., description="User ID in UUID format", example="a3c47a68-9db9-42f5-8a30-16c2d343ddf9"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Recent budget threshold alerts for a user, newest first
+
+    - Raised when a month's spend in a category reaches 80% / 100% of its **budget_limit**
+    - Last BUDGET_ALERT_HISTORY alerts per user, the same on every worker
+    """
+    try:
+        uuid_obj = UUID(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid UUID format"
+        )
+    return await budget_watcher.recent_alerts(db, uuid_obj.bytes)
+
 @router.get(
     "/{category_id}",
     response_model=BudgetCategoryResponse,
+    dependencies=[Depends(shard_of_row(BudgetCategory, "category_id"))],
     responses={
         400: {"description": "Invalid category ID format"},
         404: {"description": "Category not found"},
@@ -106,6 +173,7 @@ async def get_category_by_id(
 )
 async def get_categories_by_user(
     user_id: str,  # Accepts both UUID strings and byte strings
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return, e.g. id,name,budget_limit"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -116,12 +184,16 @@ async def get_categories_by_user(
       - Standard UUID format (a3c47a68-9db9-42f5-8a30-16c2d343ddf9)
       - Raw byte string format (0xBE92213C8CAE46238B3F826D43A9A23A)
     
+    - **fields**: Optional sparse fieldset (**id** is always included)
+
     Returns:
     - List of all categories belonging to the user
     """
     service = BudgetCategoryService(db)
     try:
-        return await service.get_categories_by_user(user_id)
+        selected = parse_fields(fields, BudgetCategoryResponse)
+        categories = await service.get_categories_by_user(user_id, selected)
+        return sparse_response(categories) if selected else categories
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -129,3 +201,33 @@ async def get_categories_by_user(
         )
     except NotFoundError as e:
         raise NotFoundError(detail=str(e))
+
+
+@router.get(
+    "/user/{user_id}/with-expenses",
+    response_model=list[BudgetCategoryWithExpenses],
+    responses={
+        400: {"description": "Invalid UUID format"},
+        404: {"description": "No categories found for user"}
+    }
+)
+async def get_categories_with_expenses(
+    user_id: str,
+    recent: int = Query(5, ge=1, le=50, description="Latest expenses returned per category"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    All budget categories of a user with their most recent expenses
+
+    - **recent**: Expenses per category, newest first
+    - Categories and expenses are read in two queries, however many categories there are
+    """
+    try:
+        uuid_obj = UUID(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid UUID format"
+        )
+
+    return await BudgetCategoryService(db).get_categories_with_expenses(uuid_obj, recent)
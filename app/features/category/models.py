@@ -1,6 +1,7 @@
-from sqlalchemy import Column, DateTime, Text, ForeignKey, String
-from sqlalchemy.dialects.mysql import BINARY
+from sqlalchemy import Column, Date, DateTime, Float, Text, ForeignKey, String, BigInteger, Integer, Index
+from app.db.types import BINARY
 from sqlalchemy import Enum as SqlEnum, Numeric
+from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
 from decimal import Decimal
@@ -19,6 +20,16 @@ class BudgetCategory(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    # Read side only (hot tier): expenses are written through category_id. Never
+    # lazy-loaded; query with selectinload()/contains_eager() or it raises
+    expenses = relationship(
+        "Expense",
+        back_populates="category",
+        order_by="(Expense.created_at.desc(), Expense.id.desc())",
+        viewonly=True,
+        lazy="raise"
+    )
+
     # UUID Conversion Methods
     @property
     def uuid(self) -> str | None:
@@ -56,4 +67,25 @@ class BudgetCategory(Base):
             if isinstance(prepared['budget_limit'], Decimal):
                 prepared['budget_limit'] = float(prepared['budget_limit'])
         
-        return prepared
\ No newline at end of file
+        return prepared
+
+
+class BudgetAlertRecord(Base):
+    """
+    Budget threshold alert, stored so every worker serves the same list.
+    category_id has no foreign key: alerts outlive merged categories.
+    """
+    __tablename__ = "budget_alerts"
+    __table_args__ = (
+        Index("ix_budget_alerts_user_id_triggered_at", "user_id", "triggered_at"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    user_id = Column(BINARY(16), ForeignKey("users.id"), nullable=False)
+    category_id = Column(BINARY(16), nullable=False)
+    category_name = Column(String(100), nullable=False)
+    period = Column(Date, nullable=False)
+    threshold = Column(Float, nullable=False)
+    spent = Column(Numeric(12, 2), nullable=False)
+    budget_limit = Column(Numeric(12, 2), nullable=False)
+    triggered_at = Column(DateTime, default=datetime.utcnow, nullable=False)
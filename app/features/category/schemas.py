@@ -1,9 +1,10 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from typing import Literal, Optional
 from decimal import Decimal
 from uuid import UUID
-from datetime import datetime
+from datetime import date, datetime
 from app.core.config import Type
+from app.features.expense.schemas import ExpenseResponse
 
 class BudgetCategoryBase(BaseModel):
     name: str = Field(..., max_length=100, example="Groceries")
@@ -37,4 +38,35 @@ class BudgetCategoryResponse(BudgetCategoryBase):
             datetime: lambda v: v.isoformat(),
             Decimal: lambda v: float(v)
         }
-    )
\ No newline at end of file
+    )
+
+class BudgetCategoryWithExpenses(BudgetCategoryResponse):
+    expenses: list[ExpenseResponse] = Field(..., description="Most recent first")
+
+class BudgetAlert(BaseModel):
+    user_id: UUID
+    category_id: UUID
+    category_name: str
+    period: date  # First day of the budget month
+    threshold: float  # Share of the limit that was crossed, e.g. 0.8
+    spent: Decimal
+    budget_limit: Decimal
+    triggered_at: datetime
+
+class BudgetCategoryMerge(BaseModel):
+    user_id: UUID = Field(..., example="a3c47a68-9db9-42f5-8a30-16c2d343ddf9")
+    target_id: UUID = Field(..., description="Category that is kept")
+    source_ids: list[UUID] = Field(..., min_length=1, max_length=100, description="Categories merged into the target and deleted")
+    limit_policy: Literal["keep", "sum"] = Field("keep", description="keep: target's budget_limit; sum: target + sources")
+
+    @model_validator(mode="after")
+    def check_sources(self):
+        if self.target_id in self.source_ids:
+            raise ValueError("target_id cannot be one of source_ids")
+        self.source_ids = list(dict.fromkeys(self.source_ids))
+        return self
+
+class BudgetCategoryMergeResult(BaseModel):
+    category: BudgetCategoryResponse
+    expenses_moved: int
+    categories_deleted: int
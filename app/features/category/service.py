@@ -1,3 +1,5 @@
+from datetime import date, datetime
+from decimal import Decimal
 from typing import Optional
 from uuid import UUID
 from app.core.exceptions import NotFoundError
@@ -5,10 +7,23 @@ from fastapi import Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.future import select
+from sqlalchemy import update, delete, func
+from sqlalchemy.orm import selectinload
 
 from app.features.category.models import BudgetCategory
-from app.features.category.schemas import BudgetCategoryCreate, BudgetCategoryResponse
+from app.features.category.schemas import (
+    BudgetCategoryCreate,
+    BudgetCategoryResponse,
+    BudgetCategoryMerge,
+    BudgetCategoryMergeResult,
+    BudgetCategoryWithExpenses,
+)
+from app.features.category.watcher import budget_watcher, period_of
+from app.features.expense.models import Expense
+from app.features.sync.changes import UPSERT, DELETE, record_changes
+from app.core.config import settings
 from app.core.logger import logger
+from app.core.fieldsets import load_fields, sparse_model
 from app.core.database import get_db
 
 
@@ -69,28 +84,183 @@ class BudgetCategoryService:
             raise ValueError(f"Invalid ID format: {str(e)}")
     
 
-    async def get_categories_by_user(self, user_id: str | UUID) -> list[BudgetCategoryResponse]:
-        """Retrieve all categories for a user with flexible ID input"""
+    async def get_categories_by_user(
+        self,
+        user_id: str | UUID,
+        fields: Optional[tuple[str, ...]] = None
+    ) -> list[BudgetCategoryResponse]:
+        """Retrieve all categories for a user with flexible ID input (optionally a sparse fieldset)"""
         try:
             # Convert to binary UUID for query
             user_id_bytes = BudgetCategory.uuid_to_bin(user_id)
             
             # Execute query
-            result = await self.db.execute(
+            query = (
                 select(BudgetCategory)
                 .where(BudgetCategory.user_id == user_id_bytes)
                 .order_by(BudgetCategory.created_at.desc())  # Newest first
             )
+            if fields:
+                query = query.options(load_fields(BudgetCategory, fields))
+            result = await self.db.execute(query)
             categories = result.scalars().all()
             
             if not categories:
                 raise NotFoundError("No categories found for this user")
                 
+            if fields:
+                schema = sparse_model(BudgetCategoryResponse, fields)
+                return [schema.model_validate(cat) for cat in categories]
             return [self._category_to_response(cat) for cat in categories]
             
         except ValueError as e:
             raise ValueError(f"Invalid user ID format: {str(e)}")
 
+    async def get_categories_with_expenses(
+        self,
+        user_id: UUID,
+        recent: int
+    ) -> list[BudgetCategoryWithExpenses]:
+        """
+        The user's categories, newest first, each with its `recent` latest
+        expenses. Two queries in total: the categories, then one selectinload
+        IN query whose expenses are cut per category by a row_number() window.
+        Only the hot tier is read; archived expenses are never recent.
+        """
+        user_bin = user_id.bytes
+        ranked = (
+            select(
+                Expense.id,
+                func.row_number().over(
+                    partition_by=Expense.category_id,
+                    order_by=(Expense.created_at.desc(), Expense.id.desc())
+                ).label("position")
+            )
+            .where(Expense.user_id == user_bin)
+            .subquery()
+        )
+        latest = select(ranked.c.id).where(ranked.c.position <= recent)
+        query = (
+            select(BudgetCategory)
+            .where(BudgetCategory.user_id == user_bin)
+            .order_by(BudgetCategory.created_at.desc())
+            .options(selectinload(BudgetCategory.expenses.and_(Expense.id.in_(latest))))
+        )
+        categories = (await self.db.execute(query)).scalars().all()
+        if not categories:
+            raise NotFoundError("No categories found for this user")
+        return [BudgetCategoryWithExpenses.model_validate(category) for category in categories]
+
+    async def merge_categories(self, merge: BudgetCategoryMerge) -> BudgetCategoryMergeResult:
+        """
+        Merge source categories into a target in one transaction
+        Args:
+            merge: Target, sources and budget_limit policy
+        Returns:
+            BudgetCategoryMergeResult: The target after the merge and row counts
+        Raises:
+            NotFoundError: If the target or a source doesn't exist for this user
+            ValueError: If a source has a different type than the target
+        """
+        user_bin = merge.user_id.bytes
+        target_bin = merge.target_id.bytes
+        source_bins = [source.bytes for source in merge.source_ids]
+        try:
+            # Lock the categories so no expense is added to a source meanwhile
+            categories = {
+                category.id: category
+                for category in (await self.db.execute(
+                    select(BudgetCategory)
+                    .where(BudgetCategory.id.in_([target_bin, *source_bins]))
+                    .where(BudgetCategory.user_id == user_bin)
+                    .with_for_update()
+                )).scalars()
+            }
+            target = categories.get(target_bin)
+            if target is None:
+                raise NotFoundError("Target category not found")
+            missing = [str(UUID(bytes=s)) for s in source_bins if s not in categories]
+            if missing:
+                raise NotFoundError(f"Source categories not found: {', '.join(missing)}")
+            if any(categories[s].type != target.type for s in source_bins):
+                raise ValueError(f"All source categories must have type {target.type.value}")
+
+            spend: dict[tuple[bytes, date], Decimal] = {}
+            moved = await self._repoint_expenses(user_bin, source_bins, target_bin, spend)
+
+            if merge.limit_policy == "sum":
+                target.budget_limit += sum(categories[s].budget_limit for s in source_bins)
+            target.updated_at = datetime.utcnow()
+            deleted = await self.db.execute(
+                delete(BudgetCategory)
+                .where(BudgetCategory.id.in_(source_bins))
+                .where(BudgetCategory.user_id == user_bin)
+            )
+            await record_changes(self.db, "categories", user_bin, source_bins, DELETE)
+            await self.db.commit()
+            await self.db.refresh(target)
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Category merge failed: {str(e)}")
+            raise
+
+        try:
+            await budget_watcher.record_bulk(self.db, user_bin, spend)
+        except Exception as e:
+            logger.error(f"Budget watcher update failed: {str(e)}")
+        logger.info(
+            f"Merged {deleted.rowcount} categories into {merge.target_id} for user {merge.user_id}, "
+            f"{moved} expenses moved"
+        )
+        return BudgetCategoryMergeResult(
+            category=self._category_to_response(target),
+            expenses_moved=moved,
+            categories_deleted=deleted.rowcount
+        )
+
+    async def _repoint_expenses(
+        self,
+        user_bin: bytes,
+        source_bins: list[bytes],
+        target_bin: bytes,
+        spend: dict[tuple[bytes, date], Decimal]
+    ) -> int:
+        """
+        Move expenses (both tiers) to the target in primary-key chunks; no commit.
+        Adds the spend moved per (category_id, month) to `spend`
+        """
+        now = datetime.utcnow().replace(microsecond=0)
+        tables = [Expense.__table__]
+        if settings.ARCHIVE_ENABLED:
+            tables.append(Expense.__archive__)
+        moved = 0
+        for table in tables:
+            conditions = [table.c.user_id == user_bin, table.c.category_id.in_(source_bins)]
+            while True:
+                # Moved rows no longer match, so each pass picks up the next chunk
+                rows = (await self.db.execute(
+                    select(table.c.id, table.c.category_id, table.c.created_at, table.c.amount)
+                    .where(*conditions)
+                    .order_by(table.c.id)
+                    .limit(settings.EXPENSE_BULK_CHUNK_SIZE)
+                )).all()
+                if not rows:
+                    break
+                ids = [row.id for row in rows]
+                result = await self.db.execute(
+                    update(table)
+                    .where(table.c.id.in_(ids))
+                    .where(*conditions)
+                    .values(category_id=target_bin, updated_at=now)
+                )
+                await record_changes(self.db, "expenses", user_bin, ids, UPSERT)
+                moved += result.rowcount
+                for row in rows:
+                    period = period_of(row.created_at)
+                    spend[row.category_id, period] = spend.get((row.category_id, period), 0) - row.amount
+                    spend[target_bin, period] = spend.get((target_bin, period), 0) + row.amount
+        return moved
+
     def _category_to_response(self, category: BudgetCategory) -> BudgetCategoryResponse:
         """Convert DB model to Pydantic response"""
         return BudgetCategoryResponse(
@@ -0,0 +1,241 @@
+"""
+Budget threshold alerts from in-memory running totals.
+
+Spend per (user, category, month) is kept in a bounded LRU. The first
+write to a key seeds it with one aggregate query; later writes add their
+delta in O(1). When a total crosses a threshold share of the category's
+budget_limit (BUDGET_ALERT_THRESHOLDS) upwards, an alert is emitted to the
+subscribed handlers and stored in budget_alerts, so every worker serves
+the same recent-alert list.
+
+Totals are per worker process, so entries are re-seeded after
+BUDGET_WATCHER_TTL seconds; that also picks up writes made by other
+workers or by plain SQL. Writers must record after their commit; when
+recording is delayed (event handlers), pass the times around the commit:
+a seed that started after it includes the change, one that finished
+before it does not, and an overlapping one is re-seeded. Set-based writes
+invalidate the user's totals and then record their aggregated deltas, so
+the re-seed still detects the thresholds they crossed.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import metrics
+from app.db.archive import both_tiers
+from app.db.partitions import add_months
+from app.features.category.models import BudgetCategory, BudgetAlertRecord
+from app.features.category.schemas import BudgetAlert
+from app.features.expense.models import Expense
+
+# (user_id, category_id, first day of month)
+BudgetKey = tuple[bytes, bytes, date]
+
+
+@dataclass
+class _RunningTotal:
+    name: str
+    spent: Decimal
+    limit: Decimal
+    level: int  # Number of thresholds currently reached
+    seeded_at: float
+    seeded_wall: datetime  # UTC time the seed query started; commits before it are included
+    seeded_done: datetime  # UTC time it returned; commits starting after it are not
+
+
+def period_of(created_at: datetime) -> date:
+    return date(created_at.year, created_at.month, 1)
+
+
+class BudgetWatcher:
+    """Running category spend per month, with threshold alerts"""
+
+    def __init__(self, thresholds: Iterable[float], max_size: int, ttl: int, history: int):
+        self.thresholds = sorted(thresholds)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.history = history
+        self._totals: OrderedDict[BudgetKey, _RunningTotal] = OrderedDict()
+        self._handlers: list[Callable[[BudgetAlert], None]] = []
+        self._seeds = metrics.counter("budget_watcher_seeds", "Running totals seeded from the database")
+        self._updates = metrics.counter("budget_watcher_updates", "Running totals updated in memory")
+        self._alerts_total = metrics.counter("budget_alerts_total", "Budget threshold alerts emitted")
+
+    def subscribe(self, handler: Callable[[BudgetAlert], None]) -> None:
+        """Call `handler` with every alert emitted from now on"""
+        self._handlers.append(handler)
+
+    async def recent_alerts(self, db: AsyncSession, user_id: bytes) -> list[BudgetAlert]:
+        """The user's latest alerts, newest first"""
+        records = (await db.execute(
+            select(BudgetAlertRecord)
+            .where(BudgetAlertRecord.user_id == user_id)
+            .order_by(BudgetAlertRecord.triggered_at.desc(), BudgetAlertRecord.id.desc())
+            .limit(self.history)
+        )).scalars()
+        return [
+            BudgetAlert(
+                user_id=UUID(bytes=r.user_id),
+                category_id=UUID(bytes=r.category_id),
+                category_name=r.category_name,
+                period=r.period,
+                threshold=r.threshold,
+                spent=r.spent,
+                budget_limit=r.budget_limit,
+                triggered_at=r.triggered_at
+            )
+            for r in records
+        ]
+
+    async def record(
+        self,
+        db: AsyncSession,
+        changes: Iterable[tuple[bytes, bytes, datetime, Decimal]],
+        committed: Optional[tuple[datetime, datetime]] = None
+    ) -> list[BudgetAlert]:
+        """
+        Apply committed spend changes; alerts are stored and committed on `db`
+        Args:
+            db: Session used to seed unknown totals and store alerts
+            changes: (user_id, category_id, created_at, amount delta) per write;
+                     an update is a negative delta on the old row plus a positive one on the new
+            committed: UTC times just before and after the changes' commit, if recorded later
+        Returns:
+            list[BudgetAlert]: Alerts emitted by these changes
+        """
+        deltas: dict[BudgetKey, Decimal] = {}
+        for user_id, category_id, created_at, amount in changes:
+            key = (user_id, category_id, period_of(created_at))
+            deltas[key] = deltas.get(key, Decimal("0")) + amount
+
+        alerts = []
+        now = time.monotonic()
+        for key, delta in deltas.items():
+            entry = self._totals.get(key)
+            fresh = entry is not None and now - entry.seeded_at < self.ttl
+            if fresh and committed is not None:
+                started, finished = committed
+                if finished <= entry.seeded_wall:
+                    continue  # Already part of the seeded total
+                fresh = started >= entry.seeded_done  # Otherwise the seed may or may not include it
+            if fresh:
+                entry.spent += delta
+                self._totals.move_to_end(key)
+                self._updates.inc()
+                before = entry.level
+            else:
+                # The seed already includes this delta: the write is committed
+                seeded = await self._seed(db, key, now)
+                if seeded is None:
+                    self._totals.pop(key, None)
+                    continue
+                before = entry.level if entry is not None else self._level(seeded.spent - delta, seeded.limit)
+                entry = seeded
+            entry.level = self._level(entry.spent, entry.limit)
+            for threshold in self.thresholds[before:entry.level]:
+                alerts.append(self._emit(key, entry, threshold))
+
+        if alerts:
+            db.add_all(BudgetAlertRecord(
+                user_id=a.user_id.bytes, category_id=a.category_id.bytes, category_name=a.category_name,
+                period=a.period, threshold=a.threshold, spent=a.spent, budget_limit=a.budget_limit,
+                triggered_at=a.triggered_at
+            ) for a in alerts)
+            await db.commit()
+        return alerts
+
+    async def record_bulk(self, db: AsyncSession, user_id: bytes, deltas: dict[tuple[bytes, date], Decimal]) -> list[BudgetAlert]:
+        """
+        Apply a committed set-based write: drop the user's totals, then record
+        the summed delta per (category_id, month) so the re-seeded totals
+        still alert on the thresholds the write crossed
+        """
+        self.invalidate(user_id)
+        return await self.record(db, [
+            (user_id, category_id, datetime.combine(period, datetime.min.time()), delta)
+            for (category_id, period), delta in deltas.items() if delta
+        ])
+
+    def invalidate(self, user_id: bytes, category_id: Optional[bytes] = None) -> None:
+        """Drop totals of a user (or one of their categories) so the next write re-seeds"""
+        for key in [k for k in self._totals if k[0] == user_id and category_id in (None, k[1])]:
+            del self._totals[key]
+
+    def clear(self) -> None:
+        self._totals.clear()
+
+    def __len__(self) -> int:
+        return len(self._totals)
+
+    def _level(self, spent: Decimal, limit: Decimal) -> int:
+        if limit <= 0:
+            return 0
+        ratio = float(spent / limit)
+        return sum(1 for threshold in self.thresholds if ratio >= threshold)
+
+    async def _seed(self, db: AsyncSession, key: BudgetKey, now: float) -> Optional[_RunningTotal]:
+        user_id, category_id, period = key
+        start = datetime.combine(period, datetime.min.time())
+        end = datetime.combine(add_months(period, 1), datetime.min.time())
+        seeded_wall = datetime.utcnow()
+        expenses = both_tiers(Expense, start)
+        spent = (
+            select(func.coalesce(func.sum(expenses.amount), 0))
+            .where(expenses.user_id == user_id, expenses.category_id == category_id)
+            .where(expenses.created_at >= start, expenses.created_at < end)
+            .scalar_subquery()
+        )
+        row = (await db.execute(
+            select(BudgetCategory.name, BudgetCategory.budget_limit, spent.label("spent"))
+            .where(BudgetCategory.id == category_id, BudgetCategory.user_id == user_id)
+        )).one_or_none()
+        self._seeds.inc()
+        if row is None:
+            return None
+        entry = _RunningTotal(row.name, Decimal(row.spent), row.budget_limit, 0, now, seeded_wall, datetime.utcnow())
+        self._totals[key] = entry
+        self._totals.move_to_end(key)
+        while len(self._totals) > self.max_size:
+            self._totals.popitem(last=False)
+        return entry
+
+    def _emit(self, key: BudgetKey, entry: _RunningTotal, threshold: float) -> BudgetAlert:
+        user_id, category_id, period = key
+        alert = BudgetAlert(
+            user_id=UUID(bytes=user_id),
+            category_id=UUID(bytes=category_id),
+            category_name=entry.name,
+            period=period,
+            threshold=threshold,
+            spent=entry.spent,
+            budget_limit=entry.limit,
+            triggered_at=datetime.utcnow()
+        )
+        self._alerts_total.inc()
+        logger.info(
+            f"Budget alert: {entry.name} at {threshold:.0%} for user {alert.user_id} "
+            f"({entry.spent}/{entry.limit}, {period:%Y-%m})"
+        )
+        for handler in self._handlers:
+            try:
+                handler(alert)
+            except Exception as e:
+                logger.error(f"Budget alert handler failed: {str(e)}")
+        return alert
+
+
+budget_watcher = BudgetWatcher(
+    settings.BUDGET_ALERT_THRESHOLDS,
+    settings.BUDGET_WATCHER_SIZE,
+    settings.BUDGET_WATCHER_TTL,
+    settings.BUDGET_ALERT_HISTORY
+)
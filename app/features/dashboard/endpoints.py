@@ -0,0 +1,39 @@
+from uuid import UUID
+from fastapi import APIRouter, HTTPException, status, Query
+from app.features.dashboard.schemas import DashboardResponse
+from app.features.dashboard.service import DashboardService
+
+router = APIRouter(
+    prefix="/api/v1/dashboard",
+    tags=["Dashboard"],
+    responses={
+        400: {"description": "Invalid UUID format"}
+    }
+)
+
+
+@router.get(
+    "",
+    response_model=DashboardResponse,
+    status_code=status.HTTP_200_OK
+)
+async def get_dashboard(
+    user_id: str = Query(..., description="User ID in UUID format", example="550e8400-e29b-41d4-a716-446655440000")
+):
+    """
+    Month-to-date summary for the home screen
+
+    - **income** / **expenses** / **net**: Totals since the first of the month
+    - **top_categories**: Highest-spend categories with budget utilization
+    - **goals**: Progress of every savings goal
+    - **partial** / **missing**: Sections that did not finish within the DB-time budget
+    """
+    try:
+        uuid_obj = UUID(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid UUID format"
+        )
+
+    return await DashboardService().get_summary(uuid_obj)
@@ -0,0 +1,47 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from uuid import UUID
+from decimal import Decimal
+from typing import Optional
+
+
+class CategorySpend(BaseModel):
+    category_id: UUID
+    name: str
+    spent: Decimal
+    budget_limit: Decimal
+    utilization: float
+
+    model_config = ConfigDict(json_encoders={UUID: str, Decimal: float})
+
+
+class GoalProgress(BaseModel):
+    id: UUID
+    name: str
+    target_amount: Decimal
+    saved_amount: Decimal
+    progress: float
+    is_achieved: bool
+
+    model_config = ConfigDict(json_encoders={UUID: str, Decimal: float})
+
+
+class DashboardResponse(BaseModel):
+    user_id: UUID
+    period_start: datetime
+    generated_at: datetime
+    income: Optional[Decimal] = None
+    expenses: Optional[Decimal] = None
+    net: Optional[Decimal] = None
+    top_categories: Optional[list[CategorySpend]] = None
+    goals: Optional[list[GoalProgress]] = None
+    partial: bool = False
+    missing: list[str] = []
+
+    model_config = ConfigDict(
+        json_encoders={
+            UUID: str,
+            Decimal: float,
+            datetime: lambda v: v.isoformat()
+        }
+    )
@@ -0,0 +1,142 @@
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import shard_router
+from app.core.logger import logger
+from app.features.category.models import BudgetCategory
+from app.features.dashboard.schemas import CategorySpend, DashboardResponse, GoalProgress
+from app.features.expense.models import Expense
+from app.features.income.models import Income
+from app.features.savingsgoal.models import SavingsGoal
+
+
+class DashboardService:
+    """
+    Home screen summary in a single request.
+
+    Every aggregate runs in its own session (and therefore on its own pooled
+    connection) so they execute concurrently. All of them share one deadline;
+    anything that misses it is reported in `missing` instead of failing the
+    whole response.
+    """
+
+    def __init__(self, session_factory: Optional[async_sessionmaker] = None):
+        self.session_factory = session_factory  # Default: request pool of the user's shard
+
+    def _sessions(self, user_bin: bytes) -> async_sessionmaker:
+        return self.session_factory or shard_router.shard_for(user_bin).sessions
+
+    async def get_summary(self, user_id: UUID) -> DashboardResponse:
+        now = datetime.utcnow()
+        period_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        user_bin = user_id.bytes
+
+        sections = {
+            "income": self._income_total(user_bin, period_start),
+            "expenses": self._expense_total(user_bin, period_start),
+            "top_categories": self._top_categories(user_bin, period_start),
+            "goals": self._goal_progress(user_bin),
+        }
+
+        # One shared deadline for all sub-queries, measured from now
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.DASHBOARD_DB_BUDGET_MS / 1000
+
+        async def within_budget(coro):
+            return await asyncio.wait_for(coro, timeout=max(deadline - loop.time(), 0))
+
+        results = await asyncio.gather(
+            *(within_budget(coro) for coro in sections.values()),
+            return_exceptions=True
+        )
+
+        summary = DashboardResponse(
+            user_id=user_id,
+            period_start=period_start,
+            generated_at=now
+        )
+        for name, result in zip(sections, results):
+            if isinstance(result, BaseException):
+                reason = "timeout" if isinstance(result, asyncio.TimeoutError) else str(result)
+                logger.warning(f"Dashboard section '{name}' unavailable for user {user_id}: {reason}")
+                summary.missing.append(name)
+            else:
+                setattr(summary, name, result)
+
+        if summary.income is not None and summary.expenses is not None:
+            summary.net = summary.income - summary.expenses
+        summary.partial = bool(summary.missing)
+        return summary
+
+    # Sub-queries (each on its own connection)
+    async def _income_total(self, user_bin: bytes, since: datetime) -> Decimal:
+        async with self._sessions(user_bin)() as session:
+            result = await session.execute(
+                select(func.coalesce(func.sum(Income.amount), Decimal('0')))
+                .where(Income.user_id == user_bin)
+                .where(Income.created_at >= since)
+            )
+            return Decimal(result.scalar_one())
+
+    async def _expense_total(self, user_bin: bytes, since: datetime) -> Decimal:
+        async with self._sessions(user_bin)() as session:
+            result = await session.execute(
+                select(func.coalesce(func.sum(Expense.amount), Decimal('0')))
+                .where(Expense.user_id == user_bin)
+                .where(Expense.created_at >= since)
+            )
+            return Decimal(result.scalar_one())
+
+    async def _top_categories(self, user_bin: bytes, since: datetime) -> list[CategorySpend]:
+        spent = func.sum(Expense.amount).label("spent")
+        async with self._sessions(user_bin)() as session:
+            result = await session.execute(
+                select(BudgetCategory.id, BudgetCategory.name, BudgetCategory.budget_limit, spent)
+                .join(Expense, Expense.category_id == BudgetCategory.id)
+                .where(Expense.user_id == user_bin)
+                .where(Expense.created_at >= since)
+                .group_by(BudgetCategory.id, BudgetCategory.name, BudgetCategory.budget_limit)
+                .order_by(spent.desc())
+                .limit(settings.DASHBOARD_TOP_CATEGORIES)
+            )
+            return [
+                CategorySpend(
+                    category_id=UUID(bytes=row.id),
+                    name=row.name,
+                    spent=row.spent,
+                    budget_limit=row.budget_limit,
+                    utilization=float(row.spent / row.budget_limit) if row.budget_limit else 0.0
+                )
+                for row in result
+            ]
+
+    async def _goal_progress(self, user_bin: bytes) -> list[GoalProgress]:
+        async with self._sessions(user_bin)() as session:
+            result = await session.execute(
+                select(
+                    SavingsGoal.id,
+                    SavingsGoal.name,
+                    SavingsGoal.target_amount,
+                    SavingsGoal.saved_amount
+                )
+                .where(SavingsGoal.user_id == user_bin)
+                .order_by(SavingsGoal.created_at)
+            )
+            return [
+                GoalProgress(
+                    id=UUID(bytes=row.id),
+                    name=row.name,
+                    target_amount=row.target_amount,
+                    saved_amount=row.saved_amount,
+                    progress=float(row.saved_amount / row.target_amount) if row.target_amount else 0.0,
+                    is_achieved=row.saved_amount >= row.target_amount
+                )
+                for row in result
+            ]
@@ -1,10 +1,25 @@
+from datetime import date
+from typing import Literal, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.features.expense.schemas import ExpenseCreate, ExpenseResponse
+from app.features.expense.schemas import (
+    ExpenseCreate,
+    ExpenseResponse,
+    ExpenseBulkDelete,
+    ExpenseBulkUpdate,
+    ExpenseBulkResult,
+    ExpenseWithCategory,
+)
 from app.features.expense.service import ExpenseService
+from app.features.analytics.schemas import AnomalyReport, SeriesResponse
+from app.features.analytics.service import AnomalyService
+from app.features.analytics.timeseries import SeriesService
+from app.features.expense.models import Expense
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.exceptions import NotFoundError
+from app.core.fieldsets import parse_fields, sparse_response
 
 router = APIRouter(
     prefix="/api/v1/expenses",
@@ -40,6 +55,50 @@ async def create_expense(
     service = ExpenseService(db)
     return await service.create_expense(expense_data)
 
+@router.patch(
+    "/bulk",
+    response_model=ExpenseBulkResult,
+    status_code=status.HTTP_200_OK,
+    responses={
+        404: {"description": "Category not found"},
+        422: {"description": "Neither or both of ids/filter, or nothing to change"}
+    }
+)
+async def bulk_update_expenses(
+    request: ExpenseBulkUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Update many expenses at once
+
+    - Select with **ids** (up to EXPENSE_BULK_MAX_IDS) or a **filter**, not both
+    - Sets any of **category_id**, **is_essential**, **payment_method**
+    - Only the user's own expenses are touched; runs in primary-key chunks, each committed on its own
+    """
+    return await ExpenseService(db).bulk_update(request)
+
+
+@router.delete(
+    "/bulk",
+    response_model=ExpenseBulkResult,
+    status_code=status.HTTP_200_OK,
+    responses={
+        422: {"description": "Neither or both of ids/filter"}
+    }
+)
+async def bulk_delete_expenses(
+    request: ExpenseBulkDelete,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Delete many expenses at once
+
+    - Select with **ids** (up to EXPENSE_BULK_MAX_IDS) or a **filter**, not both
+    - Only the user's own expenses are deleted; runs in primary-key chunks, each committed on its own
+    """
+    return await ExpenseService(db).bulk_delete(request)
+
+
 @router.get(
     "/",
     response_model=list[ExpenseResponse],
@@ -52,12 +111,14 @@ async def create_expense(
 )
 async def get_all_expenses(
     user_id: str = Query(..., description="User ID in UUID format", example="550e8400-e29b-41d4-a716-446655440000"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return, e.g. id,amount,created_at"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Retrieve all expenses for a specific user
     
     - **user_id**: UUID of the user (must be valid UUID format)
+    - **fields**: Optional sparse fieldset; only these columns are read and returned (**id** is always included)
     - Returns: List of all expense records
     """
     try:
@@ -68,9 +129,14 @@ async def get_all_expenses(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid UUID format"
         )
+    try:
+        selected = parse_fields(fields, ExpenseResponse)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     service = ExpenseService(db)
-    return await service.get_all_expenses(uuid_obj)
+    expenses = await service.get_all_expenses(uuid_obj, selected)
+    return sparse_response(expenses) if selected else expenses
 
 
 @router.get("/getExpenseByUserId", response_model=list[ExpenseResponse]) 
@@ -78,6 +144,7 @@ async def read_expenses(
     user_id: str = Query(..., example="0x3D7D9ED3F6214FF59EDB5D032AC18683"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return, e.g. id,amount,created_at"),
     db: AsyncSession = Depends(get_db)
       ):
     """
@@ -85,5 +152,112 @@ async def read_expenses(
     - 0x-prefixed: 0x3D7D9ED3F6214FF59EDB5D032AC18683
     - Standard UUID: 3D7D9ED3-F621-4FF5-9EDB-5D032AC18683
     - Raw hex: 3D7D9ED3F6214FF59EDB5D032AC18683
+
+    **fields** limits the columns read and returned (**id** is always included)
+    """
+    try:
+        selected = parse_fields(fields, ExpenseResponse)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    expenses = await ExpenseService.get_expenses_by_user(user_id, db, skip, limit, selected)
+    return sparse_response(expenses) if selected else expenses
+
+
+@router.get(
+    "/with-category",
+    response_model=list[ExpenseWithCategory],
+    status_code=status.HTTP_200_OK,
+    responses={
+        400: {"description": "Invalid UUID format"}
+    }
+)
+async def read_expenses_with_category(
+    user_id: str = Query(..., description="User ID in UUID format", example="550e8400-e29b-41d4-a716-446655440000"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Expenses, newest first, with their category's **name** and **type**
+
+    - Read with one JOIN, so no per-category lookups are needed
+    """
+    try:
+        uuid_obj = UUID(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid UUID format"
+        )
+
+    return await ExpenseService(db).get_expenses_with_category(uuid_obj, skip, limit)
+
+
+@router.get(
+    "/anomalies",
+    response_model=AnomalyReport,
+    status_code=status.HTTP_200_OK,
+    responses={
+        400: {"description": "Invalid UUID format"}
+    }
+)
+async def get_expense_anomalies(
+    user_id: str = Query(..., description="User ID in UUID format", example="550e8400-e29b-41d4-a716-446655440000"),
+    window: int = Query(settings.ANOMALY_WINDOW, ge=3, le=100, description="Previous expenses per category used as baseline"),
+    threshold: float = Query(settings.ANOMALY_THRESHOLD, gt=0, description="Robust z-score cut-off"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Flag unusually large expenses per category
+
+    - **user_id**: UUID of the user
+    - **window**: Rolling baseline size (previous expenses in the same category)
+    - **threshold**: Robust z-score (median/MAD) above which an expense is flagged
+    - Returns: Flagged expenses, most anomalous first
+    """
+    try:
+        uuid_obj = UUID(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid UUID format"
+        )
+
+    service = AnomalyService(db)
+    return await service.get_user_anomalies(uuid_obj, window, threshold)
+
+
+@router.get(
+    "/series",
+    response_model=SeriesResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        400: {"description": "Invalid UUID format or date range"}
+    }
+)
+async def get_expense_series(
+    user_id: str = Query(..., description="User ID in UUID format", example="550e8400-e29b-41d4-a716-446655440000"),
+    bucket: Literal["day", "week", "month"] = Query("day"),
+    start: Optional[date] = Query(None, alias="from", description="First day (inclusive)"),
+    end: Optional[date] = Query(None, alias="to", description="Last day (inclusive), defaults to today"),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    return await ExpenseService.get_expenses_by_user(user_id, db, skip, limit)
\ No newline at end of file
+    Expense totals per day, week (Monday start) or month
+
+    - Aggregated in the database; empty buckets are filled with zeros
+    - Columnar response: **t[i]** is the bucket start for **total[i]** and **count[i]**
+    """
+    try:
+        uuid_obj = UUID(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid UUID format"
+        )
+
+    try:
+        return await SeriesService(db).get_series(Expense, uuid_obj, bucket, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -0,0 +1,26 @@
+"""Events published by ExpenseService after its writes commit"""
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+from app.core.events import DomainEvent
+
+
+@dataclass(frozen=True)
+class ExpenseCreated(DomainEvent):
+    expense_id: bytes
+    category_id: bytes
+    amount: Decimal
+    created_at: datetime
+
+
+@dataclass(frozen=True)
+class ExpensesBulkUpdated(DomainEvent):
+    affected: int
+    chunks: int
+
+
+@dataclass(frozen=True)
+class ExpensesBulkDeleted(DomainEvent):
+    affected: int
+    chunks: int
@@ -1,15 +1,23 @@
-from sqlalchemy import Column, DateTime, Text, ForeignKey, String, Boolean
-from sqlalchemy.dialects.mysql import BINARY
+from sqlalchemy import Column, DateTime, Text, ForeignKey, String, Boolean, Index
+from app.db.types import BINARY
 from sqlalchemy import Enum as SqlEnum, Numeric
+from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
 from decimal import Decimal
 from app.db.base import Base
+from app.db.archive import archive_table
 from app.core.config import PaymentMethod
 from typing import Optional
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        # Covering index for per-user time-range aggregates (series, dashboard)
+        Index("ix_expenses_user_id_created_at", "user_id", "created_at", "amount"),
+        # Keyset scan for the incremental columnar export
+        Index("ix_expenses_updated_at_id", "updated_at", "id"),
+    )
     
     id = Column(BINARY(16), primary_key=True, default=lambda: uuid.uuid4().bytes)
     user_id = Column(BINARY(16), ForeignKey("users.id"), nullable=False, index=True)
@@ -22,6 +30,9 @@ class Expense(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    # Never lazy-loaded: join it with contains_eager() (or selectinload()) or it raises
+    category = relationship("BudgetCategory", back_populates="expenses", lazy="raise")
+
     # UUID Conversion Methods
     @property
     def uuid(self) -> Optional[str]:
@@ -58,4 +69,9 @@ class Expense(Base):
             "payment_method": expense.payment_method.value,
             "created_at": expense.created_at.isoformat(),
             "updated_at": expense.updated_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+
+# Cold tier for rows older than ARCHIVE_HORIZON_MONTHS (see app.db.archive)
+expenses_archive = archive_table(Expense.__table__)
+Expense.__archive__ = expenses_archive
@@ -1,9 +1,9 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 from datetime import datetime
 from uuid import UUID
 from decimal import Decimal
 from typing import Optional
-from app.core.config import PaymentMethod
+from app.core.config import PaymentMethod, Type, settings
 
 class ExpenseBase(BaseModel):
     name: str = Field(..., max_length=100, example="Groceries")
@@ -46,4 +46,63 @@ class ExpenseResponse(ExpenseBase):
             datetime: lambda v: v.isoformat(),
             PaymentMethod: lambda v: v.value
         }
-    )
\ No newline at end of file
+    )
+
+
+class ExpenseCategorySummary(BaseModel):
+    id: UUID
+    name: str
+    type: Type
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ExpenseWithCategory(ExpenseResponse):
+    """Expense with its category's name and type, read in the same query"""
+    category: ExpenseCategorySummary
+
+
+class ExpenseFilter(BaseModel):
+    """Expenses matched by a bulk operation; every given condition must hold"""
+    category_id: Optional[UUID] = None
+    payment_method: Optional[PaymentMethod] = None
+    is_essential: Optional[bool] = None
+    created_from: Optional[datetime] = Field(None, description="Inclusive")
+    created_to: Optional[datetime] = Field(None, description="Exclusive")
+    name_contains: Optional[str] = Field(None, min_length=1, max_length=100)
+
+    @model_validator(mode="after")
+    def check_conditions(self):
+        # An empty filter would match every expense of the user
+        if all(getattr(self, name) is None for name in self.model_fields):
+            raise ValueError("Filter needs at least one condition")
+        return self
+
+
+class ExpenseBulkDelete(BaseModel):
+    user_id: UUID = Field(..., example="a3c47a68-9db9-42f5-8a30-16c2d343ddf9")
+    ids: Optional[list[UUID]] = Field(None, min_length=1, max_length=settings.EXPENSE_BULK_MAX_IDS)
+    filter: Optional[ExpenseFilter] = None
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide either ids or filter")
+        return self
+
+
+class ExpenseBulkUpdate(ExpenseBulkDelete):
+    category_id: Optional[UUID] = Field(None, description="New category")
+    is_essential: Optional[bool] = None
+    payment_method: Optional[PaymentMethod] = None
+
+    @model_validator(mode="after")
+    def check_changes(self):
+        if self.category_id is None and self.is_essential is None and self.payment_method is None:
+            raise ValueError("Provide at least one of category_id, is_essential, payment_method")
+        return self
+
+
+class ExpenseBulkResult(BaseModel):
+    affected: int = Field(..., description="Expenses updated or deleted")
+    chunks: int = Field(..., description="Statements (and commits) used")
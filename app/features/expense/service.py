@@ -1,14 +1,32 @@
+from datetime import date, datetime
+from typing import Callable, Optional
 from uuid import UUID
 from decimal import Decimal
 import uuid
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, delete, Table
+from sqlalchemy.orm import contains_eager
+from app.core.config import settings
+from app.db import queries
+from app.db.archive import both_tiers, reaches_archive
+from app.features.expense.events import ExpenseCreated, ExpensesBulkUpdated, ExpensesBulkDeleted
 from app.features.expense.models import Expense
-from app.features.expense.schemas import ExpenseCreate, ExpenseResponse
+from app.features.expense.schemas import (
+    ExpenseCreate,
+    ExpenseResponse,
+    ExpenseBulkDelete,
+    ExpenseBulkUpdate,
+    ExpenseBulkResult,
+    ExpenseWithCategory,
+)
 from app.core.exceptions import NotFoundError, ConflictError
+from app.core.events import DomainEvent, event_bus, commit_and_publish
 from app.core.logger import logger
-from app.features.category.models import BudgetCategory  
+from app.core.fieldsets import load_fields, sparse_model
+from app.features.category.models import BudgetCategory
+from app.features.category.watcher import budget_watcher, period_of
+from app.features.sync.changes import UPSERT, DELETE, record_changes
 
 class ExpenseService:
     def __init__(self, db: AsyncSession):
@@ -35,20 +53,19 @@ class ExpenseService:
             expense_dict["user_id"] = self._uuid_to_binary(expense_dict["user_id"])
             expense_dict["category_id"] = self._uuid_to_binary(expense_dict["category_id"])
 
-            # Create and save expense
+            # Create and save expense; budget tracking and logging run in event handlers
             db_expense = Expense(**expense_dict)
             self.db.add(db_expense)
-            await self.db.commit()
+            await self.db.flush()
+            await commit_and_publish(self.db, ExpenseCreated(
+                user_id=db_expense.user_id,
+                expense_id=db_expense.id,
+                category_id=db_expense.category_id,
+                amount=db_expense.amount,
+                created_at=db_expense.created_at
+            ))
             await self.db.refresh(db_expense)
 
-            logger.info(
-                f"Created expense {db_expense.uuid} for user {expense_data.user_id}",
-                extra={
-                    "amount": expense_data.amount,
-                    "category": expense_data.category_id
-                }
-            )
-
             return await self._expense_to_response(db_expense)
 
         except Exception as e:
@@ -56,13 +73,140 @@ class ExpenseService:
             logger.error(f"Expense creation failed: {str(e)}")
             raise
 
+    async def bulk_update(self, request: ExpenseBulkUpdate) -> ExpenseBulkResult:
+        """
+        Recategorize or re-flag many expenses with set-based UPDATEs
+        Args:
+            request: Ids or filter, and the new column values
+        Returns:
+            ExpenseBulkResult: Rows updated and statements used
+        Raises:
+            NotFoundError: If the new category doesn't exist for this user
+        """
+        user_bin = request.user_id.bytes
+        values = request.model_dump(include={"category_id", "is_essential", "payment_method"}, exclude_none=True)
+        if "category_id" in values:
+            values["category_id"] = values["category_id"].bytes
+            owned = await self.db.scalar(
+                select(BudgetCategory.id)
+                .where(BudgetCategory.id == values["category_id"])
+                .where(BudgetCategory.user_id == user_bin)
+            )
+            if owned is None:
+                raise NotFoundError("Specified category does not exist")
+        values["updated_at"] = datetime.utcnow().replace(microsecond=0)
+
+        return await self._bulk_apply(
+            request, lambda table: update(table).values(**values), UPSERT, ExpensesBulkUpdated,
+            values.get("category_id")
+        )
+
+    async def bulk_delete(self, request: ExpenseBulkDelete) -> ExpenseBulkResult:
+        """
+        Delete many expenses with set-based DELETEs
+        Args:
+            request: Ids or filter selecting the expenses
+        Returns:
+            ExpenseBulkResult: Rows deleted and statements used
+        """
+        return await self._bulk_apply(request, delete, DELETE, ExpensesBulkDeleted)
+
+    async def _bulk_apply(
+        self,
+        request: ExpenseBulkDelete,
+        statement: Callable[[Table], object],
+        op: str,
+        event: Callable[..., DomainEvent],
+        moved_to: Optional[bytes] = None
+    ) -> ExpenseBulkResult:
+        """
+        Walk the user's matching rows in primary-key order, EXPENSE_BULK_CHUNK_SIZE
+        at a time, and run `statement` on each chunk in its own transaction so
+        row locks are held briefly. Ownership and the selection are repeated in
+        every statement's WHERE clause. A failure leaves earlier chunks applied.
+        Whatever was committed is published as `event` (also on failure) and
+        its spend goes to the budget watcher: moved to category `moved_to`,
+        or removed when there is none.
+        """
+        user_bin = request.user_id.bytes
+        tables = [Expense.__table__]
+        if reaches_archive(request.filter.created_from if request.filter else None):
+            tables.append(Expense.__archive__)
+
+        affected = chunks = 0
+        spend: dict[tuple[bytes, date], Decimal] = {}
+        try:
+            for table in tables:
+                conditions = [table.c.user_id == user_bin, *self._bulk_criteria(table, request)]
+                last_id = None
+                while True:
+                    query = (
+                        select(table.c.id, table.c.category_id, table.c.created_at, table.c.amount)
+                        .where(*conditions)
+                        .order_by(table.c.id)
+                        .limit(settings.EXPENSE_BULK_CHUNK_SIZE)
+                    )
+                    if last_id is not None:
+                        query = query.where(table.c.id > last_id)
+                    rows = (await self.db.execute(query)).all()
+                    if not rows:
+                        break
+                    ids = [row.id for row in rows]
+                    result = await self.db.execute(
+                        statement(table).where(table.c.id.in_(ids)).where(*conditions)
+                    )
+                    await record_changes(self.db, "expenses", user_bin, ids, op)
+                    await self.db.commit()
+                    affected += result.rowcount
+                    chunks += 1
+                    last_id = ids[-1]
+                    if op == DELETE or moved_to is not None:
+                        for row in rows:
+                            if row.category_id == moved_to:
+                                continue
+                            period = period_of(row.created_at)
+                            spend[row.category_id, period] = spend.get((row.category_id, period), 0) - row.amount
+                            if moved_to is not None:
+                                spend[moved_to, period] = spend.get((moved_to, period), 0) + row.amount
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Bulk expense {op} failed after {chunks} chunks: {str(e)}")
+            raise
+        finally:
+            if chunks:
+                await event_bus.publish(event(user_id=user_bin, affected=affected, chunks=chunks))
+            if spend:
+                try:
+                    await budget_watcher.record_bulk(self.db, user_bin, spend)
+                except Exception as e:
+                    logger.error(f"Budget watcher update failed: {str(e)}")
+
+        return ExpenseBulkResult(affected=affected, chunks=chunks)
+
+    @staticmethod
+    def _bulk_criteria(table: Table, request: ExpenseBulkDelete) -> list:
+        if request.ids is not None:
+            return [table.c.id.in_([i.bytes for i in request.ids])]
+        selection = request.filter
+        criteria = []
+        if selection.category_id is not None:
+            criteria.append(table.c.category_id == selection.category_id.bytes)
+        if selection.payment_method is not None:
+            criteria.append(table.c.payment_method == selection.payment_method)
+        if selection.is_essential is not None:
+            criteria.append(table.c.is_essential == selection.is_essential)
+        if selection.created_from is not None:
+            criteria.append(table.c.created_at >= selection.created_from)
+        if selection.created_to is not None:
+            criteria.append(table.c.created_at < selection.created_to)
+        if selection.name_contains:
+            criteria.append(table.c.name.contains(selection.name_contains, autoescape=True))
+        return criteria
+
     async def _validate_category(self, category_id: UUID) -> bool:
         """Check if category exists"""
        
-        result = await self.db.execute(
-            select(BudgetCategory)
-            .where(BudgetCategory.id == self._uuid_to_binary(category_id))
-        )
+        result = await self.db.execute(queries.category_exists(self._uuid_to_binary(category_id)))
         return result.scalar_one_or_none() is not None
 
     def _uuid_to_binary(self, uuid_input) -> bytes:
@@ -92,27 +236,40 @@ class ExpenseService:
             updated_at=expense.updated_at
         )
     
-    async def get_all_expenses(self, user_id: UUID) -> list[ExpenseResponse]:
+    async def get_all_expenses(
+        self,
+        user_id: UUID,
+        fields: Optional[tuple[str, ...]] = None
+    ) -> list[ExpenseResponse]:
         """
         Retrieve all expenses for a specific user
         Args:
             user_id: UUID of the user
+            fields: Sparse fieldset; only these columns are loaded and returned
         Returns:
             list[ExpenseResponse]: List of user's expenses
         Raises:
             NotFoundError: If user has no expenses
         """
         try:
-            result = await self.db.execute(
-                select(Expense)
-                .where(Expense.user_id == self._uuid_to_binary(user_id))
-            )
+            query = queries.expenses_by_user(self._uuid_to_binary(user_id))
+            if fields:
+                expenses_all = both_tiers(Expense)
+                query = (
+                    select(expenses_all)
+                    .where(expenses_all.user_id == self._uuid_to_binary(user_id))
+                    .options(load_fields(expenses_all, fields))
+                )
+            result = await self.db.execute(query)
             expenses = result.scalars().all()
             
             if not expenses:
                 raise NotFoundError("No expenses found for this user")
                 
             logger.info(f"Retrieved {len(expenses)} expenses for user {user_id}")
+            if fields:
+                schema = sparse_model(ExpenseResponse, fields)
+                return [schema.model_validate(exp) for exp in expenses]
             return [await self._expense_to_response(exp) for exp in expenses]
             
         except Exception as e:
@@ -126,7 +283,8 @@ class ExpenseService:
         user_id: str,
         db: AsyncSession,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        fields: Optional[tuple[str, ...]] = None
     ) -> list[ExpenseResponse]:
         try:
             # Normalize the UUID first
@@ -148,13 +306,20 @@ class ExpenseService:
             uuid_bytes = uuid.UUID(hex=clean_uuid).bytes
             
             # Query database
-            result = await db.execute(
-                select(Expense)
-                .where(Expense.user_id == uuid_bytes)
-                .offset(skip)
-                .limit(limit)
-            )
-            return [ExpenseResponse.model_validate(i) for i in result.scalars()]
+            query = queries.expenses_page(uuid_bytes, skip, limit)
+            schema = ExpenseResponse
+            if fields:
+                expenses_all = both_tiers(Expense)
+                query = (
+                    select(expenses_all)
+                    .where(expenses_all.user_id == uuid_bytes)
+                    .offset(skip)
+                    .limit(limit)
+                    .options(load_fields(expenses_all, fields))
+                )
+                schema = sparse_model(ExpenseResponse, fields)
+            result = await db.execute(query)
+            return [schema.model_validate(i) for i in result.scalars()]
             
         except ValueError as e:
             raise HTTPException(
@@ -165,4 +330,26 @@ class ExpenseService:
             raise HTTPException(
                 status_code=500,
                 detail=f"Database error: {str(e)}"
-            )
\ No newline at end of file
+            )
+    async def get_expenses_with_category(
+        self,
+        user_id: UUID,
+        skip: int = 0,
+        limit: int = 100
+    ) -> list[ExpenseWithCategory]:
+        """
+        A page of the user's expenses, newest first, each with its category's
+        name and type from a single JOIN (one query regardless of page size)
+        """
+        expenses_all = both_tiers(Expense)
+        query = (
+            select(expenses_all)
+            .join(expenses_all.category)
+            .options(contains_eager(expenses_all.category))
+            .where(expenses_all.user_id == user_id.bytes)
+            .order_by(expenses_all.created_at.desc(), expenses_all.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return [ExpenseWithCategory.model_validate(e) for e in result.scalars()]
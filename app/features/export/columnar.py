@@ -0,0 +1,240 @@
+"""
+Incremental columnar export of expenses and incomes for analytics.
+
+Rows are streamed with a server-side cursor in (updated_at, id) order,
+split by the month of created_at and written as compressed columnar
+files: Parquet (zstd) when pyarrow is installed, otherwise compressed
+NumPy .npz. A high-water mark per table makes reruns export only rows
+created or updated since the last successful run, so consumers should
+keep the latest version of each id. Hard deletes are not exported; use
+the sync change log for those.
+
+updated_at is stamped by the app before the commit, so a row may become
+visible after rows with a later updated_at. Only rows older than
+EXPORT_SAFETY_LAG are exported, which keeps the mark that far behind now;
+a transaction open for longer than that can still be missed. Archived
+rows are read from both tiers, and every shard is exported with its own
+mark.
+
+Layout:
+    <out>/<table>/month=YYYY-MM/part-<run>[.<shard>]-<n>.parquet|.npz
+    <out>/<table>/_state[.<shard>].json   (no suffix for the primary)
+
+Usage:
+    python -m app.features.export.columnar --out exports --tables expenses incomes
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from enum import Enum
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import Table, select, tuple_, DateTime, Numeric, Boolean
+
+from app.core.config import settings
+from app.core.database import shard_router
+from app.core.logger import logger
+from app.db.archive import both_tiers_table
+from app.db.sharding import PRIMARY, Shard
+from app.features.expense.models import Expense
+from app.features.income.models import Income
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: fall back to .npz
+    pa = pq = None
+
+EXPORTED_MODELS = {"expenses": Expense, "incomes": Income}
+
+
+def _plain(value):
+    """Python value -> primitive stored in the columnar file"""
+    if isinstance(value, bytes):
+        return str(UUID(bytes=value))
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+class ParquetSink:
+    """
+    One Parquet file per month per run; each flush appends a row group.
+    Files are written under a .tmp name and renamed once closed.
+    """
+    extension = "parquet"
+
+    def __init__(self, table: Table):
+        fields = []
+        for column in table.columns:
+            if isinstance(column.type, Numeric):
+                arrow_type = pa.decimal128(column.type.precision, column.type.scale)
+            elif isinstance(column.type, DateTime):
+                arrow_type = pa.timestamp("us")
+            elif isinstance(column.type, Boolean):
+                arrow_type = pa.bool_()
+            else:
+                arrow_type = pa.string()
+            fields.append(pa.field(column.name, arrow_type, nullable=column.nullable))
+        self.schema = pa.schema(fields)
+        self.writers: dict[str, "pq.ParquetWriter"] = {}
+
+    def write(self, directory: str, stem: str, columns: dict[str, list]) -> None:
+        path = os.path.join(directory, f"{stem}.{self.extension}")
+        if path not in self.writers:
+            self.writers[path] = pq.ParquetWriter(f"{path}.tmp", self.schema, compression="zstd")
+        self.writers[path].write_table(pa.table(columns, schema=self.schema))
+
+    def close(self) -> list[str]:
+        for path, writer in self.writers.items():
+            writer.close()
+            os.replace(f"{path}.tmp", path)
+        return list(self.writers)
+
+
+class NpzSink:
+    """Fallback without pyarrow: one compressed .npz per flush"""
+    extension = "npz"
+
+    def __init__(self, table: Table):
+        self.table = table
+        self.paths: list[str] = []
+        self.parts: dict[str, int] = {}
+
+    def write(self, directory: str, stem: str, columns: dict[str, list]) -> None:
+        part = self.parts.get(directory, 0)
+        self.parts[directory] = part + 1
+        target = os.path.join(directory, f"{stem}-{part}.{self.extension}")
+        arrays = {}
+        for column in self.table.columns:
+            values = columns[column.name]
+            if isinstance(column.type, Numeric):
+                arrays[column.name] = np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+            elif isinstance(column.type, DateTime):
+                arrays[column.name] = np.array(values, dtype="datetime64[us]")
+            elif isinstance(column.type, Boolean):
+                arrays[column.name] = np.array(values, dtype=bool)
+            else:
+                arrays[column.name] = np.array(["" if v is None else v for v in values], dtype=str)
+        with open(f"{target}.tmp", "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(f"{target}.tmp", target)
+        self.paths.append(target)
+
+    def close(self) -> list[str]:
+        return self.paths
+
+
+def _load_state(path: str) -> dict:
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def _save_state(path: str, state: dict) -> None:
+    # Write-then-rename so a crash never leaves a half-written mark
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+async def export_table(name: str, out_dir: str, chunk_rows: int, fetch_size: int, shard: Shard) -> dict:
+    """Export rows of `name` on `shard` changed since the shard's high-water mark"""
+    model = EXPORTED_MODELS[name]
+    table = model.__table__
+    source = both_tiers_table(model)
+    table_dir = os.path.join(out_dir, name)
+    os.makedirs(table_dir, exist_ok=True)
+    suffix = "" if shard.name == PRIMARY else f".{shard.name}"
+    state_path = os.path.join(table_dir, f"_state{suffix}.json")
+    state = _load_state(state_path)
+
+    horizon = datetime.utcnow() - timedelta(seconds=settings.EXPORT_SAFETY_LAG)
+    query = (
+        select(*(source.c[c.name] for c in table.columns))
+        .where(source.c.updated_at <= horizon)
+        .order_by(source.c.updated_at, source.c.id)
+    )
+    if state:
+        mark = (datetime.fromisoformat(state["updated_at"]), bytes.fromhex(state["id"]))
+        query = query.where(tuple_(source.c.updated_at, source.c.id) > tuple_(*mark))
+
+    sink = ParquetSink(table) if pq is not None else NpzSink(table)
+    run_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    buffers: dict[str, dict[str, list]] = {}
+    stats = {"table": name, "shard": shard.name, "rows": 0, "format": sink.extension}
+    last = None
+
+    def flush(month: str) -> None:
+        month_dir = os.path.join(table_dir, f"month={month}")
+        os.makedirs(month_dir, exist_ok=True)
+        sink.write(month_dir, f"part-{run_id}{suffix}", buffers.pop(month))
+
+    async with shard.sessions() as session:
+        stream = await session.stream(query.execution_options(yield_per=fetch_size))
+        async for rows in stream.partitions():
+            for row in rows:
+                month = row.created_at.strftime("%Y-%m")
+                columns = buffers.setdefault(month, {c.name: [] for c in table.columns})
+                for key, value in row._mapping.items():
+                    columns[key].append(_plain(value))
+                if len(columns["id"]) >= chunk_rows:
+                    flush(month)
+                last = row
+            stats["rows"] += len(rows)
+
+    for month in list(buffers):
+        flush(month)
+    stats["files"] = sink.close()
+
+    # Advance the mark only after every file is complete
+    if last is not None:
+        _save_state(state_path, {
+            "updated_at": last.updated_at.isoformat(),
+            "id": last.id.hex(),
+            "exported_at": datetime.utcnow().isoformat()
+        })
+    return stats
+
+
+async def run_export(tables: list[str], out_dir: str, chunk_rows: int, fetch_size: int) -> dict:
+    started = time.perf_counter()
+    try:
+        results = [
+            await export_table(name, out_dir, chunk_rows, fetch_size, shard)
+            for shard in shard_router
+            for name in tables
+        ]
+    finally:
+        await shard_router.dispose()
+    elapsed = time.perf_counter() - started
+    total = sum(r["rows"] for r in results)
+    report = {
+        "tables": results,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(total / elapsed, 1) if elapsed else 0.0
+    }
+    logger.info(f"Columnar export finished: {total} rows in {report['seconds']}s")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export expenses/incomes as columnar files")
+    parser.add_argument("--out", default=settings.EXPORT_DIR)
+    parser.add_argument("--tables", nargs="+", choices=list(EXPORTED_MODELS), default=list(EXPORTED_MODELS))
+    parser.add_argument("--chunk-rows", type=int, default=settings.EXPORT_CHUNK_ROWS, help="Rows buffered per month before writing")
+    parser.add_argument("--fetch-size", type=int, default=5000, help="Rows per cursor fetch")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_export(args.tables, args.out, args.chunk_rows, args.fetch_size))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
 import re
+from datetime import date
+from typing import Literal, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.core.database import get_db
+from app.core.database import get_db, shard_of_row
+from app.core.fieldsets import parse_fields, sparse_response
 from app.features.income.service import IncomeService
 from app.features.income.schemas import IncomeCreate, IncomeResponse, IncomeUpdate
+from app.features.income.models import Income
+from app.features.analytics.schemas import SeriesResponse
+from app.features.analytics.timeseries import SeriesService
 
 
 
@@ -31,7 +37,11 @@ async def create_income(
     
     
 
-@income_router.get("/getIncomeById/{income_id}", response_model=IncomeResponse)
+@income_router.get(
+    "/getIncomeById/{income_id}",
+    response_model=IncomeResponse,
+    dependencies=[Depends(shard_of_row(Income, "income_id"))]
+)
 async def read_income(income_id: str, db: AsyncSession = Depends(get_db)):
     service = IncomeService(db)
     income = await service.get_income(income_id)
@@ -44,6 +54,7 @@ async def list_user_incomes(
     user_id: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return, e.g. id,amount,created_at"),
     db: AsyncSession = Depends(get_db)
 ):
     try:
@@ -54,11 +65,20 @@ async def list_user_incomes(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid user ID format: {str(e)}"
         )
+    try:
+        selected = parse_fields(fields, IncomeResponse)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     service = IncomeService(db)
-    return await service.list_incomes(clean_user_id, skip, limit)
+    incomes = await service.list_incomes(clean_user_id, skip, limit, selected)
+    return sparse_response(incomes) if selected else incomes
 
-@income_router.put("/updateIncome/{income_id}", response_model=IncomeResponse)
+@income_router.put(
+    "/updateIncome/{income_id}",
+    response_model=IncomeResponse,
+    dependencies=[Depends(shard_of_row(Income, "income_id"))]
+)
 async def update_income(
     income_id: str,
     income: IncomeUpdate,
@@ -70,7 +90,11 @@ async def update_income(
         raise HTTPException(status_code=404, detail="Income not found")
     return updated_income
 
-@income_router.delete("/deleteIncome/{income_id}", status_code=status.HTTP_204_NO_CONTENT)
+@income_router.delete(
+    "/deleteIncome/{income_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(shard_of_row(Income, "income_id"))]
+)
 async def delete_income(income_id: str, db: AsyncSession = Depends(get_db)):
     service = IncomeService(db)
     success = await service.delete_income(income_id)
@@ -83,6 +107,7 @@ async def read_incomes(
     user_id: str = Query(..., example="0x3D7D9ED3F6214FF59EDB5D032AC18683"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return, e.g. id,amount,created_at"),
     db: AsyncSession = Depends(get_db)
       ):
     """
@@ -90,5 +115,40 @@ async def read_incomes(
     - 0x-prefixed: 0x3D7D9ED3F6214FF59EDB5D032AC18683
     - Standard UUID: 3D7D9ED3-F621-4FF5-9EDB-5D032AC18683
     - Raw hex: 3D7D9ED3F6214FF59EDB5D032AC18683
+
+    **fields** limits the columns read and returned (**id** is always included)
+    """
+    try:
+        selected = parse_fields(fields, IncomeResponse)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    incomes = await IncomeService.get_incomes_by_user(user_id, db, skip, limit, selected)
+    return sparse_response(incomes) if selected else incomes
+
+@income_router.get("/series", response_model=SeriesResponse)
+async def get_income_series(
+    user_id: str = Query(..., example="3d7d9ed3-f621-4ff5-9edb-5d032ac18683"),
+    bucket: Literal["day", "week", "month"] = Query("day"),
+    start: Optional[date] = Query(None, alias="from", description="First day (inclusive)"),
+    end: Optional[date] = Query(None, alias="to", description="Last day (inclusive), defaults to today"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Income totals per day, week (Monday start) or month
+
+    - Aggregated in the database; empty buckets are filled with zeros
+    - Columnar response: **t[i]** is the bucket start for **total[i]** and **count[i]**
     """
-    return await IncomeService.get_incomes_by_user(user_id, db, skip, limit)
+    try:
+        user_uuid = UUID(user_id.strip())
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid user ID format: {str(e)}"
+        )
+
+    try:
+        return await SeriesService(db).get_series(Income, user_uuid, bucket, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -0,0 +1,22 @@
+"""Events published by IncomeService after its writes commit"""
+from dataclasses import dataclass
+from decimal import Decimal
+
+from app.core.events import DomainEvent
+
+
+@dataclass(frozen=True)
+class IncomeCreated(DomainEvent):
+    income_id: bytes
+    amount: Decimal
+
+
+@dataclass(frozen=True)
+class IncomeUpdated(DomainEvent):
+    income_id: bytes
+    fields: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class IncomeDeleted(DomainEvent):
+    income_id: bytes
@@ -1,21 +1,27 @@
 
-from ast import Index
 import re
 from uuid import UUID as uuid_uuid
 import uuid
 from datetime import datetime
 from decimal import Decimal
 from fastapi import HTTPException
-from sqlalchemy import Column, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.dialects.mysql import BINARY
+from app.db.types import BINARY
 from sqlalchemy import Enum as SqlEnum
 from sqlalchemy import Numeric
 from app.db.base import Base
+from app.db.archive import archive_table
 from app.core.config import IncomeSource, IncomeFrequency
 
 class Income(Base):
     __tablename__ = "incomes"
+    __table_args__ = (
+        # Covering index for per-user time-range aggregates (series, dashboard)
+        Index("ix_incomes_user_id_created_at", "user_id", "created_at", "amount"),
+        # Keyset scan for the incremental columnar export
+        Index("ix_incomes_updated_at_id", "updated_at", "id"),
+    )
     id = Column(BINARY(16), primary_key=True, default=lambda: uuid.uuid4().bytes)
     user_id = Column(BINARY(16), ForeignKey("users.id"), nullable=False, index=True)
     source = Column(SqlEnum(IncomeSource), nullable=False, index=True)
@@ -73,4 +79,7 @@ class Income(Base):
             
         return prepared
 
-   
\ No newline at end of file
+
+# Cold tier for rows older than ARCHIVE_HORIZON_MONTHS (see app.db.archive)
+incomes_archive = archive_table(Income.__table__)
+Income.__archive__ = incomes_archive
@@ -3,9 +3,16 @@ from typing import List, Optional
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.features.auth.models import User
+from sqlalchemy import update, delete
+from app.core.config import settings
+from app.db import queries
+from app.db.archive import both_tiers
+from app.core.events import commit_and_publish
+from app.features.income.events import IncomeCreated, IncomeUpdated, IncomeDeleted
 from app.features.income.models import Income
+from app.features.sync.changes import UPSERT, DELETE, record_changes
 from app.features.income.schemas import IncomeCreate, IncomeUpdate, IncomeResponse
+from app.core.fieldsets import load_fields, sparse_model
 import uuid
 
 class IncomeService:
@@ -18,9 +25,7 @@ class IncomeService:
             user_id_bin = Income.uuid_to_bin(income_data.user_id)
             
             # Check if user exists
-            user_exists = await self.db.execute(
-                select(1).where(User.id == user_id_bin)
-            )
+            user_exists = await self.db.execute(queries.user_exists(user_id_bin))
             if not user_exists.scalar():
                 raise HTTPException(
                     status_code=404,
@@ -37,7 +42,10 @@ class IncomeService:
             )
             
             self.db.add(new_income)
-            await self.db.commit()
+            await self.db.flush()
+            await commit_and_publish(self.db, IncomeCreated(
+                user_id=user_id_bin, income_id=new_income.id, amount=new_income.amount
+            ))
             await self.db.refresh(new_income)
             return new_income
             
@@ -48,25 +56,43 @@ class IncomeService:
             raise HTTPException(status_code=400, detail=str(e))
     
     async def get_income(self, income_id: str) -> Optional[Income]:
+        incomes_all = both_tiers(Income)
         result = await self.db.execute(
-            select(Income).where(Income.id == uuid.UUID(income_id).bytes)
+            select(incomes_all).where(incomes_all.id == uuid.UUID(income_id).bytes)
         )
         return result.scalar_one_or_none()
+
+    async def _archived(self, income: Income) -> bool:
+        """Whether `income` was loaded from the archive tier (the ORM only writes the hot table)"""
+        if not settings.ARCHIVE_ENABLED:
+            return False
+        return await self.db.scalar(select(Income.id).where(Income.id == income.id)) is None
     
     async def list_incomes(
         self, 
         user_id: str,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        fields: Optional[tuple[str, ...]] = None
     ) -> List[Income]:
-        result = await self.db.execute(
-            select(Income)
-            .where(Income.user_id == uuid.UUID(user_id).bytes)
+        if not fields:
+            result = await self.db.execute(
+                queries.incomes_page(uuid.UUID(user_id).bytes, skip, limit, newest_first=True)
+            )
+            return result.scalars().all()
+        # Sparse fieldset: project the columns and return the reduced models
+        incomes_all = both_tiers(Income)
+        query = (
+            select(incomes_all)
+            .where(incomes_all.user_id == uuid.UUID(user_id).bytes)
             .offset(skip)
             .limit(limit)
-            .order_by(Income.created_at.desc())
+            .order_by(incomes_all.created_at.desc())
+            .options(load_fields(incomes_all, fields))
         )
-        return result.scalars().all()
+        result = await self.db.execute(query)
+        schema = sparse_model(IncomeResponse, fields)
+        return [schema.model_validate(i) for i in result.scalars()]
     
     async def update_income(
         self, 
@@ -81,10 +107,23 @@ class IncomeService:
         if 'frequency' in update_data:
             update_data['is_recurring'] = update_data['frequency'] != "One-time"
         
+        event = IncomeUpdated(user_id=income.user_id, income_id=income.id, fields=tuple(update_data))
+        if await self._archived(income):
+            # Core UPDATE on the cold row; the loaded instance is detached and patched
+            archive = Income.__archive__
+            update_data['updated_at'] = datetime.utcnow()
+            await self.db.execute(update(archive).where(archive.c.id == income.id).values(**update_data))
+            await record_changes(self.db, "incomes", income.user_id, [income.id], UPSERT)
+            self.db.expunge(income)
+            for field, value in update_data.items():
+                setattr(income, field, value)
+            await commit_and_publish(self.db, event)
+            return income
+
         for field, value in update_data.items():
             setattr(income, field, value)
         
-        await self.db.commit()
+        await commit_and_publish(self.db, event)
         await self.db.refresh(income)
         return income
     
@@ -93,8 +132,14 @@ class IncomeService:
         if not income:
             return False
         
-        await self.db.delete(income)
-        await self.db.commit()
+        if await self._archived(income):
+            archive = Income.__archive__
+            await self.db.execute(delete(archive).where(archive.c.id == income.id))
+            await record_changes(self.db, "incomes", income.user_id, [income.id], DELETE)
+            self.db.expunge(income)
+        else:
+            await self.db.delete(income)
+        await commit_and_publish(self.db, IncomeDeleted(user_id=income.user_id, income_id=income.id))
         return True
     
     @staticmethod
@@ -102,7 +147,8 @@ class IncomeService:
         user_id: str,
         db: AsyncSession,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        fields: Optional[tuple[str, ...]] = None
     ) -> list[IncomeResponse]:
         try:
             # Normalize the UUID first
@@ -124,13 +170,20 @@ class IncomeService:
             uuid_bytes = uuid.UUID(hex=clean_uuid).bytes
             
             # Query database
-            result = await db.execute(
-                select(Income)
-                .where(Income.user_id == uuid_bytes)
-                .offset(skip)
-                .limit(limit)
-            )
-            return [IncomeResponse.model_validate(i) for i in result.scalars()]
+            query = queries.incomes_page(uuid_bytes, skip, limit)
+            schema = IncomeResponse
+            if fields:
+                incomes_all = both_tiers(Income)
+                query = (
+                    select(incomes_all)
+                    .where(incomes_all.user_id == uuid_bytes)
+                    .offset(skip)
+                    .limit(limit)
+                    .options(load_fields(incomes_all, fields))
+                )
+                schema = sparse_model(IncomeResponse, fields)
+            result = await db.execute(query)
+            return [schema.model_validate(i) for i in result.scalars()]
             
         except ValueError as e:
             raise HTTPException(
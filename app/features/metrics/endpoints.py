@@ -0,0 +1,25 @@
+import os
+from fastapi import APIRouter, status
+from app.core.metrics import metrics
+from app.core.server import rss_bytes
+
+router = APIRouter(
+    prefix="/api/v1/metrics",
+    tags=["Metrics"]
+)
+
+
+@router.get(
+    "",
+    response_model=dict,
+    status_code=status.HTTP_200_OK
+)
+async def get_metrics():
+    """
+    Snapshot of this worker's in-process metrics
+
+    - Histograms report cumulative bucket counts (seconds), sum and mean
+    - Values are per worker process; aggregate across workers when scraping
+    - **rss_bytes** is the worker's current resident memory
+    """
+    return {"pid": os.getpid(), "rss_bytes": rss_bytes(), "metrics": metrics.snapshot()}
@@ -0,0 +1,220 @@
+"""
+Year-end statements for every user, generated in parallel.
+
+User ids are read from every shard, split into batches and shipped to a
+process pool. Each worker process keeps its own event loop and one
+database engine per shard, fetches the aggregates for a whole batch with
+a few set-based GROUP BY queries, and writes one statement file per user. A statement that already exists is
+skipped, so an interrupted run resumes where it stopped.
+
+Usage:
+    python -m app.features.reports.annual --year 2025 --workers 4 --out reports
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.db.archive import both_tiers
+from app.db.functions import date_bucket
+from app.db.sharding import shard_urls
+from app.features.auth.models import User
+from app.features.category.models import BudgetCategory
+from app.features.expense.models import Expense
+from app.features.income.models import Income
+
+ZERO = Decimal("0.00")
+
+# Per-process state, created by _init_worker
+_loop: asyncio.AbstractEventLoop = None
+_engines: dict[str, AsyncEngine] = {}
+
+
+def statement_path(out_dir: str, year: int, user_id: bytes) -> str:
+    return os.path.join(out_dir, str(year), f"{UUID(bytes=user_id)}.txt")
+
+
+def _init_worker() -> None:
+    global _loop
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+
+
+def _engine_for(database_url: str) -> AsyncEngine:
+    if database_url not in _engines:
+        _engines[database_url] = create_async_engine(database_url, pool_pre_ping=True)  # Queries run one at a time
+    return _engines[database_url]
+
+
+async def fetch_aggregates(engine: AsyncEngine, user_ids: list[bytes], year: int) -> dict:
+    """Monthly totals and category spend for a batch of users, one query each"""
+    start, end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    data = {
+        uid: {"user": None, "income": defaultdict(lambda: ZERO), "expenses": defaultdict(lambda: ZERO), "categories": []}
+        for uid in user_ids
+    }
+    async with engine.connect() as conn:
+        users = await conn.execute(
+            select(User.id, User.first_name, User.last_name, User.email, User.currency)
+            .where(User.id.in_(user_ids))
+        )
+        for row in users:
+            data[row.id]["user"] = row
+
+        for key, model in (("income", Income), ("expenses", Expense)):
+            source = both_tiers(model, start)
+            month = date_bucket("month", source.created_at)
+            result = await conn.execute(
+                select(source.user_id, month.label("month"), func.sum(source.amount).label("total"))
+                .where(source.user_id.in_(user_ids))
+                .where(source.created_at >= start, source.created_at < end)
+                .group_by(source.user_id, month)
+            )
+            for row in result:
+                data[row.user_id][key][row.month.month] = row.total
+
+        expenses = both_tiers(Expense, start)
+        result = await conn.execute(
+            select(expenses.user_id, BudgetCategory.name, func.sum(expenses.amount).label("total"))
+            .join(BudgetCategory, BudgetCategory.id == expenses.category_id)
+            .where(expenses.user_id.in_(user_ids))
+            .where(expenses.created_at >= start, expenses.created_at < end)
+            .group_by(expenses.user_id, BudgetCategory.id, BudgetCategory.name)
+            .order_by(expenses.user_id, func.sum(expenses.amount).desc())
+        )
+        for row in result:
+            data[row.user_id]["categories"].append((row.name, row.total))
+    return data
+
+
+def render_statement(year: int, entry: dict) -> str:
+    user = entry["user"]
+    lines = [
+        f"FinTrack annual statement {year}",
+        f"{user.first_name} {user.last_name} <{user.email}>",
+        f"Currency: {user.currency or ''}",
+        "",
+        f"{'Month':<10}{'Income':>15}{'Expenses':>15}{'Net':>15}",
+    ]
+    total_in = total_out = ZERO
+    for month in range(1, 13):
+        income, spent = entry["income"][month], entry["expenses"][month]
+        total_in += income
+        total_out += spent
+        lines.append(f"{date(year, month, 1):%Y-%m}".ljust(10) + f"{income:>15,.2f}{spent:>15,.2f}{income - spent:>15,.2f}")
+    lines.append(f"{'Total':<10}{total_in:>15,.2f}{total_out:>15,.2f}{total_in - total_out:>15,.2f}")
+
+    if entry["categories"]:
+        lines += ["", "Spending by category"]
+        for name, spent in entry["categories"]:
+            share = float(spent / total_out * 100) if total_out else 0.0
+            lines.append(f"  {name:<30}{spent:>15,.2f}{share:>8.1f}%")
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: str, content: str) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def _render_batch(database_url: str, user_ids: list[bytes], year: int, out_dir: str) -> tuple[int, int, float]:
+    """Process-pool entry point for users of one shard; returns (pid, statements written, seconds)"""
+    started = time.perf_counter()
+    data = _loop.run_until_complete(fetch_aggregates(_engine_for(database_url), user_ids, year))
+    written = 0
+    for user_id, entry in data.items():
+        if entry["user"] is None:
+            continue  # Deleted since the id list was read
+        _write_atomic(statement_path(out_dir, year, user_id), render_statement(year, entry))
+        written += 1
+    return os.getpid(), written, time.perf_counter() - started
+
+
+async def _pending_users(database_url: str, year: int, out_dir: str) -> tuple[list[bytes], int]:
+    engine = create_async_engine(database_url)
+    try:
+        async with engine.connect() as conn:
+            user_ids = (await conn.execute(select(User.id).order_by(User.id))).scalars().all()
+    finally:
+        await engine.dispose()
+    pending = [uid for uid in user_ids if not os.path.exists(statement_path(out_dir, year, uid))]
+    return pending, len(user_ids) - len(pending)
+
+
+def run_report(
+    year: int,
+    workers: int,
+    batch_size: int,
+    out_dir: str,
+    database_url: str | None = None
+) -> dict:
+    """
+    Generate every missing statement for `year` and return throughput stats;
+    reads every shard unless `database_url` names a single database
+    """
+    started = time.perf_counter()
+    database_urls = [database_url] if database_url else list(shard_urls().values())
+    os.makedirs(os.path.join(out_dir, str(year)), exist_ok=True)
+    batches, skipped = [], 0
+    for url in database_urls:
+        pending, existing = asyncio.run(_pending_users(url, year, out_dir))
+        skipped += existing
+        batches += [(url, pending[i:i + batch_size]) for i in range(0, len(pending), batch_size)]
+
+    per_worker = defaultdict(lambda: {"batches": 0, "statements": 0, "busy_seconds": 0.0})
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_render_batch, url, batch, year, out_dir) for url, batch in batches]
+        for future in futures:
+            pid, written, seconds = future.result()
+            stats = per_worker[pid]
+            stats["batches"] += 1
+            stats["statements"] += written
+            stats["busy_seconds"] += seconds
+
+    elapsed = time.perf_counter() - started
+    for stats in per_worker.values():
+        stats["busy_seconds"] = round(stats["busy_seconds"], 3)
+        stats["statements_per_second"] = (
+            round(stats["statements"] / stats["busy_seconds"], 1) if stats["busy_seconds"] else 0.0
+        )
+    written = sum(s["statements"] for s in per_worker.values())
+    report = {
+        "year": year,
+        "statements": written,
+        "skipped_existing": skipped,
+        "seconds": round(elapsed, 3),
+        "statements_per_second": round(written / elapsed, 1) if elapsed else 0.0,
+        "workers": {str(pid): stats for pid, stats in per_worker.items()}
+    }
+    logger.info(f"Annual report {year} finished: {written} statements in {report['seconds']}s")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate year-end statements for all users")
+    parser.add_argument("--year", type=int, default=datetime.utcnow().year - 1)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=200, help="Users per pool task")
+    parser.add_argument("--out", default=settings.REPORT_DIR)
+    parser.add_argument("--database-url", help="Read only this database, e.g. a replica, instead of every shard")
+    args = parser.parse_args()
+
+    report = run_report(args.year, args.workers, args.batch_size, args.out, args.database_url)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,10 @@ from sqlalchemy import select
 from typing import List
 
 # Your own imports
-from app.core.database import get_db
+from app.core.database import get_db, shard_of_row
 from app.features.savingsgoal.models import SavingsGoal
-from app.features.savingsgoal.schema import SavingsGoalCreate, SavingsGoalResponse
-from app.features.savingsgoal.service import SavingsGoalService
+from app.features.savingsgoal.schema import SavingsGoalCreate, SavingsGoalResponse, GoalForecast
+from app.features.savingsgoal.service import SavingsGoalService, GoalForecastService
 
 
 
@@ -113,4 +113,24 @@ async def check_saving_goal(
         raise
     except Exception as e:
         await db.rollback()
-        raise HTTPException(status_code=400, detail=f"Savings goal update failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=f"Savings goal update failed: {str(e)}")
+
+
+@router.get(
+    "/{goal_id}/forecast",
+    response_model=GoalForecast,
+    dependencies=[Depends(shard_of_row(SavingsGoal, "goal_id"))]
+)
+async def get_goal_forecast(
+    goal_id: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Projected completion date and confidence band for a savings goal
+
+    - Based on the user's monthly net (income - expenses) over complete past months
+    - **expected_completion** follows the damped trend; **completion_p10** / **p50** / **p90** come from Monte Carlo
+    - Cached per user until their transactions or goals change
+    """
+    goal_uuid = parse_any_uuid(goal_id)
+    return await GoalForecastService(db).forecast_goal(goal_uuid)
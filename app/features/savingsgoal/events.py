@@ -0,0 +1,11 @@
+"""Events published by SavingsGoalService after its writes commit"""
+from dataclasses import dataclass
+from decimal import Decimal
+
+from app.core.events import DomainEvent
+
+
+@dataclass(frozen=True)
+class SavingsGoalCreated(DomainEvent):
+    goal_id: bytes
+    target_amount: Decimal
@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class GoalProjection:
+    """
+    Months from now until each goal is reached, aligned with the input
+    `remaining` array. NaN means not reached within the horizon.
+    """
+    mean: float
+    trend: float
+    expected: np.ndarray
+    p10: np.ndarray
+    p50: np.ndarray
+    p90: np.ndarray
+    probability: np.ndarray
+
+
+def _months_to_reach(cumulative: np.ndarray, remaining: np.ndarray) -> np.ndarray:
+    """
+    First month (1-based) where the cumulative savings cover `remaining`,
+    or horizon + 1 if never. `cumulative` is (..., horizon); the result
+    broadcasts `remaining` over its leading axes.
+    """
+    running = np.maximum.accumulate(cumulative, axis=-1)  # Monotonic, so "below target" is a prefix
+    below = running[np.newaxis] < remaining.reshape((-1,) + (1,) * running.ndim)
+    return below.sum(axis=-1) + 1
+
+
+def project_goals(
+    history: np.ndarray,
+    remaining: np.ndarray,
+    horizon: int,
+    simulations: int,
+    damping: float,
+    rng: np.random.Generator
+) -> GoalProjection:
+    """
+    Project when each goal completes from the user's monthly net history.
+
+    A least-squares line through the history gives the level and trend;
+    the trend is damped (its step shrinks by `damping` every month) so it
+    does not run away over long horizons. The confidence band bootstraps
+    the regression residuals onto that path `simulations` times, all goals
+    sharing the same simulated paths.
+
+    Args:
+        history: Net (income - expenses) per complete month, oldest first
+        remaining: Amount still to save, one entry per goal
+        horizon: Months to project
+        simulations: Monte Carlo paths
+        damping: Trend damping factor in (0, 1]
+        rng: Random generator (seed it for reproducible bands)
+    Returns:
+        GoalProjection: Expected months, p10/p50/p90 months and probability per goal
+    """
+    x = np.arange(history.size, dtype=np.float64)
+    slope, intercept = np.polyfit(x, history, 1)
+    fitted = intercept + slope * x
+    residuals = history - fitted
+
+    steps = np.cumsum(damping ** np.arange(1, horizon + 1))
+    path = fitted[-1] + slope * steps  # (horizon,)
+
+    expected = _months_to_reach(np.cumsum(path)[np.newaxis], remaining)[:, 0]
+    samples = path + rng.choice(residuals, size=(simulations, horizon))
+    months = _months_to_reach(np.cumsum(samples, axis=1), remaining)  # (goals, simulations)
+
+    p10, p50, p90 = np.percentile(months, [10, 50, 90], axis=1, method="higher")
+    done = remaining <= 0
+
+    def bounded(values: np.ndarray) -> np.ndarray:
+        values = np.where(values > horizon, np.nan, values.astype(np.float64))
+        return np.where(done, 0.0, values)
+
+    return GoalProjection(
+        mean=float(history.mean()),
+        trend=float(slope),
+        expected=bounded(expected),
+        p10=bounded(p10),
+        p50=bounded(p50),
+        p90=bounded(p90),
+        probability=np.where(done, 1.0, (months <= horizon).mean(axis=1))
+    )
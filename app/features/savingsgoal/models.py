@@ -5,7 +5,7 @@ from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from uuid import uuid4
 from app.db.base import Base
-from sqlalchemy.dialects.mysql import BINARY
+from app.db.types import BINARY
 from datetime import datetime
 
 
@@ -1,8 +1,8 @@
 from pydantic import BaseModel, Field, constr, validator
 from uuid import UUID
 from decimal import Decimal
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Literal, Optional
 
 ConstrainedStr100 = constr(strip_whitespace=True, min_length=1, max_length=100)
 ConstrainedStr255 = constr(strip_whitespace=True, max_length=255)
@@ -55,3 +55,22 @@ class SavingsGoalResponse(SavingsGoalBase):
 
     class Config:
         from_attributes = True
+
+
+class GoalForecast(BaseModel):
+    goal_id: UUID
+    name: str
+    target_amount: Decimal
+    saved_amount: Decimal
+    remaining: Decimal
+    status: Literal["achieved", "on_track", "at_risk", "unreachable", "insufficient_history"]
+    months_of_history: int
+    mean_monthly_net: Decimal
+    trend_per_month: Decimal
+    expected_completion: Optional[date] = None  # Damped-trend projection
+    completion_p10: Optional[date] = None  # Optimistic end of the band
+    completion_p50: Optional[date] = None
+    completion_p90: Optional[date] = None  # Pessimistic end of the band
+    probability_within_horizon: float
+    horizon_months: int
+    generated_at: datetime
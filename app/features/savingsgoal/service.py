@@ -1,17 +1,29 @@
 import datetime
+from collections import OrderedDict
 from decimal import Decimal
 from uuid import UUID, uuid4
 from typing import Optional, Dict
 import uuid
 
+import numpy as np
 from fastapi import HTTPException
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.events import commit_and_publish
+from app.core.exceptions import NotFoundError
+from app.core.metrics import metrics
+from app.db.archive import both_tiers
+from app.db.functions import date_bucket
+from app.db.partitions import add_months
 from app.features.expense.models import Expense
 from app.features.income.models import Income
+from app.features.savingsgoal.events import SavingsGoalCreated
+from app.features.savingsgoal.forecast import project_goals
 from app.features.savingsgoal.models import SavingsGoal
-from app.features.savingsgoal.schema import SavingsGoalCreate,SavingsGoalUpdate
+from app.features.savingsgoal.schema import SavingsGoalCreate, SavingsGoalUpdate, GoalForecast
+from app.features.sync.models import ChangeLog
 
 class SavingsGoalService:
     """Service layer for savings goal operations with financial calculations"""
@@ -48,7 +60,9 @@ class SavingsGoalService:
                 updated_at=datetime.datetime.utcnow()
             )
             db.add(goal)
-            await db.commit()
+            await commit_and_publish(db, SavingsGoalCreated(
+                user_id=goal.user_id, goal_id=goal.id, target_amount=goal.target_amount
+            ))
             await db.refresh(goal)
             return goal
         except Exception as e:
@@ -68,21 +82,23 @@ class SavingsGoalService:
             user_uuid = SavingsGoalService._validate_uuid(user_id).bytes
             date_threshold = datetime.datetime.utcnow() - datetime.timedelta(days=30)
 
-            # Get total income
-            income = await db.execute(
+            # Both totals as scalar subqueries -> a single round trip
+            income = (
                 select(func.coalesce(func.sum(Income.amount), Decimal('0')))
                 .where(Income.user_id == user_uuid)
                 .where(Income.created_at >= date_threshold)
+                .scalar_subquery()
             )
-            
-            # Get total expenses
-            expenses = await db.execute(
+            expenses = (
                 select(func.coalesce(func.sum(Expense.amount), Decimal('0')))
                 .where(Expense.user_id == user_uuid)
                 .where(Expense.created_at >= date_threshold)
+                .scalar_subquery()
             )
 
-            return income.scalar_one() - expenses.scalar_one()
+            result = await db.execute(select(income, expenses))
+            total_income, total_expenses = result.one()
+            return Decimal(total_income) - Decimal(total_expenses)
 
         except HTTPException:
             raise
@@ -155,4 +171,202 @@ class SavingsGoalService:
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to fetch savings goals: {str(e)}"
-            )
\ No newline at end of file
+            )
+
+
+class ForecastCache:
+    """
+    Per-user LRU of goal forecasts. An entry is valid for one data version
+    (the user's latest change-log seq plus the current month), so any new
+    transaction or goal edit, or a new month of history, recomputes it.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[tuple, list[GoalForecast]]] = OrderedDict()
+        self._hits = metrics.counter("forecast_cache_hits", "Goal forecasts served from cache")
+        self._misses = metrics.counter("forecast_cache_misses", "Goal forecasts that were recomputed")
+
+    def get(self, user_id: bytes, version: tuple) -> Optional[list[GoalForecast]]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] != version:
+            self._misses.inc()
+            return None
+        self._entries.move_to_end(user_id)
+        self._hits.inc()
+        return entry[1]
+
+    def put(self, user_id: bytes, version: tuple, forecasts: list[GoalForecast]) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[user_id] = (version, forecasts)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+forecast_cache = ForecastCache(settings.FORECAST_CACHE_SIZE)
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(str(round(value, 2)))
+
+
+class GoalForecastService:
+    """Completion forecasts for savings goals from historical monthly net"""
+
+    def __init__(self, db: AsyncSession, cache: Optional[ForecastCache] = forecast_cache):
+        self.db = db
+        self.cache = cache
+
+    async def forecast_goal(self, goal_id: UUID) -> GoalForecast:
+        user_id = (await self.db.execute(
+            select(SavingsGoal.user_id).where(SavingsGoal.id == goal_id.bytes)
+        )).scalar_one_or_none()
+        if user_id is None:
+            raise NotFoundError(f"Savings goal {goal_id} not found")
+        forecasts = (await self.forecast_users([user_id]))[user_id]
+        return next(f for f in forecasts if f.goal_id == goal_id)
+
+    async def forecast_users(self, user_ids: list[bytes]) -> dict[bytes, list[GoalForecast]]:
+        """Forecasts for every goal of `user_ids`, with a few set-based queries per call"""
+        current = datetime.datetime.utcnow().date().replace(day=1)
+        versions = await self._data_versions(user_ids, current)
+        results, stale = {}, []
+        for user_id in user_ids:
+            cached = self.cache.get(user_id, versions[user_id]) if self.cache is not None else None
+            if cached is None:
+                stale.append(user_id)
+            else:
+                results[user_id] = cached
+        if not stale:
+            return results
+
+        goals = (await self.db.execute(
+            select(SavingsGoal)
+            .where(SavingsGoal.user_id.in_(stale))
+            .order_by(SavingsGoal.user_id, SavingsGoal.created_at)
+        )).scalars().all()
+        by_user = {user_id: [] for user_id in stale}
+        for goal in goals:
+            by_user[goal.user_id].append(goal)
+        histories = await self._monthly_net(stale, current)
+
+        for user_id in stale:
+            forecasts = self._forecast(user_id, by_user[user_id], histories.get(user_id), current)
+            if self.cache is not None:
+                self.cache.put(user_id, versions[user_id], forecasts)
+            results[user_id] = forecasts
+        return results
+
+    async def _data_versions(self, user_ids: list[bytes], current: datetime.date) -> dict[bytes, tuple]:
+        # Index-only lookup on ix_change_log_user_id_seq
+        result = await self.db.execute(
+            select(ChangeLog.user_id, func.max(ChangeLog.seq))
+            .where(ChangeLog.user_id.in_(user_ids))
+            .group_by(ChangeLog.user_id)
+        )
+        latest = dict(result.all())
+        return {user_id: (latest.get(user_id), current) for user_id in user_ids}
+
+    async def _monthly_net(self, user_ids: list[bytes], current: datetime.date) -> dict[bytes, np.ndarray]:
+        """
+        Net per complete month in the history window, per user, starting
+        at the user's first month with any transaction (zero-filled after)
+        """
+        months = settings.FORECAST_HISTORY_MONTHS
+        first = add_months(current, -months)
+        start = datetime.datetime.combine(first, datetime.time.min)
+        end = datetime.datetime.combine(current, datetime.time.min)
+        base = first.year * 12 + first.month - 1
+
+        net = {user_id: np.zeros(months) for user_id in user_ids}
+        active = {}
+        for model, sign in ((Income, 1.0), (Expense, -1.0)):
+            source = both_tiers(model, start)
+            month = date_bucket("month", source.created_at)
+            result = await self.db.execute(
+                select(source.user_id, month.label("month"), func.sum(source.amount).label("total"))
+                .where(source.user_id.in_(user_ids))
+                .where(source.created_at >= start, source.created_at < end)
+                .group_by(source.user_id, month)
+            )
+            for row in result:
+                index = row.month.year * 12 + row.month.month - 1 - base
+                net[row.user_id][index] += sign * float(row.total)
+                active[row.user_id] = min(active.get(row.user_id, index), index)
+        return {user_id: net[user_id][first_index:] for user_id, first_index in active.items()}
+
+    def _forecast(
+        self,
+        user_id: bytes,
+        goals: list[SavingsGoal],
+        history: Optional[np.ndarray],
+        current: datetime.date
+    ) -> list[GoalForecast]:
+        if not goals:
+            return []
+        horizon = settings.FORECAST_HORIZON_MONTHS
+        remaining = np.array([float(g.target_amount - g.saved_amount) for g in goals])
+        now = datetime.datetime.utcnow()
+        base = {"horizon_months": horizon, "generated_at": now}
+
+        def month_of(value: float) -> Optional[datetime.date]:
+            # Month 1 of the projection is the current month
+            return None if np.isnan(value) else add_months(current, max(int(value) - 1, 0))
+
+        if history is None or history.size < settings.FORECAST_MIN_MONTHS:
+            size = 0 if history is None else int(history.size)
+            mean = _money(float(history.mean())) if size else Decimal("0.00")
+            return [
+                GoalForecast(
+                    goal_id=UUID(bytes=g.id), name=g.name, target_amount=g.target_amount,
+                    saved_amount=g.saved_amount, remaining=max(g.target_amount - g.saved_amount, Decimal("0.00")),
+                    status="achieved" if left <= 0 else "insufficient_history",
+                    months_of_history=size, mean_monthly_net=mean, trend_per_month=Decimal("0.00"),
+                    probability_within_horizon=1.0 if left <= 0 else 0.0, **base
+                )
+                for g, left in zip(goals, remaining)
+            ]
+
+        # Seeded per user: unchanged history gives the same band on every recompute
+        rng = np.random.default_rng(int.from_bytes(user_id, "big"))
+        projection = project_goals(
+            history, remaining, horizon, settings.FORECAST_SIMULATIONS, settings.FORECAST_TREND_DAMPING, rng
+        )
+
+        forecasts = []
+        for i, goal in enumerate(goals):
+            probability = float(projection.probability[i])
+            if remaining[i] <= 0:
+                status = "achieved"
+            elif probability >= 0.8:
+                status = "on_track"
+            elif probability > 0:
+                status = "at_risk"
+            else:
+                status = "unreachable"
+            forecasts.append(GoalForecast(
+                goal_id=UUID(bytes=goal.id),
+                name=goal.name,
+                target_amount=goal.target_amount,
+                saved_amount=goal.saved_amount,
+                remaining=max(goal.target_amount - goal.saved_amount, Decimal("0.00")),
+                status=status,
+                months_of_history=int(history.size),
+                mean_monthly_net=_money(projection.mean),
+                trend_per_month=_money(projection.trend),
+                expected_completion=month_of(projection.expected[i]),
+                completion_p10=month_of(projection.p10[i]),
+                completion_p50=month_of(projection.p50[i]),
+                completion_p90=month_of(projection.p90[i]),
+                probability_within_horizon=round(probability, 3),
+                **base
+            ))
+        return forecasts
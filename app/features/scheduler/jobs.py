@@ -0,0 +1,17 @@
+from app.core.config import settings
+from app.core.database import shard_router
+from app.db.partitions import archive_cold_rows, maintain_partitions
+from app.features.auth.jobs import purge_expired_refresh_tokens
+from app.features.scheduler.service import Scheduler
+
+
+def register_default_jobs(scheduler: Scheduler) -> None:
+    """Recurring maintenance work run by the in-process scheduler, on every shard"""
+    scheduler.add_job(
+        "purge_expired_refresh_tokens",
+        shard_router.each_shard(purge_expired_refresh_tokens),
+        every=settings.REFRESH_TOKEN_SWEEP_INTERVAL
+    )
+    if settings.ARCHIVE_ENABLED:
+        scheduler.add_job("maintain_partitions", shard_router.each_shard(maintain_partitions), every=settings.ARCHIVE_INTERVAL)
+        scheduler.add_job("archive_cold_rows", shard_router.each_shard(archive_cold_rows), every=settings.ARCHIVE_INTERVAL)
@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from app.db.base import Base
+
+
+class JobLease(Base):
+    """
+    One row per scheduled job. A worker runs a tick only after taking the
+    lease, so each tick executes once across all gunicorn workers and hosts.
+    """
+    __tablename__ = "job_leases"
+
+    name = Column(String(100), primary_key=True)
+    owner = Column(String(100), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    last_run_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
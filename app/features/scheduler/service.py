@@ -0,0 +1,152 @@
+import asyncio
+import os
+import random
+import re
+import socket
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional, Union
+
+from sqlalchemy import update, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import BackgroundSessionLocal
+from app.core.logger import logger
+from app.core.metrics import metrics
+from app.features.scheduler.models import JobLease
+
+_INTERVAL_PATTERN = re.compile(r"^\s*(\d+)\s*([smhd])\s*$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_interval(value: Union[str, int, float, timedelta]) -> float:
+    """Accept '30s' / '15m' / '1h' / '1d', seconds, or a timedelta"""
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _INTERVAL_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"Invalid interval '{value}', expected e.g. 30s, 15m, 1h, 1d")
+    return float(int(match.group(1)) * _UNITS[match.group(2)])
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[AsyncSession], Awaitable[object]]
+    interval: float
+    jitter: float
+
+
+class Scheduler:
+    """
+    Lightweight in-process scheduler.
+
+    Ticks are aligned to multiples of the interval on the wall clock (an
+    hourly job fires at :00 in every worker), each worker then waits a
+    random jitter, and only the worker that takes the database lease for
+    that tick runs it. Jobs use the background connection pool.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker = BackgroundSessionLocal):
+        self.session_factory = session_factory
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.jobs: dict[str, Job] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._stopping: Optional[asyncio.Event] = None
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[AsyncSession], Awaitable[object]],
+        every: Union[str, int, float, timedelta],
+        jitter: Union[str, int, float, timedelta, None] = None
+    ) -> Job:
+        interval = parse_interval(every)
+        # Jitter must stay well inside the lease window (half an interval)
+        max_jitter = interval / 4
+        jitter_s = min(parse_interval(jitter), max_jitter) if jitter is not None else min(30.0, max_jitter)
+        job = Job(name=name, func=func, interval=interval, jitter=jitter_s)
+        self.jobs[name] = job
+        return job
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._stopping = asyncio.Event()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"  # Refresh after fork
+        self._tasks = [
+            asyncio.create_task(self._run_loop(job), name=f"job:{job.name}")
+            for job in self.jobs.values()
+        ]
+        logger.info(f"Scheduler started with {len(self._tasks)} jobs as {self.owner}")
+
+    async def stop(self) -> None:
+        if not self._tasks:
+            return
+        self._stopping.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Scheduler stopped")
+
+    async def _run_loop(self, job: Job) -> None:
+        duration = metrics.histogram(f"job_{job.name}_duration_seconds", f"Run time of job {job.name}")
+        lag = metrics.gauge(f"job_{job.name}_lag_seconds", f"Start delay of the last {job.name} run")
+        runs = metrics.counter(f"job_{job.name}_runs", f"Completed runs of {job.name}")
+        failures = metrics.counter(f"job_{job.name}_failures", f"Failed runs of {job.name}")
+
+        while not self._stopping.is_set():
+            tick = (time.time() // job.interval + 1) * job.interval
+            due = tick + random.uniform(0, job.jitter)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=max(due - time.time(), 0))
+                return  # Stop requested while sleeping
+            except asyncio.TimeoutError:
+                pass
+
+            async with self.session_factory() as session:
+                try:
+                    if not await self._acquire_lease(session, job, tick):
+                        continue
+                    lag.set(max(time.time() - due, 0.0))
+                    with duration.time():
+                        result = await job.func(session)
+                        await session.commit()
+                    runs.inc()
+                    logger.info(f"Job {job.name} finished: {result}")
+                except Exception as e:
+                    await session.rollback()
+                    failures.inc()
+                    logger.error(f"Job {job.name} failed: {str(e)}")
+
+    async def _acquire_lease(self, session: AsyncSession, job: Job, tick: float) -> bool:
+        """Take the lease for this tick; only one worker can succeed"""
+        now = datetime.utcnow()
+        expires_at = datetime.utcfromtimestamp(tick + job.interval / 2)
+
+        result = await session.execute(
+            update(JobLease)
+            .where(JobLease.name == job.name)
+            .where(or_(JobLease.expires_at <= now, JobLease.owner == self.owner))
+            .where(JobLease.expires_at < expires_at)
+            .values(owner=self.owner, expires_at=expires_at, last_run_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            await session.commit()
+            return True
+
+        try:
+            session.add(JobLease(name=job.name, owner=self.owner, expires_at=expires_at, last_run_at=now))
+            await session.commit()
+            return True
+        except IntegrityError:
+            # Row exists and is held by another worker for this tick
+            await session.rollback()
+            return False
+
+
+scheduler = Scheduler()
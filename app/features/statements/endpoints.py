@@ -0,0 +1,72 @@
+import os
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import FileResponse, JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.features.statements.service import statement_worker, parse_month, data_version, artifact_path
+from app.core.config import settings
+from app.core.database import get_db
+
+router = APIRouter(
+    prefix="/api/v1/statements",
+    tags=["Statements"],
+    responses={
+        400: {"description": "Invalid UUID format or month"}
+    }
+)
+
+
+@router.get(
+    "/{month}",
+    status_code=status.HTTP_200_OK,
+    response_class=FileResponse,
+    responses={
+        200: {"content": {"text/csv": {}}, "description": "The statement file"},
+        202: {"description": "Statement is being generated; retry after `Retry-After` seconds"},
+        503: {"description": "Statement generation is not running on this server"}
+    }
+)
+async def get_statement(
+    month: str,
+    user_id: str = Query(..., description="User ID in UUID format", example="550e8400-e29b-41d4-a716-446655440000"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Monthly statement (CSV) of a user's expenses and incomes
+
+    - **month**: YYYY-MM
+    - Served straight from disk once generated; regenerated only after that month's data changes
+    - Otherwise generation is queued and **202** is returned with a `Retry-After` header
+    """
+    try:
+        uuid_obj = UUID(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid UUID format"
+        )
+
+    try:
+        month_start = parse_month(month)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    version = await data_version(db, uuid_obj, month_start)
+    path = artifact_path(uuid_obj, month_start, version)
+    if os.path.exists(path):
+        return FileResponse(
+            path,
+            media_type="text/csv",
+            filename=f"statement-{month}.csv",
+            headers={"ETag": f'"{version}"'}
+        )
+
+    try:
+        statement_worker.enqueue(uuid_obj, month_start, version)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"status": "pending", "month": month, "version": version},
+        headers={"Retry-After": str(settings.STATEMENT_RETRY_AFTER)}
+    )
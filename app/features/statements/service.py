@@ -0,0 +1,220 @@
+import asyncio
+import csv
+import hashlib
+import os
+import tempfile
+from datetime import date, datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select, func, literal
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import shard_router
+from app.core.logger import logger
+from app.core.metrics import metrics
+from app.db.archive import both_tiers
+from app.features.category.models import BudgetCategory
+from app.features.expense.models import Expense
+from app.features.income.models import Income
+
+CSV_HEADER = ["date", "type", "description", "category", "amount", "method", "notes"]
+
+
+def parse_month(value: str) -> date:
+    """'YYYY-MM' -> first day of that month (not in the future)"""
+    try:
+        month = datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise ValueError("Month must be formatted as YYYY-MM")
+    if month > datetime.utcnow().date():
+        raise ValueError("Month is in the future")
+    return month
+
+
+def month_bounds(month: date) -> tuple[datetime, datetime]:
+    following = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    return datetime.combine(month, datetime.min.time()), datetime.combine(following, datetime.min.time())
+
+
+def artifact_path(user_id: UUID, month: date, version: str) -> str:
+    return os.path.join(settings.STATEMENT_DIR, str(user_id), f"{month:%Y-%m}", f"{version}.csv")
+
+
+async def data_version(db: AsyncSession, user_id: UUID, month: date) -> str:
+    """
+    Fingerprint of a user's month: row count, amount sum and latest
+    updated_at of its expenses and incomes, plus the latest updated_at of
+    the categories those expenses use (their names are in the file). Any
+    insert, edit or delete in that month changes it; activity in other
+    months does not.
+    """
+    start, end = month_bounds(month)
+    parts = []
+    for model in (Expense, Income):
+        source = both_tiers(model, start)
+        parts.append(
+            select(
+                literal(model.__tablename__).label("entity"),
+                func.count().label("rows"),
+                func.coalesce(func.sum(source.amount), 0).label("total"),
+                func.max(source.updated_at).label("updated_at")
+            )
+            .where(source.user_id == user_id.bytes)
+            .where(source.created_at >= start, source.created_at < end)
+        )
+    expenses = both_tiers(Expense, start)
+    parts.append(
+        select(
+            literal(BudgetCategory.__tablename__).label("entity"),
+            func.count(func.distinct(BudgetCategory.id)).label("rows"),
+            literal(0).label("total"),
+            func.max(BudgetCategory.updated_at).label("updated_at")
+        )
+        .join(expenses, expenses.category_id == BudgetCategory.id)
+        .where(expenses.user_id == user_id.bytes)
+        .where(expenses.created_at >= start, expenses.created_at < end)
+    )
+    digest = hashlib.sha256()
+    for statement in parts:
+        row = (await db.execute(statement)).one()
+        digest.update(f"{row.entity}|{row.rows}|{row.total}|{row.updated_at}".encode())
+    return digest.hexdigest()[:16]
+
+
+async def render_statement(db: AsyncSession, user_id: UUID, month: date, path: str) -> int:
+    """Write the month's transactions as CSV to `path`; returns the row count"""
+    start, end = month_bounds(month)
+    expenses = both_tiers(Expense, start)
+    expense_rows = (await db.execute(
+        select(
+            expenses.created_at, expenses.name, BudgetCategory.name.label("category"),
+            expenses.amount, expenses.payment_method, expenses.remark
+        )
+        .outerjoin(BudgetCategory, BudgetCategory.id == expenses.category_id)
+        .where(expenses.user_id == user_id.bytes)
+        .where(expenses.created_at >= start, expenses.created_at < end)
+    )).all()
+    incomes = both_tiers(Income, start)
+    income_rows = (await db.execute(
+        select(incomes.created_at, incomes.source, incomes.amount, incomes.frequency, incomes.notes)
+        .where(incomes.user_id == user_id.bytes)
+        .where(incomes.created_at >= start, incomes.created_at < end)
+    )).all()
+
+    lines = [
+        (r.created_at, "expense", r.name, r.category or "", -r.amount, r.payment_method.value, r.remark or "")
+        for r in expense_rows
+    ] + [
+        (r.created_at, "income", r.source.value, "", r.amount, r.frequency.value, r.notes or "")
+        for r in income_rows
+    ]
+    lines.sort(key=lambda line: line[0])
+
+    # Unique temp name: several workers may render the same artifact at once
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=os.path.dirname(path), suffix=".tmp", delete=False, newline="", encoding="utf-8"
+    ) as f:
+        try:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            for created_at, *rest in lines:
+                writer.writerow([created_at.isoformat(sep=" ", timespec="seconds"), *rest])
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    os.replace(f.name, path)
+    return len(lines)
+
+
+class StatementWorker:
+    """
+    Background queue that renders statements off the request path.
+
+    Requests are de-duplicated on (user, month, version) while queued or
+    running. When a new version is written, artifacts of that month written
+    before it are removed; newer ones (another worker's) are kept.
+    """
+
+    def __init__(self, session_factory: Optional[async_sessionmaker] = None):
+        self.session_factory = session_factory  # Default: background pool of the user's shard
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: set[tuple[UUID, date, str]] = set()
+        self._tasks: list[asyncio.Task] = []
+        self._depth = metrics.gauge("statement_queue_depth", "Statements waiting to be rendered")
+        self._duration = metrics.histogram("statement_render_seconds", "Time to render one statement")
+        self._failures = metrics.counter("statement_render_failures", "Statements that failed to render")
+
+    def start(self, workers: int = settings.STATEMENT_WORKERS) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"statement-worker:{i}")
+            for i in range(workers)
+        ]
+        logger.info(f"Statement worker started with {workers} tasks")
+
+    async def stop(self) -> None:
+        if not self._tasks:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Statement worker stopped")
+
+    def enqueue(self, user_id: UUID, month: date, version: str) -> bool:
+        """Queue a render; returns False if that exact artifact is already pending"""
+        if self._queue is None:
+            raise RuntimeError("Statement worker is not running")
+        key = (user_id, month, version)
+        if key in self._pending:
+            return False
+        self._pending.add(key)
+        self._queue.put_nowait(key)
+        self._depth.set(self._queue.qsize())
+        return True
+
+    def is_pending(self, user_id: UUID, month: date, version: str) -> bool:
+        return (user_id, month, version) in self._pending
+
+    async def _run(self) -> None:
+        while True:
+            key = await self._queue.get()
+            self._depth.set(self._queue.qsize())
+            user_id, month, version = key
+            try:
+                path = artifact_path(user_id, month, version)
+                sessions = self.session_factory or shard_router.shard_for(user_id.bytes).background_sessions
+                async with sessions() as session:
+                    with self._duration.time():
+                        rows = await render_statement(session, user_id, month, path)
+                self._remove_stale(path)
+                logger.info(f"Rendered statement {month:%Y-%m} for user {user_id} ({rows} rows)")
+            except Exception as e:
+                self._failures.inc()
+                logger.error(f"Statement {month:%Y-%m} for user {user_id} failed: {str(e)}")
+            finally:
+                self._pending.discard(key)
+                self._queue.task_done()
+
+    @staticmethod
+    def _remove_stale(current: str) -> None:
+        directory = os.path.dirname(current)
+        written = os.stat(current).st_mtime_ns
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if path == current or not name.endswith(".csv"):
+                continue
+            try:
+                if os.stat(path).st_mtime_ns < written:
+                    os.remove(path)
+            except FileNotFoundError:  # Removed by another worker meanwhile
+                pass
+
+
+statement_worker = StatementWorker()
@@ -0,0 +1,74 @@
+"""
+Change-log recording for the delta-sync feed.
+
+ORM writes are captured by a flush hook on every Session, so services need
+no changes. Core bulk statements bypass the ORM and must call
+`record_changes` themselves.
+"""
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.features.category.models import BudgetCategory
+from app.features.expense.models import Expense
+from app.features.income.models import Income
+from app.features.savingsgoal.models import SavingsGoal
+from app.features.sync.models import ChangeLog
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+# Entity name used in the feed -> mapped class
+SYNCED_MODELS = {
+    "expenses": Expense,
+    "incomes": Income,
+    "categories": BudgetCategory,
+    "savings_goals": SavingsGoal,
+}
+_ENTITY_BY_CLASS = {model: entity for entity, model in SYNCED_MODELS.items()}
+
+
+def _entry(entity: str, obj, op: str, now: datetime) -> dict:
+    return {"user_id": obj.user_id, "entity": entity, "entity_id": obj.id, "op": op, "changed_at": now}
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush_changes(session: Session, flush_context) -> None:
+    # new/dirty/deleted still hold the pre-flush state here, and ids are assigned
+    now = datetime.utcnow()
+    entries = []
+    for obj in session.new:
+        entity = _ENTITY_BY_CLASS.get(type(obj))
+        if entity:
+            entries.append(_entry(entity, obj, UPSERT, now))
+    for obj in session.dirty:
+        entity = _ENTITY_BY_CLASS.get(type(obj))
+        if entity and session.is_modified(obj, include_collections=False):
+            entries.append(_entry(entity, obj, UPSERT, now))
+    for obj in session.deleted:
+        entity = _ENTITY_BY_CLASS.get(type(obj))
+        if entity:
+            entries.append(_entry(entity, obj, DELETE, now))
+
+    if entries:
+        session.connection().execute(insert(ChangeLog), entries)
+
+
+async def record_changes(
+    db: AsyncSession,
+    entity: str,
+    user_id: bytes,
+    entity_ids: Iterable[bytes],
+    op: str = UPSERT
+) -> None:
+    """Log changes made with Core UPDATE/DELETE statements (same transaction)"""
+    now = datetime.utcnow()
+    entries = [
+        {"user_id": user_id, "entity": entity, "entity_id": entity_id, "op": op, "changed_at": now}
+        for entity_id in entity_ids
+    ]
+    if entries:
+        await db.execute(insert(ChangeLog), entries)
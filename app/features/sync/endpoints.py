@@ -0,0 +1,71 @@
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.features.sync.schemas import SyncResponse, SyncBatchRequest, SyncBatchResponse
+from app.features.sync.service import SyncService
+from app.core.config import settings
+from app.core.database import get_db
+
+router = APIRouter(
+    prefix="/api/v1/sync",
+    tags=["Sync"],
+    responses={
+        400: {"description": "Invalid UUID format or sync token"}
+    }
+)
+
+
+@router.get(
+    "",
+    response_model=SyncResponse,
+    status_code=status.HTTP_200_OK
+)
+async def get_changes(
+    user_id: str = Query(..., description="User ID in UUID format", example="550e8400-e29b-41d4-a716-446655440000"),
+    since: Optional[str] = Query(None, description="`next_token` from the previous sync; omit for a full snapshot"),
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=5000, description="Max changes per page"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Delta sync for expenses, incomes, categories and savings goals
+
+    - Returns rows created or updated after **since**, plus tombstones in **deleted**
+    - Keep calling with **next_token** while **has_more** is true
+    - Without **since**, every row is returned (**full** = true)
+    """
+    try:
+        uuid_obj = UUID(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid UUID format"
+        )
+
+    try:
+        return await SyncService(db).get_changes(uuid_obj, since, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post(
+    "/batch",
+    response_model=SyncBatchResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        404: {"description": "User not found"}
+    }
+)
+async def apply_batch(
+    batch: SyncBatchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Push queued offline edits in a single request
+
+    - **operations**: create / update / delete of expenses and incomes, with client-generated ids
+    - Applied in order, in one transaction, with one multi-row upsert per entity
+    - Each result carries **status** (applied / conflict / rejected) and the server **version**
+    - Set **base_version** on an update to get a conflict instead of overwriting newer server data
+    """
+    return await SyncService(db).apply_batch(batch)
@@ -0,0 +1,23 @@
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Index
+from app.db.types import BINARY
+from app.db.base import Base
+
+
+class ChangeLog(Base):
+    """
+    Append-only record of every create/update/delete of a synced entity.
+    `seq` is the monotonic sync cursor; clients send back the last one seen.
+    """
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_user_id_seq", "user_id", "seq"),
+    )
+
+    # SQLite only autoincrements INTEGER PRIMARY KEY
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    user_id = Column(BINARY(16), nullable=False)
+    entity = Column(String(30), nullable=False)
+    entity_id = Column(BINARY(16), nullable=False)
+    op = Column(String(10), nullable=False)  # upsert | delete
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,53 @@
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import datetime
+from uuid import UUID
+from typing import Literal, Optional
+
+from app.core.config import settings
+from app.features.category.schemas import BudgetCategoryResponse
+from app.features.expense.schemas import ExpenseResponse
+from app.features.income.schemas import IncomeResponse
+from app.features.savingsgoal.schema import SavingsGoalResponse
+
+
+class SyncResponse(BaseModel):
+    next_token: str = Field(..., description="Pass as `since` on the next call")
+    has_more: bool = Field(False, description="More changes are pending; call again right away")
+    full: bool = Field(False, description="Snapshot of every row (no `since` given)")
+    expenses: list[ExpenseResponse] = []
+    incomes: list[IncomeResponse] = []
+    categories: list[BudgetCategoryResponse] = []
+    savings_goals: list[SavingsGoalResponse] = []
+    deleted: dict[str, list[UUID]] = Field(default_factory=dict, description="Tombstones per entity")
+
+    model_config = ConfigDict(json_encoders={UUID: str})
+
+
+class SyncOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    entity: Literal["expenses", "incomes"]
+    id: UUID = Field(..., description="Client-generated row id")
+    data: dict = Field(default_factory=dict, description="Full row for create, changed fields for update")
+    base_version: Optional[datetime] = Field(None, description="`version` the client last saw; stale updates conflict")
+    created_at: Optional[datetime] = Field(None, description="Client-side creation time (create only)")
+
+
+class SyncBatchRequest(BaseModel):
+    user_id: UUID = Field(..., example="a3c47a68-9db9-42f5-8a30-16c2d343ddf9")
+    operations: list[SyncOperation] = Field(..., min_length=1, max_length=settings.SYNC_BATCH_MAX)
+
+
+class SyncOperationResult(BaseModel):
+    id: UUID
+    entity: str
+    op: str
+    status: Literal["applied", "conflict", "rejected"]
+    version: Optional[datetime] = Field(None, description="Server updated_at after this operation")
+    error: Optional[str] = None
+
+    model_config = ConfigDict(json_encoders={UUID: str})
+
+
+class SyncBatchResponse(BaseModel):
+    applied: int
+    results: list[SyncOperationResult]
@@ -0,0 +1,314 @@
+import base64
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy import select, func, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings, IncomeFrequency
+from app.core.exceptions import NotFoundError
+from app.core.logger import logger
+from app.db.archive import both_tiers, reaches_archive
+from app.db.upsert import upsert
+from app.features.auth.models import User
+from app.features.category.models import BudgetCategory
+from app.features.category.schemas import BudgetCategoryResponse
+from app.features.category.watcher import budget_watcher
+from app.features.expense.schemas import ExpenseCreate, ExpenseResponse, ExpenseUpdate
+from app.features.income.schemas import IncomeBase, IncomeResponse, IncomeUpdate
+from app.features.savingsgoal.schema import SavingsGoalResponse
+from app.features.sync.changes import SYNCED_MODELS, UPSERT, DELETE, record_changes
+from app.features.sync.models import ChangeLog
+from app.features.sync.schemas import (
+    SyncResponse,
+    SyncOperation,
+    SyncBatchRequest,
+    SyncOperationResult,
+    SyncBatchResponse,
+)
+
+RESPONSE_SCHEMAS = {
+    "expenses": ExpenseResponse,
+    "incomes": IncomeResponse,
+    "categories": BudgetCategoryResponse,
+    "savings_goals": SavingsGoalResponse,
+}
+
+
+# Columns a client may never set through the batch endpoint
+_SERVER_COLUMNS = {"id", "user_id", "created_at", "updated_at"}
+
+
+def encode_token(seq: int) -> str:
+    return base64.urlsafe_b64encode(seq.to_bytes(8, "big")).decode().rstrip("=")
+
+
+def decode_token(token: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid sync token")
+    if len(raw) != 8:
+        raise ValueError("Invalid sync token")
+    return int.from_bytes(raw, "big")
+
+
+def _watermark() -> datetime:
+    """
+    Entries logged after this may still have uncommitted predecessors:
+    `seq` is taken at INSERT, so a transaction that commits late can land
+    below a sequence number a client has already been given. Tokens never
+    pass an entry younger than SYNC_SAFETY_LAG; a transaction open longer
+    than that can still be missed.
+    """
+    return datetime.utcnow() - timedelta(seconds=settings.SYNC_SAFETY_LAG)
+
+
+class SyncService:
+    """Delta sync driven by the change_log sequence"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_changes(
+        self,
+        user_id: UUID,
+        since: Optional[str] = None,
+        limit: int = settings.SYNC_PAGE_SIZE
+    ) -> SyncResponse:
+        """
+        Rows created, updated or deleted after `since`
+        Args:
+            user_id: UUID of the user
+            since: Token from the previous response; omit for a full snapshot
+            limit: Max change-log entries consumed per call
+        Returns:
+            SyncResponse: Current rows, tombstones and the next token
+        Raises:
+            ValueError: If the token is malformed
+        """
+        if since is None:
+            return await self._snapshot(user_id)
+
+        cursor = decode_token(since)
+        result = await self.db.execute(
+            select(ChangeLog.seq, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.op, ChangeLog.changed_at)
+            .where(ChangeLog.user_id == user_id.bytes)
+            .where(ChangeLog.seq > cursor)
+            .order_by(ChangeLog.seq)
+            .limit(limit + 1)
+        )
+        entries = result.all()
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        # Stop at the first entry still inside the safety lag; it comes next time
+        watermark = _watermark()
+        fresh = next((i for i, entry in enumerate(entries) if entry.changed_at > watermark), None)
+        if fresh is not None:
+            entries, has_more = entries[:fresh], False
+        if not entries:
+            return SyncResponse(next_token=encode_token(cursor))
+
+        # Only the latest operation per row matters
+        latest: dict[tuple[str, bytes], str] = {}
+        for entry in entries:
+            latest[(entry.entity, entry.entity_id)] = entry.op
+
+        response = SyncResponse(next_token=encode_token(entries[-1].seq), has_more=has_more)
+        for entity, model in SYNCED_MODELS.items():
+            upserted = [eid for (name, eid), op in latest.items() if name == entity and op != DELETE]
+            deleted = [eid for (name, eid), op in latest.items() if name == entity and op == DELETE]
+            if upserted:
+                source = both_tiers(model) if hasattr(model, "__archive__") else model
+                rows = await self.db.execute(select(source).where(source.id.in_(upserted)))
+                setattr(response, entity, self._serialize(entity, rows.scalars()))
+            if deleted:
+                response.deleted[entity] = [UUID(bytes=eid) for eid in deleted]
+        return response
+
+    async def _snapshot(self, user_id: UUID) -> SyncResponse:
+        # Read the cursor first: anything written meanwhile is re-sent next time.
+        # It stays below every entry inside the safety lag, see _watermark()
+        mine = ChangeLog.user_id == user_id.bytes
+        fresh = await self.db.scalar(
+            select(func.min(ChangeLog.seq)).where(mine).where(ChangeLog.changed_at > _watermark())
+        )
+        if fresh is not None:
+            head = fresh - 1
+        else:
+            head = await self.db.scalar(select(func.coalesce(func.max(ChangeLog.seq), 0)).where(mine))
+        response = SyncResponse(next_token=encode_token(head), full=True)
+        for entity, model in SYNCED_MODELS.items():
+            source = both_tiers(model) if hasattr(model, "__archive__") else model
+            rows = await self.db.execute(select(source).where(source.user_id == user_id.bytes))
+            setattr(response, entity, self._serialize(entity, rows.scalars()))
+        return response
+
+    @staticmethod
+    def _serialize(entity: str, rows) -> list:
+        schema = RESPONSE_SCHEMAS[entity]
+        return [schema.model_validate(row, from_attributes=True) for row in rows]
+
+    async def apply_batch(self, batch: SyncBatchRequest) -> SyncBatchResponse:
+        """
+        Apply queued offline edits in one transaction
+        Args:
+            batch: Operations in the order the client made them
+        Returns:
+            SyncBatchResponse: One result per operation, in request order
+        Raises:
+            NotFoundError: If the user doesn't exist
+        """
+        user_bin = batch.user_id.bytes
+        if not await self.db.scalar(select(User.id).where(User.id == user_bin)):
+            raise NotFoundError("User not found")
+
+        # One server version per batch; DATETIME columns drop microseconds
+        now = datetime.utcnow().replace(microsecond=0)
+        parsed = [self._parse(op, batch.user_id) for op in batch.operations]
+
+        # Ownership pre-check: every referenced row (either tier) and category
+        existing: dict[tuple[str, bytes], dict] = {}
+        archived: set[tuple[str, bytes]] = set()
+        for entity in ("expenses", "incomes"):
+            ids = [op.id.bytes for op in batch.operations if op.entity == entity]
+            if ids:
+                for table in self._tiers(entity):
+                    rows = await self.db.execute(select(table).where(table.c.id.in_(ids)))
+                    for row in rows.mappings():
+                        existing[entity, row["id"]] = dict(row)
+                        if table is not SYNCED_MODELS[entity].__table__:
+                            archived.add((entity, row["id"]))
+        category_ids = {
+            data["category_id"] for data, error in parsed
+            if error is None and data.get("category_id") is not None
+        }
+        own_categories = set()
+        if category_ids:
+            own_categories = set((await self.db.execute(
+                select(BudgetCategory.id)
+                .where(BudgetCategory.id.in_(category_ids))
+                .where(BudgetCategory.user_id == user_bin)
+            )).scalars())
+
+        # Fold operations in order so create-then-edit of one row works
+        pending: dict[tuple[str, bytes], Optional[dict]] = {}
+        results = []
+        for op, (data, error) in zip(batch.operations, parsed):
+            key = (op.entity, op.id.bytes)
+            stored = existing.get(key)
+            current = pending[key] if key in pending else stored
+            result = SyncOperationResult(id=op.id, entity=op.entity, op=op.op, status="applied")
+            results.append(result)
+
+            if stored is not None and stored["user_id"] != user_bin:
+                result.status, result.error = "rejected", "Not found"
+                continue
+            if error is not None:
+                result.status, result.error = "rejected", error
+                continue
+            if data.get("category_id") is not None and data["category_id"] not in own_categories:
+                result.status, result.error = "rejected", "Category not found"
+                continue
+            if (
+                op.base_version is not None and key not in pending and current is not None
+                and current["updated_at"] > op.base_version
+            ):
+                result.status, result.version = "conflict", current["updated_at"]
+                continue
+
+            if op.op == "delete":
+                pending[key] = None
+                continue
+            if op.op == "update":
+                if current is None:
+                    result.status, result.error = "rejected", "Not found"
+                    continue
+                row = {**current, **data, "updated_at": now}
+            else:
+                row = {
+                    **(current or {}),
+                    **data,
+                    "id": op.id.bytes,
+                    "user_id": user_bin,
+                    "created_at": current["created_at"] if current else (op.created_at or now),
+                    "updated_at": now
+                }
+            if op.entity == "incomes":
+                row["is_recurring"] = row["frequency"] != IncomeFrequency.ONE_TIME
+            pending[key] = row
+            result.version = now
+
+        # Archived rows are written where they are, like IncomeService does
+        for entity in ("expenses", "incomes"):
+            for table in self._tiers(entity):
+                cold = table is not SYNCED_MODELS[entity].__table__
+                keys = [
+                    key for key in pending
+                    if key[0] == entity and (key in archived) == cold
+                ]
+                rows = [
+                    {c.name: pending[key].get(c.name) for c in table.columns}
+                    for key in keys if pending[key] is not None
+                ]
+                deleted = [eid for (_, eid) in keys if pending[entity, eid] is None and (entity, eid) in existing]
+                await upsert(self.db, table, rows, [c.name for c in table.columns if c.name not in ("id", "user_id", "created_at")])
+                if deleted:
+                    await self.db.execute(delete(table).where(table.c.id.in_(deleted)).where(table.c.user_id == user_bin))
+                await record_changes(self.db, entity, user_bin, [row["id"] for row in rows], UPSERT)
+                await record_changes(self.db, entity, user_bin, deleted, DELETE)
+        await self.db.commit()
+
+        # Old row out, new row in: deltas for the in-memory budget totals
+        spend = []
+        for (name, eid), row in pending.items():
+            if name != "expenses":
+                continue
+            old = existing.get((name, eid))
+            if old is not None:
+                spend.append((user_bin, old["category_id"], old["created_at"], -old["amount"]))
+            if row is not None:
+                spend.append((user_bin, row["category_id"], row["created_at"], row["amount"]))
+        if spend:
+            try:
+                await budget_watcher.record(self.db, spend)
+            except Exception as e:
+                logger.error(f"Budget watcher update failed: {str(e)}")
+
+        return SyncBatchResponse(
+            applied=sum(1 for r in results if r.status == "applied"),
+            results=results
+        )
+
+    @staticmethod
+    def _tiers(entity: str) -> list:
+        """Tables holding rows of `entity`: hot, then archive when enabled"""
+        model = SYNCED_MODELS[entity]
+        return [model.__table__, model.__archive__] if reaches_archive(None) else [model.__table__]
+
+    @staticmethod
+    def _parse(op: SyncOperation, user_id: UUID) -> tuple[dict, Optional[str]]:
+        """Validate an operation payload into column values, or return an error"""
+        if op.op == "delete":
+            return {}, None
+        payload = {k: v for k, v in op.data.items() if k not in _SERVER_COLUMNS}
+        try:
+            if op.entity == "expenses":
+                if op.op == "create":
+                    data = ExpenseCreate.model_validate({**payload, "user_id": user_id}).model_dump(exclude={"user_id"})
+                else:
+                    data = ExpenseUpdate.model_validate(payload).model_dump(exclude_unset=True)
+                if data.get("category_id") is not None:
+                    data["category_id"] = data["category_id"].bytes
+            elif op.op == "create":
+                data = IncomeBase.model_validate(payload).model_dump()
+            else:
+                data = IncomeUpdate.model_validate(payload).model_dump(exclude_unset=True)
+        except ValidationError as e:
+            return {}, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+        # Explicit nulls only clear nullable columns
+        table = SYNCED_MODELS[op.entity].__table__
+        return {k: v for k, v in data.items() if v is not None or table.c[k].nullable}, None
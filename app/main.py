@@ -1,12 +1,23 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.database import engine, AsyncSessionLocal
+from app.core.database import shard_router, AsyncSessionLocal
 from app.db.base import Base
 from app.features.auth.endpoints import router as auth_router
 from app.features.income.endpoints import  income_router
 from app.features.category.endpoints import router as budget_category_router
 from app.features.expense.endpoints import router as expense_router
 from app.features.savingsgoal.endpoints import router as savings_goal_router
+from app.features.dashboard.endpoints import router as dashboard_router
+from app.features.metrics.endpoints import router as metrics_router
+from app.features.sync.endpoints import router as sync_router
+from app.features.statements.endpoints import router as statements_router
+from app.features.statements.service import statement_worker
+from app.core.warmup import warm_up, pool_liveness
+from app.core.events import event_bus
+from app.core.event_handlers import register_default_handlers
+from app.features.scheduler.service import scheduler
+from app.features.scheduler.jobs import register_default_jobs
+from app.core.config import settings
 
 app = FastAPI(
     title="Finance Tracker API",
@@ -41,6 +52,26 @@ app.include_router(
     tags=["Savings Goals"]
 )
 
+app.include_router(
+    dashboard_router,
+    tags=["Dashboard"]
+)
+
+app.include_router(
+    metrics_router,
+    tags=["Metrics"]
+)
+
+app.include_router(
+    sync_router,
+    tags=["Sync"]
+)
+
+app.include_router(
+    statements_router,
+    tags=["Statements"]
+)
+
 # CORS Setup
 app.add_middleware(
     CORSMiddleware,
@@ -53,8 +84,33 @@ app.add_middleware(
 # DB Initialization
 @app.on_event("startup")
 async def startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    for shard in shard_router:
+        async with shard.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    if settings.DB_WARMUP:
+        await warm_up()
+    if not settings.DB_POOL_PRE_PING:
+        pool_liveness.start()
+
+    if settings.SCHEDULER_ENABLED:
+        register_default_jobs(scheduler)
+        scheduler.start()
+
+    statement_worker.start()
+
+    # After warm-up, whose throwaway writes are not published
+    register_default_handlers(event_bus)
+    event_bus.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await event_bus.stop()
+    await scheduler.stop()
+    await statement_worker.stop()
+    await pool_liveness.stop()
+    # Close pooled connections (aiosqlite runs one thread per connection)
+    await shard_router.dispose()
 
 # @app.get("/")
 # async def root():
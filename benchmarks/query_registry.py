@@ -0,0 +1,82 @@
+"""
+Micro-benchmark: inline statements vs. the lambda statements in app.db.queries.
+
+"build" is the Python cost of producing a statement and its compiled-cache
+key, i.e. what every request pays before the driver is called. "execute"
+runs the statement through an ORM session against in-memory SQLite, so it
+includes compiled-cache lookup, parameter processing and result handling.
+
+Usage:
+    python benchmarks/query_registry.py --iterations 5000
+"""
+import argparse
+import os
+import sys
+import timeit
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.db import queries
+from app.db.archive import both_tiers
+from app.features.auth.models import User
+from app.features.category.models import BudgetCategory
+from app.features.expense.models import Expense
+
+
+def inline_statements(user_id: bytes, category_id: bytes) -> dict:
+    """The statements as the services built them before the registry"""
+    def expenses():
+        expenses_all = both_tiers(Expense)
+        return select(expenses_all).where(expenses_all.user_id == user_id).offset(0).limit(100)
+
+    return {
+        "user by id": lambda: select(User).where(User.id == user_id),
+        "category exists": lambda: select(BudgetCategory).where(BudgetCategory.id == category_id),
+        "expenses page": expenses
+    }
+
+
+def registry_statements(user_id: bytes, category_id: bytes) -> dict:
+    return {
+        "user by id": lambda: queries.user_by_id(user_id),
+        "category exists": lambda: queries.category_exists(category_id),
+        "expenses page": lambda: queries.expenses_page(user_id, 0, 100)
+    }
+
+
+def per_call_us(fn, iterations: int) -> float:
+    return min(timeit.repeat(fn, number=iterations, repeat=3)) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inline vs. lambda statement overhead")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    user_id, category_id = uuid.uuid4().bytes, uuid.uuid4().bytes
+
+    inline = inline_statements(user_id, category_id)
+    registry = registry_statements(user_id, category_id)
+    with Session(engine) as session:
+        print(f"{'statement':<16} {'':>8} {'inline':>10} {'registry':>10} {'speedup':>8}")
+        for name in inline:
+            for label, run in (
+                ("build", lambda build: build()._generate_cache_key()),
+                ("execute", lambda build: session.execute(build()).all())
+            ):
+                run(inline[name]), run(registry[name])  # Warm the compiled cache
+                before = per_call_us(lambda: run(inline[name]), args.iterations)
+                after = per_call_us(lambda: run(registry[name]), args.iterations)
+                print(f"{name:<16} {label:>8} {before:8.1f}us {after:8.1f}us {before / after:7.1f}x")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: recent-window expense queries, to compare before/after
+partitioning (run once per schema state with a different --label).
+
+Usage:
+    python benchmarks/recent_window.py --label before --days 30 --iterations 200
+    alembic upgrade head
+    python benchmarks/recent_window.py --label after --days 30 --iterations 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, func
+
+from app.db.base import Base  # noqa: F401 - registers all models
+from app.core.database import engine, AsyncSessionLocal
+from app.features.expense.models import Expense
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+async def run(args) -> dict:
+    since = datetime.utcnow() - timedelta(days=args.days)
+    async with AsyncSessionLocal() as session:
+        users = (await session.execute(
+            select(Expense.user_id)
+            .group_by(Expense.user_id)
+            .order_by(func.count().desc())
+            .limit(args.users)
+        )).scalars().all()
+        if not users:
+            raise SystemExit("No expenses to benchmark against")
+
+        queries = {
+            "list_recent": lambda user_id: select(Expense)
+                .where(Expense.user_id == user_id, Expense.created_at >= since)
+                .order_by(Expense.created_at.desc())
+                .limit(100),
+            "sum_recent": lambda user_id: select(func.sum(Expense.amount), func.count())
+                .where(Expense.user_id == user_id, Expense.created_at >= since),
+        }
+
+        report = {"label": args.label, "days": args.days, "users": len(users), "dialect": engine.dialect.name}
+        for name, build in queries.items():
+            samples = []
+            for i in range(args.iterations):
+                statement = build(users[i % len(users)])
+                started = time.perf_counter()
+                (await session.execute(statement)).all()
+                samples.append((time.perf_counter() - started) * 1000)
+                session.expunge_all()
+            report[name] = {
+                "p50_ms": round(statistics.median(samples), 3),
+                "p95_ms": round(percentile(samples, 0.95), 3),
+                "max_ms": round(max(samples), 3)
+            }
+    await engine.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time recent-window expense queries")
+    parser.add_argument("--label", default="run", help="Tag for this run, e.g. before / after")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--users", type=int, default=20, help="Heaviest users to sample")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Micro-benchmark: full JWT verification vs. verification-cache lookup.
+
+Usage:
+    python benchmarks/token_cache.py --iterations 20000
+"""
+import argparse
+import os
+import sys
+import timeit
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jose import jwt
+
+from app.core.config import settings
+from app.db.base import Base  # noqa: F401 - registers all models before security imports User
+from app.core.security import TokenCache, TokenService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JWT decode vs. token cache lookup")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = TokenService.create_tokens({
+        "uuid": uuid.uuid4(),
+        "email": "bench@example.com",
+        "username": "bench"
+    })["access_token"]
+
+    def decode():
+        jwt.decode(
+            token,
+            settings.SECRET_KEY.get_secret_value(),
+            algorithms=[settings.ALGORITHM],
+            audience=settings.TOKEN_AUDIENCE,
+            issuer=settings.TOKEN_ISSUER
+        )
+
+    cache = TokenCache(max_size=1024)
+    cache.put(token, TokenService.verify_token(token))
+
+    decode_s = min(timeit.repeat(decode, number=args.iterations, repeat=3))
+    lookup_s = min(timeit.repeat(lambda: cache.get(token), number=args.iterations, repeat=3))
+
+    decode_us = decode_s / args.iterations * 1e6
+    lookup_us = lookup_s / args.iterations * 1e6
+    print(f"jwt.decode:   {decode_us:8.2f} us/op")
+    print(f"cache lookup: {lookup_us:8.2f} us/op")
+    print(f"speedup:      {decode_us / lookup_us:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Production gunicorn settings; values come from app.core.config.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Every worker opens its own DB pools (DB pool + SCHEDULER_POOL_SIZE), so
+cap WEB_MAX_WORKERS to what the database accepts.
+"""
+from app.core.config import settings
+from app.core.server import worker_count, event_loop, http_protocol, rss_mb
+
+bind = f"{settings.SERVER_HOST}:{settings.SERVER_PORT}"
+workers = worker_count()
+# "auto" loop/http in UvicornWorker picks uvloop/httptools when installed
+worker_class = "uvicorn.workers.UvicornWorker"
+
+preload_app = settings.PRELOAD_APP
+keepalive = settings.KEEPALIVE
+backlog = settings.BACKLOG
+max_requests = settings.MAX_REQUESTS
+max_requests_jitter = settings.MAX_REQUESTS_JITTER
+timeout = settings.WORKER_TIMEOUT
+graceful_timeout = settings.GRACEFUL_TIMEOUT
+
+accesslog = "-" if settings.APP_DEBUG else None
+errorlog = "-"
+loglevel = settings.LOG_LEVEL.lower()
+
+
+def when_ready(server):
+    server.log.info(
+        f"Master ready: {workers} workers, loop={event_loop()}, http={http_protocol()}, "
+        f"preload={preload_app}, master RSS {rss_mb()} MB"
+    )
+
+
+def post_fork(server, worker):
+    # A preloaded app was imported in the master: never reuse its pooled connections
+    from app.core.database import shard_router
+    for engine in shard_router.engines():
+        engine.sync_engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    worker.log.info(f"Worker {worker.pid} started, RSS {rss_mb()} MB")
+
+
+def worker_exit(server, worker):
+    # Runs in the worker: its RSS at exit, e.g. when recycled after MAX_REQUESTS
+    server.log.info(f"Worker {worker.pid} exiting, RSS {rss_mb()} MB")
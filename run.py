@@ -1,16 +1,30 @@
 # run.py
+"""
+Start the API.
+
+    python run.py            # gunicorn + uvicorn workers (gunicorn.conf.py)
+    python run.py --reload   # single auto-reloading uvicorn process for development
+"""
+import argparse
+import os
+
 import uvicorn
 from app.core.config import settings
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:app", 
-        host=settings.DB_HOST,  # e.g. "0.0.0.0"
-        port=8000,  # e.g. 8000
-        reload=True,   # Auto-reload in development
-        workers=1,        # Single worker (adjust if needed)
-        log_level="info",
-        access_log=settings.APP_DEBUG 
-    )
+    parser = argparse.ArgumentParser(description="Run the Finance Tracker API")
+    parser.add_argument("--reload", action="store_true", help="Development server with auto-reload")
+    args = parser.parse_args()
 
- 
\ No newline at end of file
+    if args.reload:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.SERVER_HOST,
+            port=settings.SERVER_PORT,
+            reload=True,
+            log_level="info",
+            access_log=settings.APP_DEBUG
+        )
+    else:
+        config = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py")
+        os.execvp("gunicorn", ["gunicorn", "-c", config, "app.main:app"])
@@ -0,0 +1,935 @@
+"""
+API tests against an in-memory SQLite database.
+
+The query-count tests guard the eager-loaded views against N+1 regressions:
+the number of statements must not grow with the number of rows returned.
+"""
+import asyncio
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+pytest.importorskip("aiosqlite")
+httpx = pytest.importorskip("httpx")
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DB_ENGINE", "sqlite")
+os.environ.setdefault("DB_NAME", ":memory:")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("DB_WARMUP", "false")
+
+from sqlalchemy import column, event, func, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.archive import archive_rows
+from app.db.functions import date_bucket
+from app.db.upsert import select_then_write
+from app.core import database
+from app.core.config import IncomeSource, PaymentMethod, Type, settings
+from app.core.database import get_db
+from app.db.partitions import add_months
+from app.db.rebalance import move_user
+from app.db.sharding import Shard, ShardRouter
+from app.features.analytics.anomalies import detect_anomalies
+from app.features.analytics.timeseries import MAX_BUCKETS
+from app.features.auth.models import User
+from app.features.category.models import BudgetCategory, BudgetAlertRecord
+from app.features.category.watcher import budget_watcher
+from app.features.expense.models import Expense
+from app.features.income.models import Income
+from app.features.savingsgoal.forecast import project_goals
+from app.features.savingsgoal.models import SavingsGoal
+from app.features.savingsgoal.service import forecast_cache
+from app.features.statements.service import StatementWorker, data_version, render_statement
+from app.features.sync.models import ChangeLog
+from app.features.sync.service import encode_token
+from app.main import app
+
+CATEGORIES = 6
+EXPENSES_PER_CATEGORY = 12
+
+
+async def _seed(sessions) -> bytes:
+    user_id = uuid.uuid4().bytes
+    async with sessions() as session:
+        session.add(User(
+            id=user_id, first_name="Test", last_name="User",
+            email="test@example.com", username="test_user", password_hash="!"
+        ))
+        await session.flush()
+        for c in range(CATEGORIES):
+            category = BudgetCategory(
+                id=uuid.uuid4().bytes, user_id=user_id, name=f"Category {c}",
+                budget_limit=Decimal("1000.00"), type=Type.EXPENSE
+            )
+            session.add(category)
+            await session.flush()
+            session.add_all(
+                Expense(
+                    user_id=user_id, category_id=category.id, name=f"Expense {c}-{e}",
+                    amount=Decimal("1.00"), payment_method=PaymentMethod.CASH
+                )
+                for e in range(EXPENSES_PER_CATEGORY)
+            )
+        await session.commit()
+    return user_id
+
+
+def _run(scenario, seed=_seed):
+    """
+    Run `scenario(client, sessions, user_id)` against the app on a fresh
+    database seeded by `seed`; returns what the scenario returns
+    """
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        user_id = await seed(sessions)
+
+        async def override_db():
+            async with sessions() as session:
+                yield session
+                await session.commit()
+
+        app.dependency_overrides[get_db] = override_db
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await scenario(client, sessions, user_id)
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def _request(method: str, url: str, **kwargs):
+    """Run one request on a fresh database; returns (response, SELECTs executed)"""
+    async def scenario(client, sessions, user_id):
+        selects = []
+
+        def count(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("SELECT"):
+                selects.append(statement)
+
+        engine = sessions.kw["bind"].sync_engine
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            response = await client.request(method, url.format(user_id=uuid.UUID(bytes=user_id)), **kwargs)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        return response, selects
+
+    return _run(scenario)
+
+
+def test_expenses_with_category_use_one_query():
+    response, selects = _request("GET", "/api/v1/expenses/with-category?user_id={user_id}")
+
+    assert response.status_code == 200
+    expenses = response.json()
+    assert len(expenses) == CATEGORIES * EXPENSES_PER_CATEGORY
+    assert all(e["category"]["id"] == e["category_id"] for e in expenses)
+    assert {e["category"]["name"] for e in expenses} == {f"Category {c}" for c in range(CATEGORIES)}
+    assert len(selects) == 1
+
+
+def test_categories_with_recent_expenses_use_two_queries():
+    response, selects = _request("GET", "/api/v1/budget-categories/user/{user_id}/with-expenses", params={"recent": 3})
+
+    assert response.status_code == 200
+    categories = response.json()
+    assert len(categories) == CATEGORIES
+    for category in categories:
+        assert len(category["expenses"]) == 3
+        assert all(e["category_id"] == category["id"] for e in category["expenses"])
+        created = [e["created_at"] for e in category["expenses"]]
+        assert created == sorted(created, reverse=True)
+    assert len(selects) == 2
+
+
+# Refresh-token rotation
+
+async def _login(client) -> dict:
+    response = await client.post("/api/v1/auth/register", json={
+        "email": "refresh@example.com", "first_name": "Re", "last_name": "Fresh",
+        "username": "refresher", "password": "correct-horse"
+    })
+    assert response.status_code == 201, response.text
+    response = await client.post("/api/v1/auth/login", json={
+        "email_or_username": "refresher", "password": "correct-horse"
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def _refresh(client, token: str):
+    return await client.post("/api/v1/auth/refresh", json={"refresh_token": token})
+
+
+def test_refresh_rotates_the_token_pair():
+    async def scenario(client, sessions, user_id):
+        first = await _login(client)
+        second = await _refresh(client, first["refresh_token"])
+        assert second.status_code == 200
+        assert second.json()["refresh_token"] != first["refresh_token"]
+        third = await _refresh(client, second.json()["refresh_token"])
+        assert third.status_code == 200
+
+    _run(scenario)
+
+
+def test_refresh_token_reuse_revokes_the_family():
+    async def scenario(client, sessions, user_id):
+        first = await _login(client)
+        second = (await _refresh(client, first["refresh_token"])).json()
+
+        reused = await _refresh(client, first["refresh_token"])
+        assert reused.status_code == 401
+        # The legitimate successor belongs to the revoked family as well
+        assert (await _refresh(client, second["refresh_token"])).status_code == 401
+
+    _run(scenario)
+
+
+def test_refresh_rejected_for_deactivated_account():
+    async def scenario(client, sessions, user_id):
+        tokens = await _login(client)
+        async with sessions() as session:
+            await session.execute(
+                update(User).where(User.username == "refresher").values(is_active=False)
+            )
+            await session.commit()
+        assert (await _refresh(client, tokens["refresh_token"])).status_code == 401
+
+    _run(scenario)
+
+
+# Delta sync
+
+def test_sync_token_waits_for_late_commits():
+    async def scenario(client, sessions, user_id):
+        url, user = "/api/v1/sync", str(uuid.UUID(bytes=user_id))
+        start = (await client.get(url, params={"user_id": user})).json()["next_token"]
+        early, late = uuid.uuid4(), uuid.uuid4()
+
+        async def log(seq, entity_id, age):
+            async with sessions() as session:
+                session.add(ChangeLog(
+                    seq=seq, user_id=user_id, entity="expenses", entity_id=entity_id.bytes,
+                    op="delete", changed_at=datetime.utcnow() - timedelta(seconds=age)
+                ))
+                await session.commit()
+
+        # seq 1001 commits first, while the transaction holding seq 1000 is still open
+        await log(1001, early, age=0)
+        first = (await client.get(url, params={"user_id": user, "since": start})).json()
+        assert first["deleted"] == {}
+        assert first["next_token"] == start
+
+        await log(1000, late, age=0)
+        async with sessions() as session:
+            await session.execute(update(ChangeLog).values(changed_at=datetime.utcnow() - timedelta(hours=1)))
+            await session.commit()
+        second = (await client.get(url, params={"user_id": user, "since": first["next_token"]})).json()
+        assert set(second["deleted"]["expenses"]) == {str(early), str(late)}
+
+    _run(scenario)
+
+
+# Offline batch
+
+async def _first(sessions, model, user_id):
+    async with sessions() as session:
+        return await session.scalar(select(model).where(model.user_id == user_id).order_by(model.id).limit(1))
+
+
+def _expense(category_id: bytes, **data) -> dict:
+    return {"name": "Coffee", "amount": "3.50", "payment_method": "CASH",
+            "category_id": str(uuid.UUID(bytes=category_id)), **data}
+
+
+def test_sync_batch_applies_operations_in_order():
+    async def scenario(client, sessions, user_id):
+        category = await _first(sessions, BudgetCategory, user_id)
+        kept, dropped = uuid.uuid4(), uuid.uuid4()
+        response = await client.post("/api/v1/sync/batch", json={
+            "user_id": str(uuid.UUID(bytes=user_id)),
+            "operations": [
+                {"op": "create", "entity": "expenses", "id": str(kept), "data": _expense(category.id)},
+                {"op": "update", "entity": "expenses", "id": str(kept), "data": {"amount": "4.25"}},
+                {"op": "create", "entity": "expenses", "id": str(dropped), "data": _expense(category.id)},
+                {"op": "delete", "entity": "expenses", "id": str(dropped)},
+            ]
+        })
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body["applied"] == 4
+        assert [r["id"] for r in body["results"]] == [str(kept), str(kept), str(dropped), str(dropped)]
+
+        async with sessions() as session:
+            assert await session.scalar(select(Expense.amount).where(Expense.id == kept.bytes)) == Decimal("4.25")
+            assert await session.get(Expense, dropped.bytes) is None
+
+    _run(scenario)
+
+
+def test_sync_batch_rejects_rows_of_other_users():
+    async def scenario(client, sessions, user_id):
+        other_id = uuid.uuid4().bytes
+        async with sessions() as session:
+            session.add(User(
+                id=other_id, first_name="Other", last_name="User",
+                email="other@example.com", username="other_user", password_hash="!"
+            ))
+            await session.commit()
+        theirs = await _first(sessions, Expense, user_id)
+        async with sessions() as session:
+            await session.execute(update(Expense).where(Expense.id == theirs.id).values(user_id=other_id))
+            await session.commit()
+        their_category = await _first(sessions, BudgetCategory, user_id)
+
+        response = await client.post("/api/v1/sync/batch", json={
+            "user_id": str(uuid.UUID(bytes=other_id)),
+            "operations": [
+                {"op": "create", "entity": "expenses", "id": str(uuid.uuid4()), "data": _expense(their_category.id)},
+            ]
+        })
+        assert response.json()["results"][0]["error"] == "Category not found"
+
+        mine = await _first(sessions, Expense, user_id)
+        response = await client.post("/api/v1/sync/batch", json={
+            "user_id": str(uuid.UUID(bytes=other_id)),
+            "operations": [
+                {"op": "update", "entity": "expenses", "id": str(uuid.UUID(bytes=mine.id)), "data": {"amount": "9.99"}},
+                {"op": "delete", "entity": "expenses", "id": str(uuid.UUID(bytes=mine.id))},
+            ]
+        })
+        assert response.status_code == 200
+        assert [r["status"] for r in response.json()["results"]] == ["rejected", "rejected"]
+        async with sessions() as session:
+            assert await session.scalar(select(Expense.amount).where(Expense.id == mine.id)) == mine.amount
+
+    _run(scenario)
+
+
+def test_sync_batch_reports_conflicts_on_stale_base_version():
+    async def scenario(client, sessions, user_id):
+        expense = await _first(sessions, Expense, user_id)
+        stale = (expense.updated_at - timedelta(minutes=1)).isoformat()
+        response = await client.post("/api/v1/sync/batch", json={
+            "user_id": str(uuid.UUID(bytes=user_id)),
+            "operations": [
+                {"op": "update", "entity": "expenses", "id": str(uuid.UUID(bytes=expense.id)),
+                 "data": {"amount": "9.99"}, "base_version": stale},
+            ]
+        })
+        result = response.json()["results"][0]
+        assert result["status"] == "conflict"
+        assert result["version"] == expense.updated_at.isoformat()
+        async with sessions() as session:
+            assert await session.scalar(select(Expense.amount).where(Expense.id == expense.id)) == expense.amount
+
+    _run(scenario)
+
+
+async def _archive_everything(sessions, monkeypatch) -> None:
+    """Enable the archive tier and move every expense and income to it"""
+    monkeypatch.setattr(settings, "ARCHIVE_ENABLED", True)
+    async with sessions() as session:
+        for model in (Expense, Income):
+            await archive_rows(session, model, datetime.utcnow() + timedelta(days=1))
+
+
+def test_sync_delta_includes_archived_rows(monkeypatch):
+    async def scenario(client, sessions, user_id):
+        await _archive_everything(sessions, monkeypatch)
+        params = {"user_id": str(uuid.UUID(bytes=user_id)), "since": encode_token(0)}
+        monkeypatch.setattr(settings, "SYNC_SAFETY_LAG", 0)
+        response = await client.get("/api/v1/sync", params=params)
+        body = response.json()
+        assert len(body["expenses"]) == CATEGORIES * EXPENSES_PER_CATEGORY
+
+    _run(scenario)
+
+
+def test_sync_batch_writes_archived_rows_in_place(monkeypatch):
+    async def scenario(client, sessions, user_id):
+        await _archive_everything(sessions, monkeypatch)
+        archive = Expense.__archive__
+        async with sessions() as session:
+            edited, deleted, recreated = (await session.execute(
+                select(archive.c.id).where(archive.c.user_id == user_id).order_by(archive.c.id).limit(3)
+            )).scalars().all()
+            category_id = await session.scalar(select(archive.c.category_id).where(archive.c.id == recreated))
+
+        response = await client.post("/api/v1/sync/batch", json={
+            "user_id": str(uuid.UUID(bytes=user_id)),
+            "operations": [
+                {"op": "update", "entity": "expenses", "id": str(uuid.UUID(bytes=edited)), "data": {"amount": "7.00"}},
+                {"op": "delete", "entity": "expenses", "id": str(uuid.UUID(bytes=deleted))},
+                {"op": "create", "entity": "expenses", "id": str(uuid.UUID(bytes=recreated)),
+                 "data": _expense(category_id, name="Again")},
+            ]
+        })
+        assert [r["status"] for r in response.json()["results"]] == ["applied"] * 3
+
+        async with sessions() as session:
+            assert await session.scalar(select(func.count()).select_from(Expense)) == 0
+            rows = dict((await session.execute(select(archive.c.id, archive.c.amount))).all())
+            names = await session.scalar(select(func.count()).where(archive.c.id == recreated))
+        assert rows[edited] == Decimal("7.00")
+        assert deleted not in rows
+        assert names == 1
+
+    _run(scenario)
+
+
+def test_archived_expenses_stay_readable_and_writable(monkeypatch):
+    total = CATEGORIES * EXPENSES_PER_CATEGORY
+
+    async def counts(sessions):
+        async with sessions() as session:
+            return [
+                await session.scalar(select(func.count()).select_from(table))
+                for table in (Expense.__table__, Expense.__archive__)
+            ]
+
+    async def scenario(client, sessions, user_id):
+        await _archive_everything(sessions, monkeypatch)
+        assert await counts(sessions) == [0, total]
+        user = str(uuid.UUID(bytes=user_id))
+
+        listed = await client.get("/api/v1/expenses/", params={"user_id": user})
+        assert listed.status_code == 200, listed.text
+        assert len(listed.json()) == total
+        sparse = await client.get("/api/v1/expenses/", params={"user_id": user, "fields": "id,amount"})
+        assert [set(e) for e in sparse.json()] == [{"id", "amount"}] * total
+        page = await client.get("/api/v1/expenses/getExpenseByUserId", params={
+            "user_id": user, "fields": "amount", "limit": 1000
+        })
+        assert len(page.json()) == total
+
+        monkeypatch.setattr(settings, "SYNC_SAFETY_LAG", 0)
+        delta = await client.get("/api/v1/sync", params={"user_id": user, "since": encode_token(0)})
+        assert len(delta.json()["expenses"]) == total
+
+        filter_ = {"name_contains": "Expense"}
+        updated = await client.patch("/api/v1/expenses/bulk", json={
+            "user_id": user, "filter": filter_, "payment_method": "DEBIT_CARD"
+        })
+        assert updated.json()["affected"] == total, updated.text
+        async with sessions() as session:
+            methods = await session.scalars(select(Expense.__archive__.c.payment_method).distinct())
+            assert methods.all() == [PaymentMethod.DEBIT_CARD]
+        deleted = await client.request("DELETE", "/api/v1/expenses/bulk", json={"user_id": user, "filter": filter_})
+        assert deleted.json()["affected"] == total, deleted.text
+        assert await counts(sessions) == [0, 0]
+
+    _run(scenario)
+
+
+def test_select_then_write_upserts_without_native_support():
+    async def scenario(client, sessions, user_id):
+        table = Expense.__table__
+        async with sessions() as session:
+            existing = dict((await session.execute(
+                select(table).where(table.c.user_id == user_id).limit(1)
+            )).mappings().one())
+            new = {**existing, "id": uuid.uuid4().bytes, "name": "New"}
+            await select_then_write(session, table, [{**existing, "name": "Renamed"}, new], ["name"])
+            await session.commit()
+            names = dict((await session.execute(
+                select(table.c.id, table.c.name).where(table.c.id.in_([existing["id"], new["id"]]))
+            )).all())
+        assert names == {existing["id"]: "Renamed", new["id"]: "New"}
+
+    _run(scenario)
+
+
+# Monthly statements
+
+def test_statement_version_follows_category_names():
+    async def scenario(client, sessions, user_id):
+        month = datetime.utcnow().date().replace(day=1)
+        async with sessions() as session:
+            before = await data_version(session, uuid.UUID(bytes=user_id), month)
+        category = await _first(sessions, BudgetCategory, user_id)
+        async with sessions() as session:
+            await session.execute(
+                update(BudgetCategory).where(BudgetCategory.id == category.id)
+                .values(name="Renamed", updated_at=datetime.utcnow() + timedelta(seconds=1))
+            )
+            await session.commit()
+            assert await data_version(session, uuid.UUID(bytes=user_id), month) != before
+
+    _run(scenario)
+
+
+def test_statement_unavailable_without_worker():
+    response, _ = _request("GET", f"/api/v1/statements/{datetime.utcnow():%Y-%m}?user_id={{user_id}}")
+    assert response.status_code == 503
+
+
+def test_statement_render_keeps_newer_artifacts(tmp_path):
+    older, newer, current = (tmp_path / f"{name}.csv" for name in ("older", "newer", "current"))
+
+    async def scenario(client, sessions, user_id):
+        older.write_text("old")
+        async with sessions() as session:
+            month = datetime.utcnow().date().replace(day=1)
+            rows = await render_statement(session, uuid.UUID(bytes=user_id), month, str(current))
+        newer.write_text("new")
+        os.utime(newer, ns=(current.stat().st_mtime_ns + 1,) * 2)
+        os.utime(older, ns=(current.stat().st_mtime_ns - 1,) * 2)
+        StatementWorker._remove_stale(str(current))
+        return rows
+
+    assert _run(scenario) == CATEGORIES * EXPENSES_PER_CATEGORY
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["current.csv", "newer.csv"]
+
+
+# Budget alerts
+
+async def _small_budget(sessions, user_id) -> bytes:
+    """A category with a budget of 15.00 and no expenses yet"""
+    budget_watcher.clear()
+    category_id = uuid.uuid4().bytes
+    async with sessions() as session:
+        session.add(BudgetCategory(
+            id=category_id, user_id=user_id, name="Small", budget_limit=Decimal("15.00"), type=Type.EXPENSE
+        ))
+        await session.commit()
+    return category_id
+
+
+async def _alerts(client, user_id) -> list[dict]:
+    response = await client.get("/api/v1/budget-categories/alerts", params={"user_id": str(uuid.UUID(bytes=user_id))})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_bulk_recategorize_raises_budget_alerts():
+    async def scenario(client, sessions, user_id):
+        target = await _small_budget(sessions, user_id)
+        response = await client.request("PATCH", "/api/v1/expenses/bulk", json={
+            "user_id": str(uuid.UUID(bytes=user_id)),
+            "filter": {"name_contains": "Expense 0-"},
+            "category_id": str(uuid.UUID(bytes=target))
+        })
+        assert response.json()["affected"] == EXPENSES_PER_CATEGORY
+        alerts = await _alerts(client, user_id)
+        assert [a["threshold"] for a in alerts] == [0.8]
+        assert alerts[0]["category_name"] == "Small"
+
+    _run(scenario)
+
+
+def test_category_merge_raises_budget_alerts():
+    async def scenario(client, sessions, user_id):
+        target = await _small_budget(sessions, user_id)
+        async with sessions() as session:
+            sources = (await session.execute(
+                select(BudgetCategory.id).where(BudgetCategory.name.in_(["Category 0", "Category 1"]))
+            )).scalars().all()
+        response = await client.post("/api/v1/budget-categories/merge", json={
+            "user_id": str(uuid.UUID(bytes=user_id)),
+            "target_id": str(uuid.UUID(bytes=target)),
+            "source_ids": [str(uuid.UUID(bytes=s)) for s in sources]
+        })
+        assert response.status_code == 200, response.text
+        assert sorted(a["threshold"] for a in await _alerts(client, user_id)) == [0.8, 1.0]
+
+    _run(scenario)
+
+
+# Bulk expense writes
+
+def test_bulk_delete_rejects_an_empty_filter():
+    async def scenario(client, sessions, user_id):
+        response = await client.request("DELETE", "/api/v1/expenses/bulk", json={
+            "user_id": str(uuid.UUID(bytes=user_id)), "filter": {"category_id": None}
+        })
+        assert response.status_code == 422
+        async with sessions() as session:
+            assert await session.scalar(select(func.count()).select_from(Expense)) == CATEGORIES * EXPENSES_PER_CATEGORY
+
+    _run(scenario)
+
+
+# Sharding
+
+async def _shards(tmp_path) -> ShardRouter:
+    """A primary and an s1 shard in SQLite files under `tmp_path`"""
+    shards = []
+    for name in ("primary", "s1"):
+        engine = database.create_engine(5, 0, f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        shards.append(Shard(name, engine, sessions, engine, sessions))
+    return ShardRouter(shards, vnodes=64)
+
+
+def _user_on(router: ShardRouter, name: str) -> bytes:
+    return next(u for u in iter(lambda: uuid.uuid4().bytes, None) if router.shard_for(u).name == name)
+
+
+def test_lookups_by_row_id_find_the_owning_shard(tmp_path, monkeypatch):
+    async def run():
+        router = await _shards(tmp_path)
+        monkeypatch.setattr(database, "shard_router", router)
+
+        user_id = _user_on(router, "s1")
+        income_id, category_id, goal_id = (uuid.uuid4().bytes for _ in range(3))
+        async with router.shards["s1"].sessions() as session:
+            session.add(User(
+                id=user_id, first_name="Shard", last_name="User",
+                email="shard@example.com", username="shard_user", password_hash="!"
+            ))
+            await session.flush()
+            session.add_all([
+                Income(id=income_id, user_id=user_id, source=IncomeSource.SALARY, amount=Decimal("100.00")),
+                BudgetCategory(
+                    id=category_id, user_id=user_id, name="Rent",
+                    budget_limit=Decimal("500.00"), type=Type.EXPENSE
+                ),
+                SavingsGoal(id=goal_id, user_id=user_id, name="Bike", target_amount=Decimal("300.00")),
+            ])
+            await session.commit()
+
+        income, category, goal = (str(uuid.UUID(bytes=i)) for i in (income_id, category_id, goal_id))
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                assert (await client.get(f"/api/v1/incomes/getIncomeById/{income}")).status_code == 200
+                response = await client.put(f"/api/v1/incomes/updateIncome/{income}", json={"amount": "120.00"})
+                assert response.status_code == 200, response.text
+                assert (await client.get(f"/api/v1/budget-categories/{category}")).status_code == 200
+                response = await client.get(f"/api/v1/savings-goals/{goal}/forecast")
+                assert response.status_code == 200, response.text
+                assert (await client.delete(f"/api/v1/incomes/deleteIncome/{income}")).status_code == 204
+                assert (await client.get(f"/api/v1/incomes/getIncomeById/{income}")).status_code == 404
+        finally:
+            await router.dispose()
+
+    asyncio.run(run())
+
+
+def test_bulk_failure_publishes_the_committed_chunks(monkeypatch):
+    from app.features.expense import service as expense_service
+
+    published = []
+    calls = []
+
+    async def publish(*events):
+        published.extend(events)
+
+    async def record_changes(*args):
+        calls.append(args)
+        if len(calls) > 1:
+            raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(expense_service.settings, "EXPENSE_BULK_CHUNK_SIZE", 10)
+    monkeypatch.setattr(expense_service.event_bus, "publish", publish)
+    monkeypatch.setattr(expense_service, "record_changes", record_changes)
+
+    async def scenario(client, sessions, user_id):
+        with pytest.raises(RuntimeError):
+            await client.request("DELETE", "/api/v1/expenses/bulk", json={
+                "user_id": str(uuid.UUID(bytes=user_id)), "filter": {"name_contains": "Expense"}
+            })
+
+    _run(scenario)
+    assert [(type(e).__name__, e.affected, e.chunks) for e in published] == [("ExpensesBulkDeleted", 10, 1)]
+
+
+def test_budget_watcher_reseeds_when_the_seed_overlaps_a_commit():
+    async def scenario(client, sessions, user_id):
+        budget_watcher.clear()
+        category = await _first(sessions, BudgetCategory, user_id)
+        now = datetime.utcnow()
+        key = (user_id, category.id, now.date().replace(day=1))
+
+        started = datetime.utcnow()
+        async with sessions() as session:
+            session.add(Expense(
+                user_id=user_id, category_id=category.id, name="Late", amount=Decimal("5.00"),
+                payment_method=PaymentMethod.CASH, created_at=now
+            ))
+            await session.commit()
+            # The seed sees the new row, but the publisher stamps its commit a little late
+            await budget_watcher.record(session, [(user_id, category.id, now, Decimal("0"))])
+            finished = budget_watcher._totals[key].seeded_wall + timedelta(milliseconds=5)
+            await budget_watcher.record(session, [(user_id, category.id, now, Decimal("5.00"))], committed=(started, finished))
+        return budget_watcher._totals[key].spent
+
+    assert _run(scenario) == EXPENSES_PER_CATEGORY + 5
+
+
+def test_rebalance_keeps_the_target_shard_rows(tmp_path):
+    async def run():
+        router = await _shards(tmp_path)
+        moved, resident = uuid.uuid4().bytes, uuid.uuid4().bytes
+        for shard, user_id in ((router.primary, moved), (router.shards["s1"], resident)):
+            async with shard.sessions() as session:
+                session.add(User(
+                    id=user_id, first_name="Re", last_name="Balance", email=f"{user_id.hex()}@example.com",
+                    username=user_id.hex(), password_hash="!"
+                ))
+                await session.flush()
+                session.add(BudgetAlertRecord(
+                    user_id=user_id, category_id=uuid.uuid4().bytes, category_name=user_id.hex(),
+                    period=date(2026, 1, 1), threshold=0.8, spent=Decimal("80.00"), budget_limit=Decimal("100.00")
+                ))
+                await session.commit()
+
+        try:
+            for _ in range(2):  # A rerun must not duplicate anything
+                await move_user(moved, router.primary, router.shards["s1"], chunk_size=10)
+            async with router.shards["s1"].sessions() as session:
+                alerts = (await session.execute(select(BudgetAlertRecord))).scalars().all()
+            async with router.primary.sessions() as session:
+                assert await session.get(User, moved) is None
+        finally:
+            await router.dispose()
+        assert sorted((a.user_id, a.category_name) for a in alerts) == sorted(
+            (u, u.hex()) for u in (moved, resident)
+        )
+
+    asyncio.run(run())
+
+
+def test_goal_batch_covers_every_shard(tmp_path, monkeypatch):
+    from app.features.savingsgoal import batch
+
+    async def run():
+        router = await _shards(tmp_path)
+        monkeypatch.setattr(batch, "shard_router", router)
+        for shard in router:
+            user_id = _user_on(router, shard.name)
+            async with shard.sessions() as session:
+                session.add(User(
+                    id=user_id, first_name="Goal", last_name="Owner", email=f"{shard.name}@example.com",
+                    username=f"goal_{shard.name}", password_hash="!"
+                ))
+                await session.flush()
+                session.add(SavingsGoal(user_id=user_id, name="Bike", target_amount=Decimal("300.00")))
+                await session.commit()
+        return await batch.run_batch(batch_size=10, out_path=None)
+
+    stats = asyncio.run(run())
+    assert (stats["users"], stats["goals"]) == (2, 2)
+
+
+# Savings goal forecasts
+
+def test_goal_projection_band_is_reproducible():
+    history = np.array([100.0, -200, 400, 50, -150, 300, 250, -100, 200, 0, 350, -50])
+    remaining = np.array([600.0, 3000, 0, 1e6])
+
+    def project():
+        return project_goals(history, remaining, 36, 2000, 0.9, np.random.default_rng(7))
+
+    projection = project()
+    assert projection.expected[:2].tolist() == [5, 21]
+    assert (projection.p10[:2].tolist(), projection.p50[:2].tolist(), projection.p90[:2].tolist()) == (
+        [2, 15], [5, 21], [10, 29]
+    )
+    # Achieved goals complete now, goals beyond the horizon never do
+    assert (projection.p50[2], projection.probability[2]) == (0, 1)
+    assert np.isnan(projection.p90[3]) and projection.probability[3] == 0
+    np.testing.assert_array_equal(project().probability, projection.probability)
+
+
+async def _seed_monthly_income(sessions) -> bytes:
+    """The default seed plus 500.00 of income in each of the last four complete months"""
+    user_id = await _seed(sessions)
+    current = date.today().replace(day=1)
+    async with sessions() as session:
+        session.add_all(
+            Income(
+                user_id=user_id, source=IncomeSource.SALARY, amount=Decimal("500.00"),
+                created_at=datetime.combine(add_months(current, -months), datetime.min.time()) + timedelta(days=9)
+            )
+            for months in range(1, 5)
+        )
+        session.add_all([
+            SavingsGoal(user_id=user_id, name="Bike", target_amount=Decimal("1200.00")),
+            SavingsGoal(user_id=user_id, name="Phone", target_amount=Decimal("100.00"), saved_amount=Decimal("150.00")),
+            SavingsGoal(user_id=user_id, name="House", target_amount=Decimal("1000000.00")),
+        ])
+        await session.commit()
+    return user_id
+
+
+async def _forecasts(client, sessions, user_id) -> dict:
+    async with sessions() as session:
+        goals = (await session.execute(select(SavingsGoal).where(SavingsGoal.user_id == user_id))).scalars().all()
+    forecasts = {}
+    for goal in goals:
+        response = await client.get(f"/api/v1/savings-goals/{uuid.UUID(bytes=goal.id)}/forecast")
+        assert response.status_code == 200, response.text
+        forecasts[goal.name] = response.json()
+    return forecasts
+
+
+def test_goal_forecasts_follow_the_monthly_net():
+    async def scenario(client, sessions, user_id):
+        return await _forecasts(client, sessions, user_id)
+
+    forecasts = _run(scenario, seed=_seed_monthly_income)
+    # A flat 500.00 a month reaches 1200.00 in the third month, counting this one
+    third = add_months(date.today().replace(day=1), 2).isoformat()
+    bike = forecasts["Bike"]
+    assert (bike["status"], bike["months_of_history"], Decimal(bike["mean_monthly_net"])) == ("on_track", 4, 500)
+    assert {bike[k] for k in ("expected_completion", "completion_p10", "completion_p50", "completion_p90")} == {third}
+    assert (forecasts["Phone"]["status"], Decimal(forecasts["Phone"]["remaining"])) == ("achieved", 0)
+    house = forecasts["House"]
+    assert (house["status"], house["completion_p50"], house["probability_within_horizon"]) == ("unreachable", None, 0.0)
+
+
+def test_goal_forecast_needs_enough_history():
+    async def scenario(client, sessions, user_id):
+        async with sessions() as session:
+            session.add(SavingsGoal(user_id=user_id, name="Bike", target_amount=Decimal("300.00")))
+            await session.commit()
+        return await _forecasts(client, sessions, user_id)
+
+    # The seeded expenses all fall in the current, incomplete month
+    bike = _run(scenario)["Bike"]
+    assert (bike["status"], bike["months_of_history"], bike["expected_completion"]) == ("insufficient_history", 0, None)
+
+
+def test_goal_forecast_cache_misses_after_a_new_expense():
+    async def scenario(client, sessions, user_id):
+        misses = []
+        for _ in range(2):
+            before = forecast_cache._misses.value
+            await _forecasts(client, sessions, user_id)
+            misses.append(forecast_cache._misses.value - before)
+
+        category = await _first(sessions, BudgetCategory, user_id)
+        response = await client.post("/api/v1/expenses/", json=_expense(
+            category.id, user_id=str(uuid.UUID(bytes=user_id))
+        ))
+        assert response.status_code == 201, response.text
+        before = forecast_cache._misses.value
+        forecasts = await _forecasts(client, sessions, user_id)
+        misses.append(forecast_cache._misses.value - before)
+        return misses, forecasts
+
+    misses, forecasts = _run(scenario, seed=_seed_monthly_income)
+    assert misses == [1, 0, 1]  # One recompute covers every goal of the user
+    assert forecasts["Bike"]["status"] == "on_track"
+
+
+# Spending anomalies
+
+def test_anomaly_detector_flags_a_planted_outlier():
+    amounts = np.array([10.0, 11, 9, 10, 12, 10, 11, 100, 10, 5, 5, 5, 5, 5, 5])
+    codes = np.array([0] * 9 + [1] * 6)
+    scores = detect_anomalies(codes, amounts, window=5, threshold=3.5, min_history=3)
+    assert np.flatnonzero(scores.flagged).tolist() == [7]
+    assert scores.median[7] == 10
+    # The outlier falls out of the rolling median, so the next row is normal again
+    assert scores.score[8] < 1
+    # Constant spending has a zero MAD: scores stay finite thanks to the floor
+    assert np.all(np.isfinite(scores.score)) and np.all(scores.score[9:] == 0)
+
+
+def test_anomaly_detector_needs_min_history():
+    # Shorter than the window and than min_history: nothing can be flagged yet
+    scores = detect_anomalies(np.zeros(3, dtype=np.int64), np.array([5.0, 5, 500]), window=12, threshold=3.5, min_history=5)
+    assert not scores.flagged.any()
+    assert scores.score[0] == 0 and scores.score[2] > 3.5
+
+
+def test_anomalies_endpoint_reports_the_outlier():
+    async def scenario(client, sessions, user_id):
+        category = await _first(sessions, BudgetCategory, user_id)
+        async with sessions() as session:
+            session.add(Expense(
+                user_id=user_id, category_id=category.id, name="Spike", amount=Decimal("50.00"),
+                payment_method=PaymentMethod.CASH, created_at=datetime.utcnow() + timedelta(minutes=1)
+            ))
+            await session.commit()
+        response = await client.get("/api/v1/expenses/anomalies", params={
+            "user_id": str(uuid.UUID(bytes=user_id)), "window": 5
+        })
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    report = _run(scenario)
+    assert report["scanned"] == CATEGORIES * EXPENSES_PER_CATEGORY + 1
+    assert [(a["name"], Decimal(str(a["baseline_median"]))) for a in report["anomalies"]] == [("Spike", 1)]
+
+
+# Time series
+
+@pytest.mark.parametrize("dialect, expected", [
+    (mysql.dialect(), {
+        "day": "DATE(created_at)",
+        "week": "DATE_SUB(DATE(created_at), INTERVAL WEEKDAY(created_at) DAY)",
+        "month": "DATE_SUB(DATE(created_at), INTERVAL DAYOFMONTH(created_at) - 1 DAY)",
+    }),
+    (postgresql.dialect(), {
+        bucket: f"CAST(date_trunc('{bucket}', created_at) AS DATE)" for bucket in ("day", "week", "month")
+    }),
+    (sqlite.dialect(), {
+        "day": "date(created_at)",
+        "week": "date(created_at, 'weekday 0', '-6 days')",
+        "month": "date(created_at, 'start of month')",
+    }),
+])
+def test_date_bucket_compiles_per_dialect(dialect, expected):
+    compiled = {bucket: str(date_bucket(bucket, column("created_at")).compile(dialect=dialect)) for bucket in expected}
+    assert compiled == expected
+
+
+def test_date_bucket_rejects_unknown_buckets():
+    with pytest.raises(ValueError):
+        date_bucket("hour", column("created_at"))
+
+
+def test_series_fills_empty_buckets():
+    today = datetime.utcnow().date()
+
+    async def scenario(client, sessions, user_id):
+        category = await _first(sessions, BudgetCategory, user_id)
+        async with sessions() as session:
+            session.add(Expense(
+                user_id=user_id, category_id=category.id, name="Older", amount=Decimal("2.00"),
+                payment_method=PaymentMethod.CASH, created_at=datetime.combine(today - timedelta(days=3), datetime.min.time())
+            ))
+            await session.commit()
+        response = await client.get("/api/v1/expenses/series", params={
+            "user_id": str(uuid.UUID(bytes=user_id)), "bucket": "day",
+            "from": (today - timedelta(days=4)).isoformat(), "to": today.isoformat()
+        })
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    series = _run(scenario)
+    assert series["t"] == [(today - timedelta(days=d)).isoformat() for d in range(4, -1, -1)]
+    assert series["total"] == [0, 2, 0, 0, CATEGORIES * EXPENSES_PER_CATEGORY]
+    assert series["count"] == [0, 1, 0, 0, CATEGORIES * EXPENSES_PER_CATEGORY]
+
+
+def test_series_rejects_too_many_buckets():
+    async def scenario(client, sessions, user_id):
+        return await client.get("/api/v1/expenses/series", params={
+            "user_id": str(uuid.UUID(bytes=user_id)), "bucket": "day",
+            "from": "2000-01-01", "to": (date(2000, 1, 1) + timedelta(days=MAX_BUCKETS)).isoformat()
+        })
+
+    response = _run(scenario)
+    assert response.status_code == 400
+    assert "Range too large" in response.json()["detail"]